@@ -43,9 +43,24 @@ a = Analysis(
         'decklister.count_overlay',
         'decklister.renderer',
         'decklister.image_downloader',
+        'decklister.image_cache',
+        'decklister.file_lock',
+        'decklister.work_queue',
+        'decklister.batch_manifest',
+        'decklister.deck_stream',
+        'decklister.watch_mode',
+        'decklister.prefetch',
+        'decklister.network',
         'decklister.variant_resolver',
         'decklister.melee_csv_parser',
         'decklister.config_drawer',
+        'decklister.tile_atlas',
+        'decklister.pipeline',
+        'decklister.live_renderer',
+        'decklister.outputs',
+        'decklister.png_writer',
+        'decklister.pdf_writer',
+        'decklister.contact_sheet',
     ],
     hookspath=[],
     hooksconfig={},
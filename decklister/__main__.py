@@ -1,33 +1,506 @@
+import os
 import sys
 
 
+def _add_network_arguments(parser):
+    parser.add_argument("--max-concurrency", type=int, default=None, metavar="N", help="Most requests to swudb.com in flight at once; the adaptive limit stays at or below it (overrides network.max_concurrency in the config; default: 32)")
+    parser.add_argument("--rate-limit", type=float, default=None, metavar="RPS", help="Most requests to swudb.com started per second, 0 for no limit (overrides network.rate_limit in the config; default: 100)")
+
+
+def _configure_network(parser, args, settings=None):
+    """Apply a config's network settings, then the CLI's overrides."""
+    try:
+        from .network import configure
+    except ImportError:
+        from decklister.network import configure
+    try:
+        configure(**(settings or {}))
+        configure(max_concurrency=args.max_concurrency, rate_limit=args.rate_limit)
+    except (TypeError, ValueError) as e:
+        parser.error(f"invalid network settings: {e}")
+
+
+def main_cache(argv):
+    """`cache stats|prune|limit|pin|unpin`: inspect and manage the card image cache."""
+    import argparse
+    from collections import defaultdict
+    from datetime import datetime
+
+    try:
+        from .image_cache import get_image_cache_index, parse_size, format_size
+    except ImportError:
+        from decklister.image_cache import get_image_cache_index, parse_size, format_size
+
+    parser = argparse.ArgumentParser(prog="decklister cache", description="Manage the card image cache.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show the cache size, budget, and pinned sets, per set")
+    prune = commands.add_parser("prune", help="Remove least recently used images until the cache fits its budget")
+    prune.add_argument("--max-size", type=parse_size, default=None, metavar="SIZE", help="Prune to SIZE (e.g. 800M, 2G) instead of the saved budget")
+    limit = commands.add_parser("limit", help="Set the cache budget (0 = unbounded); later runs prune to it automatically")
+    limit.add_argument("size", type=parse_size, metavar="SIZE")
+    pin = commands.add_parser("pin", help="Never evict images of these sets")
+    pin.add_argument("sets", nargs="+", metavar="SET")
+    unpin = commands.add_parser("unpin", help="Allow images of these sets to be evicted again")
+    unpin.add_argument("sets", nargs="+", metavar="SET")
+    args = parser.parse_args(argv)
+
+    index = get_image_cache_index().load()
+    if args.command == "stats":
+        entries = index.usage()
+        per_set = defaultdict(lambda: [0, 0, 0])  # set → [images, bytes, last use]
+        for card_set, _, size, used in entries:
+            totals = per_set[card_set]
+            totals[0] += 1
+            totals[1] += size
+            totals[2] = max(totals[2], used)
+        total = sum(size for _, _, size, _ in entries)
+        budget = format_size(index.max_bytes) if index.max_bytes else "unbounded"
+        print(f"Image cache: {index.directory}")
+        print(f"{len(entries)} image(s), {format_size(total)} (budget: {budget})")
+        for card_set in sorted(per_set):
+            count, size, used = per_set[card_set]
+            pinned = "  pinned" if card_set in index.pinned else ""
+            print(f"  {card_set:<6} {count:>5} image(s) {format_size(size):>10}  last used {datetime.fromtimestamp(used):%Y-%m-%d %H:%M}{pinned}")
+        return
+
+    if args.command == "limit":
+        index.set_budget(max_bytes=args.size)
+    elif args.command == "pin":
+        index.set_budget(pin=args.sets)
+    elif args.command == "unpin":
+        index.set_budget(unpin=args.sets)
+    if args.command == "prune" and args.max_size is None and index.max_bytes is None:
+        print("No cache budget set; use `cache limit SIZE` or `cache prune --max-size SIZE`.")
+    elif args.command == "prune" or (args.command == "limit" and index.max_bytes):
+        removed, freed = index.prune(args.max_size if args.command == "prune" else None)
+        print(f"Removed {removed} image(s), {format_size(freed)}.")
+    index.save()
+    budget = format_size(index.max_bytes) if index.max_bytes else "unbounded"
+    print(f"Budget: {budget}; pinned sets: {', '.join(sorted(index.pinned)) or 'none'}")
+
+
+def _worker_command(queue_dir):
+    """Command line that starts a queue worker, from source or from the bundled exe."""
+    prefix = [sys.executable] if getattr(sys, "frozen", False) else [sys.executable, "-m", "decklister"]
+    return prefix + ["worker", "--queue", queue_dir]
+
+
+def main_coordinator(argv):
+    """`coordinator`: split a Melee CSV into a work queue that workers on any machine can render."""
+    import argparse
+    import subprocess
+
+    try:
+        from .melee_csv_parser import read_melee_rows, sort_rows
+        from .variant_resolver import parse_variants
+        from .work_queue import WorkQueue, wait_for_queue, STALE_AFTER
+    except ImportError:
+        from decklister.melee_csv_parser import read_melee_rows, sort_rows
+        from decklister.variant_resolver import parse_variants
+        from decklister.work_queue import WorkQueue, wait_for_queue, STALE_AFTER
+
+    parser = argparse.ArgumentParser(prog="decklister coordinator", description="Queue every deck of a Melee CSV for distributed rendering.")
+    parser.add_argument("deck_file", help="Path to the Melee.gg CSV export")
+    parser.add_argument("config_file", help="Path to the config file")
+    parser.add_argument("--queue", required=True, metavar="DIR", help="Queue folder on a filesystem every worker can reach")
+    parser.add_argument("--out", default=None, metavar="DIR", help="Folder for the deck images (default: DIR/outputs)")
+    parser.add_argument("-o", "--output", action="append", default=None, metavar="PATH@WIDTH", help="Extra sizes/formats per deck, as for the main command")
+    parser.add_argument("--variants", default=None, help="Render several variants per deck, e.g. normal,hyperspace")
+    parser.add_argument("--hyperspace", action="store_true", help="Use hyperspace variant art for all cards")
+    parser.add_argument("--showcase", action="store_true", help="Use showcase variant art for leaders")
+    parser.add_argument("--preview", type=float, default=None, metavar="SCALE", help="Fast draft render at SCALE x the config resolution")
+    parser.add_argument("--order", default="csv", choices=["csv", "player", "table", "standing"], help="Order in which workers take decks (default: csv)")
+    parser.add_argument("--stale-after", type=float, default=None, metavar="SECONDS", help="Requeue a deck if its worker sends no heartbeat for this long (default: 60)")
+    parser.add_argument("--workers", type=int, default=0, metavar="N", help="Also start N local workers and wait for the queue to finish")
+    parser.add_argument("--wait", action="store_true", help="Wait for the queue to finish, requeueing decks of crashed workers")
+    args = parser.parse_args(argv)
+
+    if args.variants:
+        try:
+            parse_variants(args.variants)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.preview is not None and not 0 < args.preview <= 1:
+        parser.error("--preview SCALE must be greater than 0 and at most 1")
+
+    rows = read_melee_rows(args.deck_file)
+    jobs = [
+        {"index": i, "label": row.get("OwnerDisplayName") or row.get("OwnerUsername") or f"index {i}", "row": row}
+        for i, row in sort_rows(rows, args.order)
+    ]
+    queue_dir = os.path.abspath(args.queue)
+    settings = {
+        "deck_file": os.path.abspath(args.deck_file),
+        "config_file": os.path.abspath(args.config_file),
+        "work_dir": os.getcwd(),  # Relative paths in the config resolve from here
+        "output_dir": os.path.abspath(args.out or os.path.join(queue_dir, "outputs")),
+        "outputs": args.output,
+        "variants": args.variants,
+        "hyperspace": args.hyperspace,
+        "showcase": args.showcase,
+        "preview": args.preview,
+        "stale_after": args.stale_after or STALE_AFTER,
+    }
+    try:
+        queue = WorkQueue.create(queue_dir, jobs, settings, stale_after=settings["stale_after"])
+    except ValueError as e:
+        parser.error(str(e))
+    os.makedirs(settings["output_dir"], exist_ok=True)
+    print(f"Queued {len(jobs)} deck(s) in {queue_dir}")
+
+    workers = [subprocess.Popen(_worker_command(queue_dir)) for _ in range(args.workers)]
+    if not (workers or args.wait):
+        print(f"Start workers with: {' '.join(_worker_command(queue_dir))}")
+        return
+    counts = wait_for_queue(queue)
+    for worker in workers:
+        worker.wait()
+    print(f"\nDone — {counts['done']} deck(s) rendered to {settings['output_dir']}"
+          + (f", {counts['failed']} failed (see `decklister status --queue {args.queue}`)." if counts["failed"] else "."))
+    if counts["failed"]:
+        sys.exit(1)
+
+
+def main_worker(argv):
+    """`worker`: render decks from a work queue until it is finished."""
+    import argparse
+
+    try:
+        from .config import Config
+        from .deck_image_generator import DeckImageGenerator
+        from .image_cache import maintain_image_cache
+        from .outputs import OutputSpec
+        from .variant_resolver import parse_variants
+        from .work_queue import WorkQueue, run_worker, default_worker_id
+    except ImportError:
+        from decklister.config import Config
+        from decklister.deck_image_generator import DeckImageGenerator
+        from decklister.image_cache import maintain_image_cache
+        from decklister.outputs import OutputSpec
+        from decklister.variant_resolver import parse_variants
+        from decklister.work_queue import WorkQueue, run_worker, default_worker_id
+
+    parser = argparse.ArgumentParser(prog="decklister worker", description="Render decks from a coordinator's work queue.")
+    parser.add_argument("--queue", required=True, metavar="DIR", help="Queue folder created by `decklister coordinator`")
+    parser.add_argument("--id", default=None, help="Worker name shown in the queue status (default: host-pid)")
+    _add_network_arguments(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        settings = WorkQueue(args.queue).settings
+    except FileNotFoundError:
+        parser.error(f"{args.queue} does not hold a queue")
+    queue = WorkQueue(args.queue, stale_after=settings["stale_after"])
+    if os.path.isdir(settings["work_dir"]):
+        os.chdir(settings["work_dir"])
+
+    config = Config.from_file(settings["config_file"])
+    _configure_network(parser, args, config.network)
+    generator = DeckImageGenerator(
+        config=config,
+        hyperspace=settings["hyperspace"], showcase=settings["showcase"],
+        variants=parse_variants(settings["variants"]) if settings["variants"] else None,
+        preview=settings["preview"],
+        outputs=[OutputSpec.parse(text) for text in settings["outputs"]] if settings["outputs"] else None,
+        dedupe=False, output_dir=settings["output_dir"], overwrite=True,
+    )
+    worker_id = args.id or default_worker_id()
+    finished = run_worker(queue, lambda job: generator.run_queue_job(settings["deck_file"], job), worker_id)
+    maintain_image_cache()
+    print(f"[{worker_id}] Queue finished; rendered {finished} deck(s).")
+
+
+def main_status(argv):
+    """`status`: show the progress of a work queue."""
+    import argparse
+
+    try:
+        from .work_queue import WorkQueue, STATES
+    except ImportError:
+        from decklister.work_queue import WorkQueue, STATES
+
+    parser = argparse.ArgumentParser(prog="decklister status", description="Show the progress of a work queue.")
+    parser.add_argument("--queue", required=True, metavar="DIR", help="Queue folder")
+    args = parser.parse_args(argv)
+
+    try:
+        queue = WorkQueue(args.queue, stale_after=WorkQueue(args.queue).settings["stale_after"])
+    except FileNotFoundError:
+        parser.error(f"{args.queue} does not hold a queue")
+    counts = queue.counts()
+    print(", ".join(f"{counts[state]} {state}" for state in STATES))
+    for name, worker, age in queue.claim_ages():
+        stale = "  (stale, will be requeued)" if age >= queue.stale_after else ""
+        print(f"  rendering {name} on {worker}, last heartbeat {age:.0f}s ago{stale}")
+    for name, job in queue.jobs("failed"):
+        print(f"  failed {name} ({job.get('label')}) after {job.get('attempts')} attempt(s): {job.get('error')}")
+    done = queue.jobs("done")
+    if done:
+        seconds = [job.get("seconds", 0) for _, job in done]
+        per_worker = {}
+        for _, job in done:
+            per_worker[job.get("worker")] = per_worker.get(job.get("worker"), 0) + 1
+        print(f"  {sum(seconds) / len(seconds):.1f}s per deck on average; "
+              + ", ".join(f"{worker}: {n}" for worker, n in sorted(per_worker.items())))
+
+
+def main_batch(argv):
+    """`batch`: render many decks with many configs, as listed in a manifest, in one process."""
+    import argparse
+
+    try:
+        from .batch_manifest import load_manifest, network_settings, run_batch
+        from .tile_atlas import TileAtlas
+    except ImportError:
+        from decklister.batch_manifest import load_manifest, network_settings, run_batch
+        from decklister.tile_atlas import TileAtlas
+
+    parser = argparse.ArgumentParser(prog="decklister batch", description="Render every deck in a job manifest with every config in it.")
+    parser.add_argument("manifest", help="Job manifest (.json, or .yaml with PyYAML installed)")
+    parser.add_argument("--atlas", action="store_true", help="Read pre-decoded card tiles from the memory-mapped tile atlas")
+    parser.add_argument("--build-atlas", action="store_true", help="Add the card tiles used by this run to the tile atlas")
+    _add_network_arguments(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        sources, targets = load_manifest(args.manifest)
+        settings = network_settings(targets)
+    except (OSError, ValueError) as e:
+        parser.error(f"invalid manifest: {e}")
+    _configure_network(parser, args, settings)
+    tile_atlas = TileAtlas(writable=args.build_atlas) if args.atlas or args.build_atlas else None
+    try:
+        failures = run_batch(sources, targets, tile_atlas=tile_atlas)
+    except ValueError as e:
+        parser.error(str(e))
+    if failures:
+        sys.exit(1)
+
+
+def main_prefetch(argv):
+    """`prefetch`: resolve and download every card an event's decks need, without rendering."""
+    import argparse
+
+    try:
+        from .prefetch import prefetch
+        from .variant_resolver import parse_variants
+        from . import network
+    except ImportError:
+        from decklister.prefetch import prefetch
+        from decklister.variant_resolver import parse_variants
+        from decklister import network
+
+    parser = argparse.ArgumentParser(prog="decklister prefetch", description="Warm the card ID and image caches for every deck, without rendering.")
+    parser.add_argument("deck_files", nargs="+", metavar="deck_file", help="Melee.gg CSV exports (every deck in them) or deck JSON files")
+    parser.add_argument("--variants", default=None, help="Prefetch several variants per deck, e.g. normal,hyperspace,showcase")
+    parser.add_argument("--hyperspace", action="store_true", help="Prefetch hyperspace variant art for all cards")
+    parser.add_argument("--showcase", action="store_true", help="Prefetch showcase variant art for leaders")
+    parser.add_argument("--offline", action="store_true", help="Fetch nothing; only report what is missing from the local caches")
+    _add_network_arguments(parser)
+    args = parser.parse_args(argv)
+    _configure_network(parser, args)
+
+    if args.variants:
+        try:
+            variants = [(hyperspace, showcase) for _, hyperspace, showcase in parse_variants(args.variants)]
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        variants = [(args.hyperspace, args.showcase)]
+    missing = [path for path in args.deck_files if not os.path.isfile(path)]
+    if missing:
+        parser.error(f"no such file: {', '.join(missing)}")
+
+    network.set_offline(args.offline)
+    report = prefetch(args.deck_files, variants)
+    report.print()
+    if not report.ok:
+        sys.exit(1)
+
+
+SUBCOMMANDS = {
+    "batch": main_batch,
+    "cache": main_cache,
+    "coordinator": main_coordinator,
+    "worker": main_worker,
+    "status": main_status,
+    "prefetch": main_prefetch,
+}
+
+
 def main_cli():
     import argparse
 
+    if sys.argv[1:2] and sys.argv[1] in SUBCOMMANDS:
+        SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+
     try:
         from .deck_image_generator import DeckImageGenerator
         from .config import Config
+        from .tile_atlas import TileAtlas
+        from .variant_resolver import parse_variants
+        from .outputs import OutputSpec
+        from .deck_stream import read_deck_lines, ResultWriter, NDJSON_EXTENSIONS
+        from .watch_mode import WatchSession, deck_files
+        from .prefetch import prefetch, missing_config_files
+        from . import network
     except ImportError:
         from decklister.deck_image_generator import DeckImageGenerator
         from decklister.config import Config
+        from decklister.tile_atlas import TileAtlas
+        from decklister.variant_resolver import parse_variants
+        from decklister.outputs import OutputSpec
+        from decklister.deck_stream import read_deck_lines, ResultWriter, NDJSON_EXTENSIONS
+        from decklister.watch_mode import WatchSession, deck_files
+        from decklister.prefetch import prefetch, missing_config_files
+        from decklister import network
 
     parser = argparse.ArgumentParser(description="Generate deck images from a deck file.")
-    parser.add_argument("deck_file", help="Path to the deck file (.json or Melee.gg .csv)")
+    parser.add_argument("deck_file", help="Path to the deck file (.json or Melee.gg .csv), or newline-delimited deck JSON (.ndjson/.jsonl, or - for stdin)")
     parser.add_argument("config_file", help="Path to the config file")
-    parser.add_argument("-o", "--output", help="Output file path (auto-named if not provided)", default=None)
+    parser.add_argument("-o", "--output", action="append", default=None, help="Output file path (auto-named if not provided). Repeat with PATH@WIDTH to write several sizes/formats from one render, e.g. -o deck.png -o deck_1080.webp@1920")
     parser.add_argument("--hyperspace", action="store_true", help="Use hyperspace variant art for all cards")
     parser.add_argument("--showcase", action="store_true", help="Use showcase variant art for leaders (overrides hyperspace for leaders)")
+    parser.add_argument("--variants", default=None, help="Render several variants from one parse and download, e.g. normal,hyperspace,showcase (overrides --hyperspace/--showcase)")
     parser.add_argument("--player", default=None, help="(CSV only) Player name to select from a multi-deck CSV export")
     parser.add_argument("--index", type=int, default=0, help="(CSV only) 0-based deck index to select from a multi-deck CSV export (default: 0)")
     parser.add_argument("--all", action="store_true", help="(CSV only) Generate images for all decks in the CSV")
+    parser.add_argument("--pdf", default=None, metavar="OUT.pdf", help="(CSV only) Write every deck in the CSV as one page of a PDF (implies --all)")
+    parser.add_argument("--sheet", default=None, metavar="OUT.png", help="(CSV only) Assemble every deck in the CSV into a labelled contact sheet (implies --all)")
+    parser.add_argument("--sheet-width", type=int, default=480, metavar="PX", help="Thumbnail width on the contact sheet (default: 480)")
+    parser.add_argument("--sheet-columns", type=int, default=8, metavar="N", help="Thumbnails per contact sheet row (default: 8)")
+    parser.add_argument("--sheet-rows", type=int, default=None, metavar="N", help="Rows per contact sheet image; more decks continue on _2, _3, ... (default: one sheet)")
+    parser.add_argument("--sheet-label", default="OwnerDisplayName", metavar="COLUMN", help="CSV column used to label each thumbnail (default: OwnerDisplayName)")
+    parser.add_argument("--order", default="csv", choices=["csv", "player", "table", "standing"], help="(CSV only) Deck order for --all and --pdf (default: csv)")
+    parser.add_argument("--no-dedupe", action="store_true", help="(CSV only) Render every deck even if its list is identical to an earlier one (by default identical decks are rendered once and their images hardlinked)")
+    parser.add_argument("--atlas", action="store_true", help="Read pre-decoded card tiles from the memory-mapped tile atlas")
+    parser.add_argument("--build-atlas", action="store_true", help="Add the card tiles used by this run to the tile atlas")
+    parser.add_argument("--preview", type=float, default=None, metavar="SCALE", help="Fast draft render at SCALE x the config resolution (e.g. 0.25)")
+    parser.add_argument("--stream", action="store_true", help="(Single deck) Composite cards as their images finish downloading")
+    parser.add_argument("--band-height", type=int, default=None, metavar="N", help="Render and encode the PNG in horizontal bands of N pixels to bound memory on very large canvases (overrides band_height in the config)")
+    parser.add_argument("--render-threads", type=int, default=None, help="Threads preparing card tiles within each render (overrides render_threads in the config)")
+    parser.add_argument("--watch", action="store_true", help="Keep running and re-render when the deck file(s), config, or any layer image, font, or count background changes. The deck file can then be a folder of decks")
+    parser.add_argument("--watch-interval", type=float, default=1.0, metavar="SECONDS", help="How often --watch checks for changes (default: 1)")
+    parser.add_argument("--offline", action="store_true", help="Never touch the network: check that every card name, image, and config file is available locally before rendering")
+    parser.add_argument("--offline-missing", default=None, choices=["fail", "placeholder"], help="With --offline, stop before rendering if anything is missing, or render with placeholders (overrides offline_missing in the config; default: fail)")
+    _add_network_arguments(parser)
     args = parser.parse_args()
 
+    variants = None
+    if args.variants:
+        try:
+            variants = parse_variants(args.variants)
+        except ValueError as e:
+            parser.error(str(e))
+
+    # One plain -o keeps the classic single output; anything more becomes output specs
+    output_path, outputs = None, None
+    if args.output and len(args.output) == 1 and "@" not in args.output[0]:
+        output_path = args.output[0]
+    elif args.output:
+        try:
+            outputs = [OutputSpec.parse(text) for text in args.output]
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.preview is not None and not 0 < args.preview <= 1:
+        parser.error("--preview SCALE must be greater than 0 and at most 1")
+
+    if args.sheet and (args.sheet_width < 1 or args.sheet_columns < 1 or (args.sheet_rows is not None and args.sheet_rows < 1)):
+        parser.error("--sheet-width, --sheet-columns, and --sheet-rows must be at least 1")
+    if args.band_height is not None and args.band_height < 1:
+        parser.error("--band-height must be at least 1")
+    if args.render_threads is not None and args.render_threads < 1:
+        parser.error("--render-threads must be at least 1")
+    if args.watch_interval <= 0:
+        parser.error("--watch-interval must be greater than 0")
+    ndjson = args.deck_file == "-" or os.path.splitext(args.deck_file)[1].lower() in NDJSON_EXTENSIONS
+    if ndjson and (args.all or args.pdf or args.sheet or args.player or args.watch):
+        parser.error("--all, --pdf, --sheet, --player, and --watch don't apply to NDJSON input")
+    if ndjson and output_path:
+        parser.error("-o PATH would name every deck of an NDJSON stream the same; use PATH@WIDTH, or \"output\" in each line")
+    if os.path.isdir(args.deck_file) and not args.watch:
+        parser.error("a folder of decks can only be given with --watch")
+    if os.path.isdir(args.deck_file) and output_path:
+        parser.error("-o PATH would name every deck in the folder the same; use PATH@WIDTH or leave outputs auto-named")
+
+    tile_atlas = None
+    if args.atlas or args.build_atlas:
+        tile_atlas = TileAtlas(writable=args.build_atlas)
+    # Watch mode keeps prepared card tiles across renders (emptied when the config is reloaded)
+    tile_cache = {} if args.watch else None
+
+    def make_generator(config):
+        preview = args.preview
+        if args.sheet:
+            # Contact sheet thumbnails are draft renders at the thumbnail width
+            preview = min(1.0, args.sheet_width / config.resolution[0])
+        if args.band_height is not None:
+            config.band_height = args.band_height
+        if args.render_threads is not None:
+            config.render_threads = args.render_threads
+        return DeckImageGenerator(
+            config=config, hyperspace=args.hyperspace, showcase=args.showcase, tile_atlas=tile_atlas, variants=variants,
+            stream=args.stream, preview=preview, outputs=outputs, dedupe=not args.no_dedupe,
+            overwrite=args.watch, tile_cache=tile_cache,
+        )
+
+    def render(generator, deck_file, rows=None):
+        if args.all or args.pdf or args.sheet:
+            generator.run_all(
+                deck_file, output_path=output_path, pdf_path=args.pdf, order=args.order,
+                sheet_path=args.sheet, sheet_columns=args.sheet_columns, sheet_rows=args.sheet_rows,
+                sheet_label=args.sheet_label, indices=rows,
+            )
+        else:
+            generator.run(deck_file, output_path=output_path, player=args.player, deck_index=args.index)
+
     config = Config.from_file(args.config_file)
-    generator = DeckImageGenerator(config=config, hyperspace=args.hyperspace, showcase=args.showcase)
-    if args.all:
-        generator.run_all(args.deck_file, output_path=args.output)
+    _configure_network(parser, args, config.network)
+    if args.offline:
+        network.set_offline()
+        # NDJSON decks are not known up front; their missing cards become placeholders
+        if not ndjson:
+            single = not (args.all or args.pdf or args.sheet)
+            report = prefetch(
+                deck_files(args.deck_file),
+                [(hyperspace, showcase) for _, hyperspace, showcase in variants] if variants else [(args.hyperspace, args.showcase)],
+                player=args.player if single else None, deck_index=args.index if single else None,
+            )
+            report.missing_files = missing_config_files(config)
+            report.print()
+            if not report.ok:
+                if (args.offline_missing or config.offline_missing) != "placeholder":
+                    print("Nothing rendered. Fill the caches with `decklister prefetch` while online, or pass --offline-missing placeholder.")
+                    sys.exit(1)
+                print("Rendering with placeholders for what is missing.")
+
+    if args.watch:
+        try:
+            WatchSession(args.deck_file, args.config_file, make_generator, render, interval=args.watch_interval).run()
+        except ValueError as e:
+            parser.error(str(e))
+        return
+
+    try:
+        generator = make_generator(config)
+    except ValueError as e:
+        parser.error(f"invalid outputs: {e}")
+    if ndjson:
+        # Results go to stdout, one JSON object per line; everything else is logged to stderr
+        results = ResultWriter(sys.stdout)
+        sys.stdout = sys.stderr
+        if args.deck_file == "-":
+            generator.run_stream(read_deck_lines(sys.stdin), results)
+        else:
+            with open(args.deck_file, "r", encoding="utf-8") as f:
+                generator.run_stream(read_deck_lines(f, args.deck_file), results)
+        print(f"\nDone — {results.ok} deck(s) rendered" + (f", {results.failed} failed." if results.failed else "."))
+        if results.failed:
+            sys.exit(1)
     else:
-        generator.run(args.deck_file, output_path=args.output, player=args.player, deck_index=args.index)
+        render(generator, args.deck_file)
 
 
 def main_gui():
@@ -39,8 +512,6 @@ def main_gui():
 
 
 if __name__ == "__main__":
-    import os
-
     # Detect whether this is the CLI exe (e.g., DeckLister-cli.exe)
     exe_name = os.path.basename(sys.argv[0]).lower()
     is_cli_exe = "-cli" in exe_name or "_cli" in exe_name
@@ -1,13 +1,17 @@
 """
 Shared utility for determining the application data directory.
+
+Directories are resolved (and created) once per process.
 """
 import os
 import sys
+from functools import lru_cache
 
 
 APP_NAME = "DeckLister"
 
 
+@lru_cache(maxsize=None)
 def get_app_data_dir():
     """
     Get the application data directory.
@@ -35,6 +39,7 @@ def get_app_data_dir():
     return app_dir
 
 
+@lru_cache(maxsize=None)
 def get_image_cache_dir():
     """Get the directory for cached card images."""
     img_dir = os.path.join(get_app_data_dir(), "images")
@@ -45,3 +50,19 @@ def get_image_cache_dir():
 def get_card_cache_path():
     """Get the path for the card name → ID cache file."""
     return os.path.join(get_app_data_dir(), "card_cache.json")
+
+
+@lru_cache(maxsize=None)
+def get_thumbnail_dir():
+    """Get the directory for downscaled card images used by draft previews."""
+    thumb_dir = os.path.join(get_app_data_dir(), "thumbnails")
+    os.makedirs(thumb_dir, exist_ok=True)
+    return thumb_dir
+
+
+@lru_cache(maxsize=None)
+def get_atlas_dir():
+    """Get the directory for the packed tile atlas."""
+    atlas_dir = os.path.join(get_app_data_dir(), "atlas")
+    os.makedirs(atlas_dir, exist_ok=True)
+    return atlas_dir
@@ -0,0 +1,394 @@
+"""
+Batch job manifests: many decks × many configs in one invocation.
+
+A manifest (JSON, or YAML if PyYAML is installed) lists deck sources and the
+configs each of them is rendered with:
+
+    {
+      "decks": [
+        "day2.csv",                                   every deck in the CSV
+        {"path": "top8.csv", "order": "standing"},
+        {"path": "top8.csv", "player": "Alice"},      one deck, as with --player
+        "my_deck.json"
+      ],
+      "configs": {
+        "stream": "configs/stream.json",
+        "social": {"config": "configs/social.json", "variants": "normal,hyperspace",
+                   "outputs": [{"suffix": "1080p", "width": 1920, "format": "webp"}]},
+        "print":  {"config": "configs/print.json", "output": "print/{deck}/{player}.png"}
+      },
+      "output": "out/{config}/{name}.png"
+    }
+
+Output templates can use {config}, {name} (the name a single CLI run would
+give the deck, e.g. day2_index_3), {deck} (the deck file name), {player} (or
+{name} for decks without one), and {index}. Variant names are added as "_<variant>", as with -o. Top-level
+variants/hyperspace/showcase/preview/dedupe/output are defaults every config
+can override. Paths are relative to the working directory, like CLI arguments.
+
+Everything runs in one process: each deck source is read and its card names
+resolved once, the images of every deck in every variant are downloaded as one
+batch, and each config gets one generator, so its layer images are decoded
+once for all decks.
+"""
+import json
+import os
+import time
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    from .config import Config
+    from .deck import Deck
+    from .deck_image_generator import DeckImageGenerator, safe_filename
+    from .image_cache import maintain_image_cache
+    from .outputs import OutputSpec
+    from .pipeline import DeckJob
+    from .variant_resolver import parse_variants
+    from . import image_downloader as ImageDownloader
+except ImportError:
+    from decklister.config import Config
+    from decklister.deck import Deck
+    from decklister.deck_image_generator import DeckImageGenerator, safe_filename
+    from decklister.image_cache import maintain_image_cache
+    from decklister.outputs import OutputSpec
+    from decklister.pipeline import DeckJob
+    from decklister.variant_resolver import parse_variants
+    from decklister import image_downloader as ImageDownloader
+
+DEFAULT_OUTPUT = "{config}/{name}.png"
+TEMPLATE_FIELDS = ("config", "name", "deck", "player", "index")
+DECK_KEYS = {"path", "player", "index", "order"}
+TARGET_KEYS = {"config", "output", "variants", "hyperspace", "showcase", "preview", "outputs", "dedupe"}
+DEFAULT_KEYS = TARGET_KEYS - {"config"}
+
+
+class DeckSource:
+    """One "decks" entry: a JSON deck, or some or all decks of a Melee CSV."""
+
+    def __init__(self, path, player=None, index=None, order="csv"):
+        self.path = path
+        self.player = player
+        self.index = index
+        self.order = order
+
+    def __repr__(self):
+        return f"DeckSource({self.path!r})"
+
+
+class BatchTarget:
+    """One "configs" entry: a config and how decks rendered with it are named."""
+
+    def __init__(self, name, config_file, output=DEFAULT_OUTPUT, variants=None, hyperspace=False,
+                 showcase=False, preview=None, outputs=None, dedupe=True):
+        self.name = name
+        self.config_file = config_file
+        self.output = output
+        self.variants = variants  # parse_variants() list, or None
+        self.hyperspace = hyperspace
+        self.showcase = showcase
+        self.preview = preview
+        self.outputs = outputs  # List of OutputSpec, or None for the config's own
+        self.dedupe = dedupe
+
+    def __repr__(self):
+        return f"BatchTarget({self.name!r}, {self.config_file!r})"
+
+
+class BatchDeck:
+    """A parsed deck from a source, with the fields its output names are made from."""
+
+    def __init__(self, source, deck, label, name, player="", index=0, row=None):
+        self.source = source
+        self.deck = deck
+        self.label = label
+        self.row = row  # CSV row, for detecting identical decklists
+        self.fields = {
+            "name": name,
+            "deck": os.path.splitext(os.path.basename(source.path))[0],
+            "player": player or name,
+            "index": index,
+        }
+
+
+def load_manifest(path):
+    """
+    Read and check a manifest file.
+
+    Returns:
+        (list of DeckSource, list of BatchTarget). Raises ValueError if the
+        manifest is malformed or names files that don't exist.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            if yaml is None:
+                raise ValueError(f"{path}: YAML manifests need PyYAML (pip install pyyaml); or write it as JSON")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    return parse_manifest(data)
+
+
+def parse_manifest(data):
+    """Check a manifest dict. See load_manifest()."""
+    if not isinstance(data, dict):
+        raise ValueError("the manifest must be an object with \"decks\" and \"configs\"")
+    unknown = set(data) - DEFAULT_KEYS - {"decks", "configs"}
+    if unknown:
+        raise ValueError(f"unknown manifest key(s): {', '.join(sorted(unknown))}")
+    decks, configs = data.get("decks"), data.get("configs")
+    if not decks or not isinstance(decks, list):
+        raise ValueError("\"decks\" must be a non-empty list")
+    if not configs or not isinstance(configs, dict):
+        raise ValueError("\"configs\" must be a non-empty object of name → config")
+
+    sources = [_parse_source(entry) for entry in decks]
+    defaults = {key: data[key] for key in DEFAULT_KEYS if key in data}
+    targets = [_parse_target(str(name), entry, defaults) for name, entry in configs.items()]
+    for path in [source.path for source in sources] + [target.config_file for target in targets]:
+        if not os.path.isfile(path):
+            raise ValueError(f"file not found: {path}")
+    return sources, targets
+
+
+def _parse_source(entry):
+    if isinstance(entry, str):
+        entry = {"path": entry}
+    if not isinstance(entry, dict) or not entry.get("path"):
+        raise ValueError(f"each deck must be a path or an object with \"path\", not {entry!r}")
+    unknown = set(entry) - DECK_KEYS
+    if unknown:
+        raise ValueError(f"deck {entry['path']}: unknown key(s) {', '.join(sorted(unknown))}")
+    if entry.get("index") is not None and (not isinstance(entry["index"], int) or entry["index"] < 0):
+        raise ValueError(f"deck {entry['path']}: index must be a whole number from 0")
+    return DeckSource(entry["path"], player=entry.get("player"), index=entry.get("index"), order=entry.get("order", "csv"))
+
+
+def _parse_target(name, entry, defaults):
+    if isinstance(entry, str):
+        entry = {"config": entry}
+    if not isinstance(entry, dict) or not entry.get("config"):
+        raise ValueError(f"config {name}: expected a config path or an object with \"config\"")
+    unknown = set(entry) - TARGET_KEYS
+    if unknown:
+        raise ValueError(f"config {name}: unknown key(s) {', '.join(sorted(unknown))}")
+    options = {**defaults, **entry}
+
+    output = options.get("output", DEFAULT_OUTPUT)
+    try:
+        output.format(**{field: "x" for field in TEMPLATE_FIELDS})
+    except (KeyError, IndexError, ValueError, AttributeError) as e:
+        raise ValueError(f"config {name}: bad output template {output!r} "
+                         f"(placeholders: {', '.join('{' + f + '}' for f in TEMPLATE_FIELDS)}): {e}")
+
+    variants = options.get("variants")
+    if variants is not None:
+        if isinstance(variants, list):
+            variants = ",".join(variants)
+        try:
+            variants = parse_variants(variants)
+        except ValueError as e:
+            raise ValueError(f"config {name}: {e}")
+
+    preview = options.get("preview")
+    if preview is not None and (not isinstance(preview, (int, float)) or not 0 < preview <= 1):
+        raise ValueError(f"config {name}: preview must be greater than 0 and at most 1")
+
+    outputs = options.get("outputs")
+    if outputs is not None:
+        try:
+            outputs = [OutputSpec.from_dict(spec) for spec in outputs]
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"config {name}: invalid outputs: {e}")
+
+    return BatchTarget(
+        name, entry["config"], output=output, variants=variants,
+        hyperspace=bool(options.get("hyperspace")), showcase=bool(options.get("showcase")),
+        preview=preview, outputs=outputs, dedupe=options.get("dedupe", True),
+    )
+
+
+def load_decks(source, card_cache):
+    """
+    Read and parse every deck a source names.
+
+    Returns:
+        (list of BatchDeck, list of (label, error) for decks that failed).
+    """
+    try:
+        from .melee_csv_parser import read_melee_rows, select_row, sort_rows, deck_from_row, display_name
+    except ImportError:
+        from decklister.melee_csv_parser import read_melee_rows, select_row, sort_rows, deck_from_row, display_name
+
+    stem = os.path.splitext(os.path.basename(source.path))[0]
+    if os.path.splitext(source.path)[1].lower() != ".csv":
+        return [BatchDeck(source, Deck.from_json_file(source.path), source.path, stem)], []
+
+    rows = read_melee_rows(source.path)
+    if source.player or source.index is not None:
+        try:
+            row = select_row(rows, player_name=source.player, deck_index=source.index or 0)
+        except ValueError as e:
+            what = f"player {source.player!r}" if source.player else f"index {source.index}"
+            raise ValueError(f"{what} in manifest: {e}") from e
+        selected = [(next(i for i, r in enumerate(rows) if r is row), row)]
+    else:
+        selected = sort_rows(rows, source.order)
+
+    decks, failed = [], []
+    for i, row in selected:
+        player = display_name(row)
+        label = f"{source.path} {player or f'index {i}'}"
+        # Same names a single CLI run would give: --player uses the player, otherwise the index
+        if len(rows) == 1:
+            name = stem
+        elif source.player:
+            name = f"{stem}_{safe_filename(source.player)}"
+        else:
+            name = f"{stem}_index_{i}"
+        try:
+            deck = deck_from_row(row, cache=card_cache)
+        except Exception as e:
+            print(f"Error loading deck {label}: {e}")
+            failed.append((label, e))
+            continue
+        decks.append(BatchDeck(source, deck, label, name, player=safe_filename(player), index=i, row=row))
+    return decks, failed
+
+
+def _load_config(target):
+    try:
+        return Config.from_file(target.config_file)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"config {target.name}: could not read {target.config_file}: {e}")
+
+
+def network_settings(targets):
+    """
+    The network settings (see network.DEFAULTS) the targets' configs set.
+
+    Every download of a batch shares one set of limits, so configs may only
+    set the same "network" object, or none.
+
+    Raises:
+        ValueError: If a config cannot be read, or two configs set different settings.
+    """
+    settings, source = {}, None
+    for target in targets:
+        config = _load_config(target)
+        if not config.network:
+            continue
+        if source is None:
+            settings, source = config.network, target.name
+        elif config.network != settings:
+            raise ValueError(
+                f"configs {source} and {target.name} set different network settings, but a batch downloads "
+                "with one set; give them the same \"network\" object or set it in one config only"
+            )
+    return settings
+
+
+def run_batch(sources, targets, tile_atlas=None):
+    """
+    Render every deck of every source with every target config.
+
+    Returns:
+        List of (config name or None, deck label, error) for everything that
+        failed. Decks that fail to load are reported once, with no config.
+    """
+    try:
+        from .melee_csv_parser import records_key, load_card_cache
+    except ImportError:
+        from decklister.melee_csv_parser import records_key, load_card_cache
+
+    start = time.perf_counter()
+    failures = []
+
+    # Load each deck source once; card names resolve through one shared cache
+    card_cache = load_card_cache()
+    decks = []
+    for source in sources:
+        try:
+            loaded, failed = load_decks(source, card_cache)
+        except Exception as e:
+            print(f"Error loading {source.path}: {e}")
+            failures.append((None, source.path, e))
+            continue
+        decks += loaded
+        failures += [(None, label, error) for label, error in failed]
+    load_seconds = time.perf_counter() - start
+
+    # One generator per config, and every output path planned before anything renders
+    plans = []
+    planned = {}  # path → (config, deck label)
+    for target in targets:
+        config = _load_config(target)
+        generator = DeckImageGenerator(
+            config=config, hyperspace=target.hyperspace, showcase=target.showcase,
+            tile_atlas=tile_atlas, variants=target.variants, preview=target.preview, outputs=target.outputs,
+            dedupe=target.dedupe,
+        )
+        jobs = []
+        for i, batch_deck in enumerate(decks):
+            job = DeckJob(
+                i, batch_deck.source.path, label=batch_deck.label, row=batch_deck.row, deck=batch_deck.deck,
+                output_path=target.output.format(config=target.name, **batch_deck.fields),
+                content_key=records_key(batch_deck.row) if target.dedupe and batch_deck.row else None,
+            )
+            for path in generator.planned_outputs(job):
+                if path in planned:
+                    other = planned[path]
+                    raise ValueError(
+                        f"{other[1]} ({other[0]}) and {job.label} ({target.name}) would both be written to {path}; "
+                        "add {config} or {name} to the output template"
+                    )
+                planned[path] = (target.name, job.label)
+            jobs.append(job)
+        plans.append((target, generator, jobs))
+    for directory in {os.path.dirname(path) for path in planned}:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # Download the union of every deck's images in every variant of every config at once
+    download_start = time.perf_counter()
+    cards = {key for _, generator, jobs in plans for job in jobs for key in generator.card_keys(job.deck)}
+    ImageDownloader.download_images_batch(list(cards))
+    download_seconds = time.perf_counter() - download_start
+
+    results = []
+    for target, generator, jobs in plans:
+        print(f"\n=== {target.name}: {len(jobs)} deck(s) with {target.config_file} ===")
+        target_start = time.perf_counter()
+        generator.run_jobs(jobs)
+        results.append((target, jobs, time.perf_counter() - target_start))
+        failures += [(target.name, job.label, job.error) for job in jobs if job.error is not None]
+
+    if tile_atlas is not None:
+        tile_atlas.save()
+    maintain_image_cache()
+    _print_summary(len(decks), len(sources), load_seconds, len(cards), download_seconds, results, failures,
+                   time.perf_counter() - start)
+    return failures
+
+
+def _print_summary(deck_count, source_count, load_seconds, card_count, download_seconds, results, failures, total_seconds):
+    print(f"\nBatch summary ({total_seconds:.1f}s)")
+    print(f"  {'load decks':<16}{load_seconds:7.1f}s  {deck_count} deck(s) from {source_count} source(s)")
+    print(f"  {'download':<16}{download_seconds:7.1f}s  {card_count} card image(s)")
+    for target, jobs, seconds in results:
+        failed = sum(1 for job in jobs if job.error is not None)
+        stages = {}
+        for job in jobs:
+            for stage, stage_seconds in job.timings.items():
+                stages[stage] = stages.get(stage, 0) + stage_seconds
+        outputs = sum(len(job.outputs) for job in jobs)
+        breakdown = ", ".join(f"{stage} {stages[stage]:.1f}s" for stage in ("render", "save") if stage in stages)
+        print(f"  {target.name:<16}{seconds:7.1f}s  {len(jobs) - failed} ok, {failed} failed, {outputs} file(s)"
+              + (f" ({breakdown})" if breakdown else ""))
+    if failures:
+        print(f"\n{len(failures)} failure(s):")
+        for config_name, label, error in failures:
+            print(f"  {config_name or 'load'}: {label}: {error}")
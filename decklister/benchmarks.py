@@ -0,0 +1,404 @@
+"""
+Micro-benchmarks for the rendering pipeline.
+
+Uses synthetic card images in a temporary folder, so no network access or
+image cache is needed.
+
+Usage:
+    python -m decklister.benchmarks grid [--repeat N]
+    python -m decklister.benchmarks live [--repeat N]
+    python -m decklister.benchmarks threads [--repeat N]
+    python -m decklister.benchmarks bands [--repeat N]
+    python -m decklister.benchmarks network [--repeat N]
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PIL import Image
+
+try:
+    from .config import Config
+    from .deck import Card, Deck
+    from .card_sizer import CardSizer
+    from .renderer import Renderer
+    from .live_renderer import LiveRenderer
+    from .png_writer import PngStreamWriter
+    from . import image_cache, image_downloader, network
+except ImportError:
+    from decklister.config import Config
+    from decklister.deck import Card, Deck
+    from decklister.card_sizer import CardSizer
+    from decklister.renderer import Renderer
+    from decklister.live_renderer import LiveRenderer
+    from decklister.png_writer import PngStreamWriter
+    from decklister import image_cache, image_downloader, network
+
+SOURCE_SIZE = (1117, 1560)  # Same size as swudb card images
+
+
+class _BenchRenderer(Renderer):
+    """Renderer that reads card images from a benchmark folder instead of the app cache."""
+
+    def __init__(self, config, image_dir, **kwargs):
+        super().__init__(config, **kwargs)
+        self.image_dir = image_dir
+
+    def _card_image_path(self, card):
+        return os.path.join(self.image_dir, card.card_set, f"{card.card_number}.png")
+
+
+class _NoCountOverlay:
+    """Count overlay stand-in for tiles that already carry their count."""
+
+    def apply(self, card_img, count):
+        return card_img
+
+
+def _make_deck(image_dir, main_count=60, sb_count=10):
+    """Build a deck of distinct synthetic cards and write their images."""
+    rng = random.Random(0)
+    os.makedirs(os.path.join(image_dir, "BEN"), exist_ok=True)
+    cards = []
+    for i in range(1, main_count + sb_count + 1):
+        number = str(i).zfill(3)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        Image.new("RGB", SOURCE_SIZE, color).save(os.path.join(image_dir, "BEN", f"{number}.png"))
+        cards.append(Card({"id": f"BEN_{number}", "count": rng.randint(1, 3)}))
+    return Deck(main_deck=cards[:main_count], sideboard=cards[main_count:])
+
+
+def _bench_config(resolution):
+    w, h = resolution
+    return Config(
+        resolution=resolution,
+        layers=[[30, 30, 30], {"type": "cards"}],
+        deck_area=[int(w * 0.2), int(h * 0.08), int(w * 0.97), int(h * 0.68)],
+        sb_area=[int(w * 0.2), int(h * 0.72), int(w * 0.97), int(h * 0.94)],
+    )
+
+
+def _time(fn, repeat):
+    """Best-of-N wall time in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_grid(repeat=3):
+    """Time compositing prepared tiles into a 60-card + sideboard layout."""
+    image_dir = tempfile.mkdtemp(prefix="decklister_bench_")
+    try:
+        deck = _make_deck(image_dir)
+        for resolution in [(1920, 1080), (3840, 2160)]:
+            config = _bench_config(resolution)
+            deck_layout = CardSizer.calculate(config.deck_area, len(deck.main_deck), config.padding)
+            sb_layout = CardSizer.calculate(config.sb_area, len(deck.sideboard), config.padding)
+
+            renderer = _BenchRenderer(config, image_dir)
+            # Prepare every tile (decode, mask, resize, count) up front so the
+            # timing isolates compositing.
+            tiles = {}
+            for cards, layout in [(deck.main_deck, deck_layout), (deck.sideboard, sb_layout)]:
+                for card in cards:
+                    tile = renderer._load_card_image(card, layout[0], layout[1])
+                    tiles[card.card_number] = renderer.count_overlay.apply(tile, card.count)
+            renderer._load_card_image = lambda card, w, h: tiles[card.card_number]
+            renderer.count_overlay = _NoCountOverlay()
+
+            def draw():
+                canvas = Image.new("RGBA", config.resolution, (30, 30, 30, 255))
+                renderer._draw_card_grid(canvas, deck.main_deck, config.deck_area, deck_layout)
+                renderer._draw_card_grid(canvas, deck.sideboard, config.sb_area, sb_layout)
+
+            elapsed = _time(draw, repeat)
+            print(f"{resolution[0]}x{resolution[1]}: {elapsed * 1000:.1f} ms for {len(tiles)} tiles")
+    finally:
+        shutil.rmtree(image_dir, ignore_errors=True)
+
+
+class _BenchLiveRenderer(LiveRenderer):
+    """LiveRenderer that never touches the image downloader."""
+
+    def _download_images(self, cards):
+        pass
+
+
+def bench_live(repeat=3):
+    """Compare a full render with a live update after one sideboard count change."""
+    image_dir = tempfile.mkdtemp(prefix="decklister_bench_")
+    try:
+        deck = _make_deck(image_dir, main_count=30, sb_count=10)
+        for resolution in [(1920, 1080), (3840, 2160)]:
+            background = os.path.join(image_dir, f"background_{resolution[0]}.png")
+            Image.effect_noise(resolution, 40).convert("RGB").save(background)
+            config = _bench_config(resolution)
+            config.layers = [background, {"type": "cards"}]
+
+            live = _BenchLiveRenderer(config, renderer=_BenchRenderer(config, image_dir, tile_cache={}))
+            before = live.render(deck)  # Warm the layer and tile caches
+
+            changed_card = Card({"id": f"{deck.sideboard[0].card_set}_{deck.sideboard[0].card_number}", "count": 9})
+            changed = Deck(deck.leaders, deck.bases, deck.main_deck, [changed_card] + deck.sideboard[1:])
+            live.update(deck, before, changed)  # Warm the changed tile
+
+            full = _time(lambda: live.render(changed), repeat)
+            update = _time(lambda: live.update(deck, before, changed), repeat)
+            print(
+                f"{resolution[0]}x{resolution[1]}: full render {full * 1000:.1f} ms, "
+                f"live update {update * 1000:.1f} ms ({full / update:.1f}x)"
+            )
+    finally:
+        shutil.rmtree(image_dir, ignore_errors=True)
+
+
+def bench_threads(repeat=3):
+    """Compare cold-tile renders (decode, mask, resize, count every card) across tile thread counts."""
+    image_dir = tempfile.mkdtemp(prefix="decklister_bench_")
+    try:
+        deck = _make_deck(image_dir)
+        for resolution in [(1920, 1080), (3840, 2160)]:
+            config = _bench_config(resolution)
+            deck_layout = CardSizer.calculate(config.deck_area, len(deck.main_deck), config.padding)
+            sb_layout = CardSizer.calculate(config.sb_area, len(deck.sideboard), config.padding)
+
+            results = []
+            for threads in (1, 2, 4, os.cpu_count() or 1):
+                if any(t == threads for t, _ in results):
+                    continue
+                config.render_threads = threads
+                # No tile cache, so every render prepares every tile from its PNG
+                renderer = _BenchRenderer(config, image_dir)
+                elapsed = _time(lambda: renderer.render(deck, deck_layout, sb_layout), repeat)
+                results.append((threads, elapsed))
+
+            base = results[0][1]
+            print(f"{resolution[0]}x{resolution[1]}: " + ", ".join(
+                f"{threads} thread(s) {elapsed * 1000:.0f} ms ({base / elapsed:.2f}x)" for threads, elapsed in results
+            ))
+    finally:
+        shutil.rmtree(image_dir, ignore_errors=True)
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB (Linux/macOS only)."""
+    import resource
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _render_to_png(image_dir, background, resolution, band_height, out_path, results):
+    """Child process body for bench_bands: render one deck to a PNG and report time and memory."""
+    deck = _bench_deck(image_dir)
+    config = _bench_config(resolution)
+    config.layers = [background, {"type": "cards"}, {"type": "color", "color": [0, 0, 0, 40]}]
+    deck_layout = CardSizer.calculate(config.deck_area, len(deck.main_deck), config.padding)
+    sb_layout = CardSizer.calculate(config.sb_area, len(deck.sideboard), config.padding)
+    renderer = _BenchRenderer(config, image_dir)
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if band_height:
+        with PngStreamWriter(out_path, resolution) as writer:
+            for band in renderer.render_bands(deck, deck_layout, sb_layout, band_height):
+                writer.write(band)
+    else:
+        renderer.render(deck, deck_layout, sb_layout).save(out_path)
+    results.put((time.perf_counter() - start, _peak_rss_mb() - baseline))
+
+
+def _bench_deck(image_dir):
+    """The deck written by _make_deck, rebuilt without rewriting its images."""
+    cards = [Card({"id": f"BEN_{name[:-4]}", "count": 2}) for name in sorted(os.listdir(os.path.join(image_dir, "BEN")))]
+    return Deck(main_deck=cards[:60], sideboard=cards[60:])
+
+
+def bench_bands(repeat=1):
+    """
+    Compare peak memory of a whole-image render + save with a banded render streamed to PNG, at 8K.
+
+    Runs with an 8K background and with a 1080p one stretched to 8K. The
+    decoded background is kept whole in every mode, so it bounds how far
+    bands can go with the first.
+    """
+    image_dir = tempfile.mkdtemp(prefix="decklister_bench_")
+    try:
+        _make_deck(image_dir)
+        resolution = (7680, 4320)
+        for source in [resolution, (1920, 1080)]:
+            background = os.path.join(image_dir, f"background_{source[1]}.png")
+            Image.effect_noise(source, 40).convert("RGB").save(background)
+            # A fresh process per run, so peak RSS isn't inherited from an earlier one
+            context = multiprocessing.get_context("spawn")
+            for label, band_height in [("whole image", None), ("bands of 512", 512), ("bands of 128", 128)]:
+                results = context.Queue()
+                best = None
+                for _ in range(repeat):
+                    out_path = os.path.join(image_dir, "out.png")
+                    process = context.Process(
+                        target=_render_to_png, args=(image_dir, background, resolution, band_height, out_path, results)
+                    )
+                    process.start()
+                    elapsed, peak = results.get()
+                    process.join()
+                    best = (elapsed, peak) if best is None else min(best, (elapsed, peak))
+                print(
+                    f"{resolution[0]}x{resolution[1]}, {source[1]}p background, {label}: "
+                    f"{best[0]:.1f} s, peak memory +{best[1]:.0f} MB"
+                )
+    finally:
+        shutil.rmtree(image_dir, ignore_errors=True)
+
+
+class StubCdn:
+    """
+    Local stand-in for swudb.com, for the network benchmark and tests.
+
+    Answers every GET with a small PNG after `latency` seconds. With more
+    than `capacity` requests in flight, it either refuses the extra ones with
+    a 429 (overload="refuse", with a Retry-After header if `retry_after` is
+    set) or slows every response down in proportion (overload="queue").
+
+        with StubCdn(latency=0.05, capacity=6) as cdn:
+            image_downloader.CDN_BASE = cdn.url + "/images/cards"
+    """
+
+    def __init__(self, latency=0.05, capacity=None, overload="refuse", retry_after=None):
+        self.latency = latency
+        self.capacity = capacity
+        self.overload = overload
+        self.retry_after = retry_after
+        self.requests = 0
+        self.refused = 0
+        self.in_flight = 0
+        self.peak = 0  # Most requests in flight at once
+        self.starts = []  # time.monotonic() of every request
+        self._lock = threading.Lock()
+        buffer = io.BytesIO()
+        Image.new("RGB", (8, 8), (120, 90, 60)).save(buffer, "PNG")
+        self._body = buffer.getvalue()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub._serve(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _serve(self, handler):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.starts.append(time.monotonic())
+            load = self.in_flight
+        try:
+            over = self.capacity is not None and load > self.capacity
+            if over and self.overload == "refuse":
+                with self._lock:
+                    self.refused += 1
+                handler.send_response(429)
+                if self.retry_after is not None:
+                    handler.send_header("Retry-After", str(self.retry_after))
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+            time.sleep(self.latency * (load / self.capacity if over else 1))
+            handler.send_response(200)
+            handler.send_header("Content-Type", "image/png")
+            handler.send_header("Content-Length", str(len(self._body)))
+            handler.end_headers()
+            handler.wfile.write(self._body)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _download_from(cdn, cards, settings):
+    """Download cards from a StubCdn into an empty image cache. Returns (seconds, failed cards)."""
+    cache_dir = tempfile.mkdtemp(prefix="decklister_bench_")
+    saved = (image_downloader.CDN_BASE, image_cache.get_image_cache_dir, dict(network._settings))
+    image_downloader.CDN_BASE = cdn.url + "/images/cards"
+    image_cache.get_image_cache_dir = lambda: cache_dir
+    try:
+        network.configure(**settings)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # One line per image otherwise
+            failed = image_downloader.download_images_batch(cards)
+        return time.perf_counter() - start, failed
+    finally:
+        image_downloader.CDN_BASE, image_cache.get_image_cache_dir = saved[:2]
+        network.configure(**saved[2])
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def bench_network(repeat=1):
+    """Compare the old fixed 8-thread downloader with adaptive concurrency against a local stub CDN."""
+    cards = [("BEN", str(i)) for i in range(1, 301)]
+    # The downloader before adaptive concurrency: 8 requests in flight, no limits, no retries
+    fixed = {"concurrency": 8, "min_concurrency": 8, "max_concurrency": 8, "rate_limit": 0, "latency_factor": 0, "retries": 0}
+    scenarios = [
+        ("healthy CDN (100 ms, capacity 64)", {"latency": 0.1, "capacity": 64}),
+        ("constrained CDN (100 ms, 429 over 6 in flight)", {"latency": 0.1, "capacity": 6}),
+        ("congested CDN (100 ms, slower over 6 in flight)", {"latency": 0.1, "capacity": 6, "overload": "queue"}),
+    ]
+    for label, stub in scenarios:
+        for policy, settings in [("fixed 8", fixed), ("adaptive", dict(network.DEFAULTS))]:
+            best = None
+            for _ in range(repeat):
+                with StubCdn(**stub) as cdn:
+                    elapsed, failed = _download_from(cdn, cards, settings)
+                    result = (elapsed, len(failed), cdn.refused, cdn.peak)
+                best = result if best is None else min(best, result)
+            elapsed, failed, refused, peak = best
+            print(f"{label}, {policy}: {len(cards)} images in {elapsed:.2f} s, {failed} failed, "
+                  f"{refused} refused (429), up to {peak} in flight")
+
+
+BENCHMARKS = {
+    "grid": bench_grid,
+    "live": bench_live,
+    "threads": bench_threads,
+    "bands": bench_bands,
+    "network": bench_network,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run decklister rendering and download benchmarks.")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS), help="Benchmark to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per measurement (best is reported)")
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
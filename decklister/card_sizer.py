@@ -1,6 +1,100 @@
+import functools
 import math
 
 
+def _fit(avail_width, avail_height, card_count, padding, aspect_ratio, cols, max_card_width):
+    """
+    Largest card that fits when the grid uses `cols` columns.
+
+    Returns:
+        (card_width, card_height, cols, rows, height_limited). card_width and
+        card_height are 0 if nothing fits.
+    """
+    rows = math.ceil(card_count / cols)
+
+    # Max card width given available width and padding between columns
+    max_w = (avail_width - (cols - 1) * padding) / cols
+    # Max card height given available height and padding between rows
+    max_h = (avail_height - (rows - 1) * padding) / rows
+
+    # The card must satisfy the aspect ratio. Pick the limiting dimension.
+    # card_width = card_height * aspect_ratio
+    height_limited = max_h * aspect_ratio <= max_w
+
+    if max_w <= 0 or max_h <= 0:
+        return (0, 0, cols, rows, height_limited)
+
+    if height_limited:
+        card_width = int(max_h * aspect_ratio)
+        card_height = int(max_h)
+    else:
+        card_width = int(max_w)
+        card_height = int(max_w / aspect_ratio)
+
+    if max_card_width is not None and card_width > max_card_width:
+        card_width = int(max_card_width)
+        card_height = int(max_card_width / aspect_ratio)
+
+    if card_width <= 0 or card_height <= 0:
+        return (0, 0, cols, rows, height_limited)
+    return (card_width, card_height, cols, rows, height_limited)
+
+
+@functools.lru_cache(maxsize=4096)
+def _solve(avail_width, avail_height, card_count, padding, aspect_ratio, columns, max_card_width):
+    """Memoized layout solver. All arguments must be hashable."""
+    def fit(cols):
+        return _fit(avail_width, avail_height, card_count, padding, aspect_ratio, cols, max_card_width)
+
+    if columns is not None:
+        card_width, card_height, cols, rows, _ = fit(max(1, min(columns, card_count)))
+        if card_width <= 0:
+            return None
+        return (card_width, card_height, cols, rows, padding)
+
+    # As columns increase, the width available per card shrinks and the height
+    # available per card grows (fewer rows), so the grid is height-limited for
+    # every column count up to some crossover and width-limited after it.
+    # Card area rises up to the crossover and falls after it, so the best
+    # layout is the last height-limited or first width-limited column count.
+    lo, hi = 1, card_count
+    crossover = 0  # Last height-limited column count (0 = none)
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if fit(mid)[4]:
+            crossover = mid
+            lo = mid + 1
+        else:
+            hi = mid - 1
+
+    best = None  # (card_width, card_height, cols, rows)
+    for cols in (crossover, crossover + 1):
+        if not 1 <= cols <= card_count:
+            continue
+        card_width, card_height, _, rows, _ = fit(cols)
+        if card_width <= 0:
+            continue
+        if best is None or card_width * card_height > best[0] * best[1]:
+            best = (card_width, card_height, cols, rows)
+        elif card_width * card_height == best[0] * best[1] and cols > best[2]:
+            best = (card_width, card_height, cols, rows)
+
+    if best is None:
+        return None
+
+    # When card area is equal, prefer more columns for better horizontal fill.
+    # Equal areas past the best column count are contiguous, so walk forward.
+    cols = best[2] + 1
+    while cols <= card_count:
+        card_width, card_height, _, rows, _ = fit(cols)
+        if card_width * card_height != best[0] * best[1]:
+            break
+        best = (card_width, card_height, cols, rows)
+        cols += 1
+
+    return (best[0], best[1], best[2], best[3], padding)
+
+
 class CardSizer:
     """
     Calculates the largest card size that fits a given number of cards
@@ -10,16 +104,22 @@ class CardSizer:
     DEFAULT_ASPECT_RATIO = 5.0 / 7.0  # width / height
 
     @staticmethod
-    def calculate(area, card_count, padding=3, aspect_ratio=None):
+    def calculate(area, card_count, padding=3, aspect_ratio=None, columns=None, max_card_width=None):
         """
         Given a rectangular area and a number of cards, find the largest card
         size that fits all cards in a grid layout.
 
+        Only the column counts around the height/width-limited crossover are
+        evaluated, and results are memoized, so repeated decks of the same
+        size cost a dictionary lookup.
+
         Args:
             area: (x0, y0, x1, y1) rectangle to fill.
             card_count: Number of cards to place.
             padding: Space between cards in pixels.
             aspect_ratio: Card width / height ratio. Defaults to 5/7.
+            columns: Fixed column count. If None, the best count is chosen.
+            max_card_width: Upper bound on card width in pixels (optional).
 
         Returns:
             (card_width, card_height, cols, rows, padding) or None if card_count is 0.
@@ -37,44 +137,107 @@ class CardSizer:
         if avail_width <= 0 or avail_height <= 0:
             return None
 
-        best = None  # (card_width, card_height, cols, rows, padding)
+        return _solve(avail_width, avail_height, card_count, padding, aspect_ratio, columns, max_card_width)
 
-        # Try every possible column count from 1 to card_count.
-        # For each, compute the required rows and the largest card that fits.
-        for cols in range(1, card_count + 1):
-            rows = math.ceil(card_count / cols)
+    @staticmethod
+    def split_area(area, deck_count, sb_count, padding=3, aspect_ratio=None, axis="height", gap=None,
+                   deck_columns=None, sb_columns=None, max_card_width=None):
+        """
+        Split one rectangle between the main deck and the sideboard so that the
+        smaller of the two card sizes is as large as possible.
+
+        Args:
+            area: (x0, y0, x1, y1) rectangle holding both grids.
+            deck_count: Number of main deck cards.
+            sb_count: Number of sideboard cards.
+            padding: Space between cards in pixels.
+            aspect_ratio: Card width / height ratio. Defaults to 5/7.
+            axis: "height" stacks the sideboard below the deck; "width" puts it to the right.
+            gap: Space between the two areas. Defaults to padding.
+            deck_columns, sb_columns, max_card_width: Passed through to calculate().
+
+        Returns:
+            (deck_area, sb_area). sb_area is None when there is no sideboard.
+        """
+        if axis not in ("height", "width"):
+            raise ValueError(f"split axis must be 'height' or 'width', not {axis!r}")
+        x0, y0, x1, y1 = area
+        if sb_count <= 0:
+            return (list(area), None)
+        if deck_count <= 0:
+            return (None, list(area))
+
+        gap = padding if gap is None else gap
+        start, end = (y0, y1) if axis == "height" else (x0, x1)
+
+        def areas(split):
+            if axis == "height":
+                return [x0, y0, x1, split], [x0, split + gap, x1, y1]
+            return [x0, y0, split, y1], [split + gap, y0, x1, y1]
+
+        def widths(split):
+            deck_area, sb_area = areas(split)
+            deck = CardSizer.calculate(deck_area, deck_count, padding, aspect_ratio, deck_columns, max_card_width)
+            sb = CardSizer.calculate(sb_area, sb_count, padding, aspect_ratio, sb_columns, max_card_width)
+            return (deck[0] if deck else 0, sb[0] if sb else 0)
+
+        # Deck card size grows with the split position and sideboard card size
+        # shrinks, so find the first split where the deck catches up.
+        lo, hi = start + 1, end - gap - 1
+        if lo > hi:
+            return areas((start + end) // 2)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            deck_w, sb_w = widths(mid)
+            if deck_w >= sb_w:
+                hi = mid
+            else:
+                lo = mid + 1
 
-            # Max card width given available width and padding between columns
-            max_w = (avail_width - (cols - 1) * padding) / cols
-            # Max card height given available height and padding between rows
-            max_h = (avail_height - (rows - 1) * padding) / rows
+        candidates = [s for s in (lo - 1, lo) if start + 1 <= s <= end - gap - 1]
+        best = max(candidates, key=lambda s: (min(widths(s)), -s))
+        return areas(best)
 
-            if max_w <= 0 or max_h <= 0:
-                continue
+    @staticmethod
+    def layout_for_config(config, deck_count, sb_count):
+        """
+        Resolve the deck and sideboard areas and layouts for a config.
 
-            # The card must satisfy the aspect ratio. Pick the limiting dimension.
-            # card_width = card_height * aspect_ratio
-            card_w_from_h = max_h * aspect_ratio
-            card_h_from_w = max_w / aspect_ratio
+        Handles split_area, fixed column counts, max_card_width, and
+        uniform_card_size.
 
-            if card_w_from_h <= max_w:
-                # Height is the limiting factor
-                card_width = int(card_w_from_h)
-                card_height = int(max_h)
-            else:
-                # Width is the limiting factor
-                card_width = int(max_w)
-                card_height = int(card_h_from_w)
-
-            if card_width <= 0 or card_height <= 0:
-                continue
-
-            # Maximize card area (width * height) to get the best visual fill.
-            # When card area is equal, prefer more columns for better horizontal fill.
-            card_area = card_width * card_height
-            if best is None or card_area > best[0] * best[1]:
-                best = (card_width, card_height, cols, rows, padding)
-            elif card_area == best[0] * best[1] and cols > best[2]:
-                best = (card_width, card_height, cols, rows, padding)
-
-        return best
+        Returns:
+            (deck_area, deck_layout, sb_area, sb_layout). Layouts are None when
+            the area or card count is missing.
+        """
+        padding = config.padding
+        deck_area, sb_area = config.deck_area, config.sb_area
+        if config.split_area is not None:
+            deck_area, sb_area = CardSizer.split_area(
+                config.split_area, deck_count, sb_count, padding,
+                axis=config.split_axis,
+                deck_columns=config.deck_columns,
+                sb_columns=config.sb_columns,
+                max_card_width=config.max_card_width,
+            )
+
+        deck_layout = sb_layout = None
+        if deck_area is not None and deck_count > 0:
+            deck_layout = CardSizer.calculate(
+                deck_area, deck_count, padding,
+                columns=config.deck_columns, max_card_width=config.max_card_width,
+            )
+        if sb_area is not None and sb_count > 0:
+            sb_layout = CardSizer.calculate(
+                sb_area, sb_count, padding,
+                columns=config.sb_columns, max_card_width=config.max_card_width,
+            )
+
+        # If uniform sizing, use the smaller card size for both
+        if config.uniform_card_size and deck_layout and sb_layout:
+            min_width = min(deck_layout[0], sb_layout[0])
+            min_height = min(deck_layout[1], sb_layout[1])
+            deck_layout = (min_width, min_height, deck_layout[2], deck_layout[3], deck_layout[4])
+            sb_layout = (min_width, min_height, sb_layout[2], sb_layout[3], sb_layout[4])
+
+        return (deck_area, deck_layout, sb_area, sb_layout)
@@ -1,3 +1,4 @@
+import copy
 import json
 
 
@@ -13,6 +14,16 @@ class Config:
         count_background=None,
         padding=3,
         uniform_card_size=True,
+        deck_columns=None,
+        sb_columns=None,
+        max_card_width=None,
+        split_area=None,
+        split_axis="height",
+        render_threads=1,
+        outputs=None,
+        band_height=None,
+        offline_missing="fail",
+        network=None,
     ):
         self.resolution = tuple(resolution)
         self.layers = layers or []  # Ordered list of layer specs; see from_file for format
@@ -23,6 +34,69 @@ class Config:
         self.count_background = count_background  # Path to image
         self.padding = padding  # Padding between individual card images
         self.uniform_card_size = uniform_card_size
+        self.deck_columns = deck_columns  # Fixed column count for deck_area (None = best fit)
+        self.sb_columns = sb_columns  # Fixed column count for sb_area (None = best fit)
+        self.max_card_width = max_card_width  # Upper bound on grid card width in pixels
+        self.split_area = split_area  # [x0, y0, x1, y1] shared by deck and sideboard; overrides deck_area/sb_area
+        self.split_axis = split_axis  # "height" (sideboard below deck) or "width" (sideboard to the right)
+        self.render_threads = render_threads  # Threads preparing card tiles within one render (1 = no pool)
+        self.outputs = outputs or []  # Output specs (dicts, see outputs.OutputSpec); empty = one full-size PNG
+        self.band_height = band_height  # Render and encode in horizontal bands of this height (None = whole image)
+        self.offline_missing = offline_missing  # With --offline: "fail" before rendering, or render "placeholder"s
+        self.network = network or {}  # Download concurrency and rate limit settings; see network.DEFAULTS
+
+    def asset_paths(self):
+        """Every file this config refers to: image layers, fonts, and the count background."""
+        paths = set()
+        for layer in self.layers:
+            if isinstance(layer, str):
+                paths.add(layer)
+            elif isinstance(layer, dict):
+                if layer.get("type") == "image" and layer.get("path"):
+                    paths.add(layer["path"])
+                if layer.get("type") in ("text", "csv_field") and layer.get("font"):
+                    paths.add(layer["font"])
+        if isinstance(self.count_background, str):
+            paths.add(self.count_background)
+        return paths
+
+    def scaled(self, factor):
+        """
+        Return a copy with every pixel measurement multiplied by factor.
+
+        Resolution, card areas, padding, max_card_width, and image/text layer
+        areas, positions, and font sizes are scaled; everything else is shared.
+        Used for draft previews and for outputs smaller than the main canvas.
+        """
+        def px(value):
+            return int(round(value * factor))
+
+        def rect(values):
+            return [px(v) for v in values] if values is not None else None
+
+        layers = []
+        for layer in self.layers:
+            if isinstance(layer, dict):
+                layer = dict(layer)
+                for key in ("area", "position"):
+                    if layer.get(key) is not None:
+                        layer[key] = rect(layer[key])
+                if layer.get("type") in ("text", "csv_field"):
+                    layer["size"] = max(1, px(layer.get("size", 48)))
+            layers.append(layer)
+
+        config = copy.copy(self)
+        config.resolution = tuple(max(1, px(v)) for v in self.resolution)
+        config.layers = layers
+        config.leader_areas = [rect(a) for a in self.leader_areas]
+        config.base_areas = [rect(a) for a in self.base_areas]
+        config.deck_area = rect(self.deck_area)
+        config.sb_area = rect(self.sb_area)
+        config.split_area = rect(self.split_area)
+        config.padding = px(self.padding)
+        if self.max_card_width is not None:
+            config.max_card_width = max(1, px(self.max_card_width))
+        return config
 
     @classmethod
     def from_file(cls, path):
@@ -73,4 +147,14 @@ class Config:
             count_background=data.get("count_background"),
             padding=data.get("padding", 3),
             uniform_card_size=data.get("uniform_card_size", True),
+            deck_columns=data.get("deck_columns"),
+            sb_columns=data.get("sb_columns"),
+            max_card_width=data.get("max_card_width"),
+            split_area=data.get("split_area"),
+            split_axis=data.get("split_axis", "height"),
+            render_threads=data.get("render_threads", 1),
+            outputs=data.get("outputs"),
+            band_height=data.get("band_height"),
+            offline_missing=data.get("offline_missing", "fail"),
+            network=data.get("network"),
         )
@@ -2,6 +2,58 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog
 from PIL import Image, ImageTk  # Requires pillow: pip install pillow
 import json
+import os
+import threading
+
+try:
+    from .config import Config
+    from .deck import Deck
+    from .card_sizer import CardSizer
+    from .renderer import Renderer
+    from . import image_downloader as ImageDownloader
+except ImportError:
+    from decklister.config import Config
+    from decklister.deck import Deck
+    from decklister.card_sizer import CardSizer
+    from decklister.renderer import Renderer
+    from decklister import image_downloader as ImageDownloader
+
+# Largest canvas shown on screen. Bigger backgrounds are downscaled for display;
+# drawn areas are still stored and exported in full-resolution coordinates.
+MAX_DISPLAY_SIZE = (1600, 900)
+PREVIEW_DELAY_MS = 120  # Debounce for live preview renders while dragging
+
+# Area names that may be drawn several times; the preview merges them into
+# the Config lists (the export keeps each area under the name it was drawn with)
+LIST_AREAS = {"leader_areas": "leader_areas", "leader_area": "leader_areas",
+              "base_areas": "base_areas", "base_area": "base_areas"}
+PREVIEW_AREAS = ("deck_area", "sb_area", "split_area")
+
+
+def areas_to_config(resolution, rects):
+    """
+    Build the exported config dict from named rectangles.
+
+    Args:
+        resolution: [width, height] of the full-resolution canvas.
+        rects: List of (name, [x0, y0, x1, y1]) in full-resolution coordinates.
+    """
+    config = {"resolution": list(resolution)}
+    for name, coords in rects:
+        config[name] = list(coords)
+    return config
+
+
+def preview_areas(rects):
+    """The Config area arguments for named rectangles, for the live preview."""
+    areas = {}
+    for name, coords in rects:
+        if name in LIST_AREAS:
+            areas.setdefault(LIST_AREAS[name], []).append(list(coords))
+        elif name in PREVIEW_AREAS:
+            areas[name] = list(coords)
+    return areas
+
 
 class AreaDrawer:
     def __init__(self, master):
@@ -9,16 +61,36 @@ class AreaDrawer:
         self.master.title("Config Area Drawer")
         self.canvas = tk.Canvas(master, width=1920, height=1080, bg="white", scrollregion=(0,0,1920,1080))
         self.canvas.pack(fill=tk.BOTH, expand=True)
-        self.rects = [] # List of dicts: {"name": ..., "coords": [...]}
+        self.rects = [] # List of (name, [x0, y0, x1, y1]) in full-resolution coordinates
+        self.rect_items = []  # (rectangle id, text id) per entry in self.rects
         self.start_x = self.start_y = None
         self.current_rect = None
         self.bg_image = None
         self.bg_image_id = None
+        self.bg_path = None
         self.resolution = [1920, 1080]
+        self.display_scale = 1.0  # Canvas pixels per full-resolution pixel
+
+        # Live preview state
+        self.sample_deck = None
+        self.preview_var = tk.BooleanVar(value=False)
+        self.preview_image = None
+        self.preview_image_id = None
+        self._preview_after_id = None
+        # One draft renderer per canvas size and background: its tile cache keeps
+        # downscaled card tiles while areas are moved, and is emptied when a
+        # resize changes the tile sizes, so it only ever holds one layout.
+        self._preview_renderer = None
+        self._preview_layers_key = None  # (resolution, background) the renderer was made for
+        self._preview_tiles_key = None  # Tile sizes of the last preview
+        self._moving = None  # (index into self.rects, last x, last y) during a right-drag
 
         self.canvas.bind("<ButtonPress-1>", self.on_press)
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        self.canvas.bind("<ButtonPress-3>", self.on_move_press)
+        self.canvas.bind("<B3-Motion>", self.on_move_drag)
+        self.canvas.bind("<ButtonRelease-3>", self.on_move_release)
 
         menu = tk.Menu(master)
         master.config(menu=menu)
@@ -28,23 +100,49 @@ class AreaDrawer:
         file_menu.add_command(label="Set Resolution", command=self.set_resolution)
         file_menu.add_command(label="Export JSON", command=self.export_json)
         file_menu.add_command(label="Clear", command=self.clear_canvas)
+        preview_menu = tk.Menu(menu, tearoff=0)
+        menu.add_cascade(label="Preview", menu=preview_menu)
+        preview_menu.add_command(label="Load Sample Deck", command=self.load_sample_deck)
+        preview_menu.add_checkbutton(label="Live Preview", variable=self.preview_var, command=self.toggle_preview)
+
+    # --- Coordinates ---
+
+    def _set_display_size(self, width, height):
+        """Fit a full-resolution canvas of width x height on screen and resize the window."""
+        self.resolution = [width, height]
+        self.display_scale = min(1.0, MAX_DISPLAY_SIZE[0] / width, MAX_DISPLAY_SIZE[1] / height)
+        shown_w, shown_h = self._to_display(width), self._to_display(height)
+        self.canvas.config(width=shown_w, height=shown_h, scrollregion=(0, 0, shown_w, shown_h))
+        self.master.geometry(f"{shown_w}x{shown_h}")
+
+    def _to_display(self, value):
+        return int(round(value * self.display_scale))
+
+    def _to_config(self, value):
+        return int(round(value / self.display_scale))
 
     def load_background(self):
         file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.png;*.jpg;*.jpeg;*.bmp;*.gif")])
         if file_path:
             img = Image.open(file_path)
-            width, height = img.size  # Use the image's native resolution
-            img = img.resize((width, height), Image.Resampling.LANCZOS)
+            width, height = img.size  # Config resolution is the image's native resolution
+            self._set_display_size(width, height)
+            shown = (self._to_display(width), self._to_display(height))
+            if shown != img.size:
+                img.draft("RGB", shown)  # JPEGs decode at a reduced size directly
+                img = img.resize(shown, Image.Resampling.BILINEAR, reducing_gap=2.0)
             self.bg_image = ImageTk.PhotoImage(img)
             if self.bg_image_id:
                 self.canvas.delete(self.bg_image_id)
             self.bg_image_id = self.canvas.create_image(0, 0, anchor="nw", image=self.bg_image)
-            self.canvas.config(width=width, height=height, scrollregion=(0, 0, width, height))
-            self.master.geometry(f"{width}x{height}")
-            self.resolution = [width, height]  # Store for export_json
             self.canvas.tag_lower(self.bg_image_id)
+            self.bg_path = file_path
+            self._redraw_rects()
+            self.schedule_preview()
         else:
-            self.resolution = [1920, 1080]  # Default if no image loaded
+            self._set_display_size(1920, 1080)  # Default if no image loaded
+
+    # --- Drawing ---
 
     def on_press(self, event):
         self.start_x = self.canvas.canvasx(event.x)
@@ -58,24 +156,65 @@ class AreaDrawer:
 
     def on_release(self, event):
         x0, y0, x1, y1 = self.canvas.coords(self.current_rect)
-        rect = [int(min(x0, x1)), int(min(y0, y1)), int(max(x0, x1)), int(max(y0, y1))]
+        rect = [self._to_config(min(x0, x1)), self._to_config(min(y0, y1)),
+                self._to_config(max(x0, x1)), self._to_config(max(y0, y1))]
         # Ask user for a name for this rectangle
         name = simpledialog.askstring("Rectangle Name", "Enter a name for this area:", parent=self.master)
         if name:
             self.rects.append((name, rect))
-            # Optionally, draw the name on the canvas
-            self.canvas.create_text((rect[0]+rect[2])//2, (rect[1]+rect[3])//2, text=name, fill="blue")
+            self.canvas.delete(self.current_rect)
+            self.rect_items.append(self._draw_rect(name, rect))
+            self.schedule_preview()
         else:
             # If no name is given, remove the rectangle
             self.canvas.delete(self.current_rect)
 
+    def _draw_rect(self, name, rect):
+        """Draw a named area (full-resolution coords) on the display canvas. Returns the item ids."""
+        x0, y0, x1, y1 = (self._to_display(v) for v in rect)
+        rect_id = self.canvas.create_rectangle(x0, y0, x1, y1, outline="red")
+        text_id = self.canvas.create_text((x0 + x1) // 2, (y0 + y1) // 2, text=name, fill="blue")
+        return (rect_id, text_id)
+
+    def _redraw_rects(self):
+        for rect_id, text_id in self.rect_items:
+            self.canvas.delete(rect_id)
+            self.canvas.delete(text_id)
+        self.rect_items = [self._draw_rect(name, rect) for name, rect in self.rects]
+
+    # Right-drag moves an existing area, with the preview following it
+    def on_move_press(self, event):
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        fx, fy = self._to_config(x), self._to_config(y)
+        self._moving = None
+        for i in reversed(range(len(self.rects))):
+            x0, y0, x1, y1 = self.rects[i][1]
+            if x0 <= fx <= x1 and y0 <= fy <= y1:
+                self._moving = (i, x, y)
+                return
+
+    def on_move_drag(self, event):
+        if self._moving is None:
+            return
+        i, last_x, last_y = self._moving
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        name, rect = self.rects[i]
+        dx, dy = self._to_config(x) - self._to_config(last_x), self._to_config(y) - self._to_config(last_y)
+        if dx or dy:
+            self.rects[i] = (name, [rect[0] + dx, rect[1] + dy, rect[2] + dx, rect[3] + dy])
+            for item in self.rect_items[i]:
+                self.canvas.move(item, x - last_x, y - last_y)
+            self._moving = (i, x, y)
+            self.schedule_preview()
+
+    def on_move_release(self, event):
+        if self._moving is not None:
+            self._redraw_rects()  # Snap the outline to the stored coordinates
+        self._moving = None
+
     def export_json(self):
         # Use the current resolution (set by background image or default)
-        config = {
-            "resolution": getattr(self, "resolution", [1920, 1080])
-        }
-        for name, coords in self.rects:
-            config[name] = coords
+        config = areas_to_config(getattr(self, "resolution", [1920, 1080]), self.rects)
         file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
         if file_path:
             with open(file_path, "w", encoding="utf-8") as f:
@@ -85,8 +224,117 @@ class AreaDrawer:
     def clear_canvas(self):
         self.canvas.delete("all")
         self.rects.clear()
+        self.rect_items.clear()
         self.bg_image_id = None
         self.bg_image = None
+        self.bg_path = None
+        self.preview_image_id = None
+        self.preview_image = None
+
+    # --- Live preview ---
+
+    def load_sample_deck(self):
+        """Ask for a sample deck and load it in the background. Returns False if none was chosen."""
+        file_path = filedialog.askopenfilename(filetypes=[("Deck files", "*.json;*.csv")])
+        if not file_path:
+            return False
+        # Reading a CSV may look up card names, and the images may need downloading:
+        # keep both off the Tk thread so the canvas stays responsive
+        threading.Thread(target=self._read_sample_deck, args=(file_path,), daemon=True).start()
+        return True
+
+    def _read_sample_deck(self, file_path):
+        """Worker thread: read the deck and download its images, then hand it to the Tk thread."""
+        try:
+            if os.path.splitext(file_path)[1].lower() == ".csv":
+                try:
+                    from .melee_csv_parser import parse_melee_csv
+                except ImportError:
+                    from decklister.melee_csv_parser import parse_melee_csv
+                deck = parse_melee_csv(file_path)
+            else:
+                deck = Deck.from_json_file(file_path)
+            ImageDownloader.download_images_batch([
+                (c.card_set, c.card_number) for c in deck.leaders + deck.bases + deck.main_deck + deck.sideboard
+            ])
+        except Exception as e:
+            error = e
+            self.master.after(0, lambda: self._sample_deck_failed(error))
+            return
+        self.master.after(0, lambda: self._sample_deck_loaded(deck))
+
+    def _sample_deck_loaded(self, deck):
+        self.sample_deck = deck
+        self.schedule_preview()
+
+    def _sample_deck_failed(self, error):
+        messagebox.showerror("Sample Deck", f"Could not load deck: {error}")
+        if self.sample_deck is None:
+            self.preview_var.set(False)
+
+    def toggle_preview(self):
+        if self.preview_var.get() and self.sample_deck is None and not self.load_sample_deck():
+            self.preview_var.set(False)
+        if self.preview_var.get():
+            self.schedule_preview()
+        elif self.preview_image_id:
+            self.canvas.delete(self.preview_image_id)
+            self.preview_image_id = None
+            self.preview_image = None
+
+    def schedule_preview(self):
+        """Re-render the preview once input has been quiet for PREVIEW_DELAY_MS."""
+        if not self.preview_var.get() or self.sample_deck is None:
+            return
+        if self._preview_after_id is not None:
+            self.master.after_cancel(self._preview_after_id)
+        self._preview_after_id = self.master.after(PREVIEW_DELAY_MS, self.update_preview)
+
+    def _preview_config(self):
+        """Config for the drawn areas, scaled to the display canvas."""
+        layers = [self.bg_path] if self.bg_path else [[255, 255, 255]]
+        layers.append({"type": "cards"})
+        config = Config(resolution=self.resolution, layers=layers, **preview_areas(self.rects))
+        return config.scaled(self.display_scale)
+
+    def update_preview(self):
+        self._preview_after_id = None
+        if not self.preview_var.get() or self.sample_deck is None:
+            return
+        config = self._preview_config()
+        layers_key = (tuple(config.resolution), self.bg_path)
+        if self._preview_renderer is None or layers_key != self._preview_layers_key:
+            # Decoded and resized layer images only apply to one canvas size and background
+            self._preview_renderer = Renderer(config, tile_cache={}, draft=True)
+            self._preview_layers_key = layers_key
+            self._preview_tiles_key = None
+        self._preview_renderer.config = config
+        deck = self.sample_deck
+        try:
+            deck_area, deck_layout, sb_area, sb_layout = CardSizer.layout_for_config(
+                config, len(deck.main_deck), len(deck.sideboard)
+            )
+            tiles_key = (
+                deck_layout[:2] if deck_layout else None,
+                sb_layout[:2] if sb_layout else None,
+                [(x1 - x0, y1 - y0) for x0, y0, x1, y1 in config.leader_areas + config.base_areas],
+            )
+            if tiles_key != self._preview_tiles_key:
+                self._preview_renderer.tile_cache.clear()  # Tiles of other sizes would never be used again
+                self._preview_tiles_key = tiles_key
+            image = self._preview_renderer.render(deck, deck_layout, sb_layout, deck_area=deck_area, sb_area=sb_area)
+        except Exception as e:
+            print(f"Preview failed: {e}")
+            return
+        self.preview_image = ImageTk.PhotoImage(image)
+        if self.preview_image_id:
+            self.canvas.itemconfig(self.preview_image_id, image=self.preview_image)
+        else:
+            self.preview_image_id = self.canvas.create_image(0, 0, anchor="nw", image=self.preview_image)
+            if self.bg_image_id:
+                self.canvas.tag_raise(self.preview_image_id, self.bg_image_id)
+            else:
+                self.canvas.tag_lower(self.preview_image_id)
 
     def set_resolution(self):
         popup = tk.Toplevel(self.master)
@@ -106,14 +354,15 @@ class AreaDrawer:
                 width = int(width_var.get())
                 height = int(height_var.get())
                 if width > 0 and height > 0:
-                    self.resolution = [width, height]
-                    self.canvas.config(width=width, height=height, scrollregion=(0, 0, width, height))
-                    self.master.geometry(f"{width}x{height}")
+                    self._set_display_size(width, height)
                     # Remove background image if present, since it may not match new resolution
                     if self.bg_image_id:
                         self.canvas.delete(self.bg_image_id)
                         self.bg_image_id = None
                         self.bg_image = None
+                        self.bg_path = None
+                    self._redraw_rects()
+                    self.schedule_preview()
                     popup.destroy()
             except Exception:
                 messagebox.showerror("Invalid input", "Please enter valid positive integers for width and height.")
@@ -124,4 +373,4 @@ class AreaDrawer:
 if __name__ == "__main__":
     root = tk.Tk()
     AreaDrawer(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
@@ -0,0 +1,130 @@
+"""
+Contact sheets: every deck of an event as a labelled thumbnail grid.
+
+Thumbnails are added one at a time, in order. As soon as a row of the grid
+is complete it is drawn as one band and streamed to a PngStreamWriter, so at
+most one row of thumbnails is held in memory. Large events can be split over
+several sheets.
+"""
+import math
+import os
+from PIL import Image, ImageDraw, ImageFont
+
+try:
+    from .png_writer import PngStreamWriter
+except ImportError:
+    from decklister.png_writer import PngStreamWriter
+
+
+class ContactSheet:
+    """
+    Assemble thumbnails into one or more grid images.
+
+    Usage:
+        with ContactSheet("day2.png", count=128, thumb_size=(480, 270)) as sheet:
+            for image, label in decks:
+                sheet.add(image, label)
+    """
+
+    def __init__(self, path, count, thumb_size, columns=8, rows_per_sheet=None, gap=8,
+                 label_height=None, background=(20, 20, 20), label_color=(255, 255, 255)):
+        """
+        Args:
+            path: Output PNG path. With several sheets, _1, _2, ... is added.
+            count: Number of thumbnails that will be added (sizes the sheets).
+            thumb_size: (width, height) of each thumbnail cell.
+            columns: Thumbnails per row.
+            rows_per_sheet: Rows per sheet image. None puts everything on one sheet.
+            gap: Space around and between cells in pixels.
+            label_height: Height of the label strip under each thumbnail.
+                Defaults to a size proportional to the thumbnail width.
+        """
+        self.columns = max(1, min(columns, count or 1))
+        self.thumb_width, self.thumb_height = thumb_size
+        self.gap = gap
+        self.label_height = label_height if label_height is not None else max(12, self.thumb_width // 12)
+        self.background = background
+        self.label_color = label_color
+        self.width = self.columns * (self.thumb_width + gap) + gap
+        self.cell_height = self.thumb_height + self.label_height + gap
+
+        total_rows = max(1, math.ceil(count / self.columns))
+        rows_per_sheet = rows_per_sheet or total_rows
+        sheet_count = math.ceil(total_rows / rows_per_sheet)
+        base, ext = os.path.splitext(path)
+        self.sheets = []  # (path, rows)
+        for i in range(sheet_count):
+            rows = min(rows_per_sheet, total_rows - i * rows_per_sheet)
+            sheet_path = path if sheet_count == 1 else f"{base}_{i + 1}{ext or '.png'}"
+            self.sheets.append((sheet_path, rows))
+
+        self.paths = [sheet_path for sheet_path, _ in self.sheets]
+        self._font = ImageFont.load_default(size=max(8, int(self.label_height * 0.7)))
+        self._row = []  # (thumbnail, label) for the row being filled
+        self._sheet_index = 0
+        self._rows_in_sheet = 0
+        self._writer = None
+        self.added = 0
+
+    def add(self, image, label=""):
+        """Add the next thumbnail. Images of another size are fitted into the cell."""
+        if image.size != (self.thumb_width, self.thumb_height):
+            image = image.copy()
+            image.thumbnail((self.thumb_width, self.thumb_height), Image.BILINEAR)
+        self._row.append((image, label))
+        self.added += 1
+        if len(self._row) == self.columns:
+            self._flush_row()
+
+    def _flush_row(self):
+        """Draw the current row as one band and stream it to the current sheet."""
+        if self._sheet_index >= len(self.sheets):
+            raise ValueError("more thumbnails added than the contact sheet was sized for")
+        path, rows = self.sheets[self._sheet_index]
+        if self._writer is None:
+            self._writer = PngStreamWriter(path, (self.width, rows * self.cell_height + self.gap))
+            self._writer.write(Image.new("RGB", (self.width, self.gap), self.background))
+
+        band = Image.new("RGB", (self.width, self.cell_height), self.background)
+        draw = ImageDraw.Draw(band)
+        for col, (image, label) in enumerate(self._row):
+            x = self.gap + col * (self.thumb_width + self.gap)
+            # Center thumbnails that were fitted smaller than the cell
+            band.paste(image.convert("RGB"), (
+                x + (self.thumb_width - image.width) // 2, (self.thumb_height - image.height) // 2
+            ))
+            if label:
+                draw.text(
+                    (x + self.thumb_width // 2, self.thumb_height + self.label_height // 2),
+                    str(label), font=self._font, fill=self.label_color, anchor="mm",
+                )
+        self._writer.write(band)
+        self._row = []
+
+        self._rows_in_sheet += 1
+        if self._rows_in_sheet == rows:
+            self._writer.close()
+            print(f"Contact sheet saved as {path}")
+            self._writer = None
+            self._sheet_index += 1
+            self._rows_in_sheet = 0
+
+    def close(self):
+        """Pad the remaining cells (e.g. for decks that failed) and finish every sheet."""
+        while self._sheet_index < len(self.sheets):
+            self._flush_row()
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+        return False
@@ -1,19 +1,41 @@
 import os
+import re
+import shutil
+from collections import Counter
 try:
     from .deck import Deck
     from .config import Config
     from .card_sizer import CardSizer
     from .renderer import Renderer
-    from .variant_resolver import resolve_variant
+    from .variant_resolver import resolve_deck_variant
+    from .pipeline import DeckJob, run_stages
+    from .outputs import OutputSpec, render_scale
+    from .png_writer import PngStreamWriter
+    from .pdf_writer import PdfStreamWriter
+    from .contact_sheet import ContactSheet
+    from .image_cache import maintain_image_cache
     from . import image_downloader as ImageDownloader
 except ImportError:
     from decklister.deck import Deck
     from decklister.config import Config
     from decklister.card_sizer import CardSizer
     from decklister.renderer import Renderer
-    from decklister.variant_resolver import resolve_variant
+    from decklister.variant_resolver import resolve_deck_variant
+    from decklister.pipeline import DeckJob, run_stages
+    from decklister.outputs import OutputSpec, render_scale
+    from decklister.png_writer import PngStreamWriter
+    from decklister.pdf_writer import PdfStreamWriter
+    from decklister.contact_sheet import ContactSheet
+    from decklister.image_cache import maintain_image_cache
     from decklister import image_downloader as ImageDownloader
 
+MAX_PREFIXES = 4  # Shared prefix canvases kept at once; others are rendered again when needed
+
+
+def safe_filename(text):
+    """Sanitize a player name (or other free text) for use in a file name."""
+    return re.sub(r'[^\w\-. ]', '', text).strip().replace(' ', '_')
+
 
 class DeckImageGenerator:
     """
@@ -25,10 +47,72 @@ class DeckImageGenerator:
     5. Saves output
     """
 
-    def __init__(self, config=None, hyperspace=False, showcase=False):
+    def __init__(self, config=None, hyperspace=False, showcase=False, tile_atlas=None, variants=None, queue_size=2,
+                 stream=False, preview=None, outputs=None, dedupe=True, output_dir=None, overwrite=False,
+                 tile_cache=None):
+        """
+        Args:
+            config: Config to render with.
+            hyperspace: Use hyperspace variant art (single-variant mode).
+            showcase: Use showcase leader art (single-variant mode).
+            tile_atlas: Optional TileAtlas shared by every render.
+            variants: Optional list of (name, hyperspace, showcase) from
+                parse_variants(). Each deck is then rendered once per variant,
+                with "_<name>" added to the output file name, and the
+                hyperspace/showcase flags are ignored.
+            queue_size: Decks allowed to wait between pipeline stages in
+                run_all(). Bounds memory use.
+            stream: In single-deck mode, composite each card as soon as its
+                image finishes downloading instead of waiting for the batch.
+            preview: Optional scale (0 < preview <= 1) for a fast draft render.
+                The config is scaled with Config.scaled(), tiles are prepared
+                from cached thumbnails with BILINEAR resampling, and outputs
+                get a "_preview" suffix when auto-named.
+            outputs: Optional list of OutputSpec. Defaults to config.outputs.
+                Each deck is composed once, at the largest output's width, and
+                every output is a downscale plus encode of that image.
+            dedupe: In run_all(), render identical decklists once. The layers
+                before the first metadata layer are shared between them, and
+                decks that would produce the very same image get their files
+                hardlinked (or copied) from the first one.
+            output_dir: Folder for auto-named outputs (default: the working directory).
+            overwrite: Replace existing auto-named outputs instead of numbering
+                new ones, so re-rendering a deck gives the same file names.
+            tile_cache: Optional dict of prepared card tiles kept across renders
+                (see Renderer). Watch mode shares one across config reloads.
+        """
         self.config = config or Config()
+        if preview is not None:
+            self.config = self.config.scaled(preview)
+        self.preview = preview
+        if outputs is None:
+            outputs = [OutputSpec.from_dict(data) for data in self.config.outputs]
+        self.outputs = outputs
+        scale = render_scale(outputs, self.config.resolution)
+        if scale < 1:
+            self.config = self.config.scaled(scale)
+        # Band mode streams full-size PNG rows; other outputs need the whole image
+        self.band_height = self.config.band_height
+        if self.band_height and any(spec.width or spec.image_format != "PNG" for spec in outputs):
+            print("Note: band rendering only writes full-size PNGs; rendering whole images for these outputs.")
+            self.band_height = None
         self.hyperspace = hyperspace
         self.showcase = showcase
+        self.tile_atlas = tile_atlas
+        self.variants = variants
+        self.queue_size = queue_size
+        self.stream = stream
+        self.dedupe = dedupe
+        self.output_dir = output_dir
+        self.overwrite = overwrite
+        self.tile_cache = tile_cache
+        self._renderer = None
+        # Batch deduplication state, reset by _run_jobs()
+        self._prefix_refs = Counter()  # (content key, variant) → renders still to come
+        self._prefixes = {}  # (content key, variant) → shared render_prefix() canvas, least recently used first
+        self._rendered = set()  # Render keys already rendered in this batch
+        self._written = {}  # Render key → paths its outputs were saved to
+        self._link_duplicates = False
 
     def run(self, deck_file, output_path=None, player=None, deck_index=0):
         """
@@ -62,14 +146,33 @@ class DeckImageGenerator:
             return
 
         self._generate_image(deck, deck_file, output_path, player=player, deck_index=deck_index, is_multi_deck=is_multi_deck)
+        self._save_atlas()
+        maintain_image_cache()
 
-    def run_all(self, deck_file, output_path=None):
+    def run_all(self, deck_file, output_path=None, pdf_path=None, order="csv",
+                sheet_path=None, sheet_columns=8, sheet_rows=None, sheet_label="OwnerDisplayName", indices=None):
         """
         Generate deck images for ALL decks in a Melee CSV export.
 
+        Decks flow through a pipeline (parse → download → render → save) with
+        one thread per stage, so downloads, rendering, and PNG encoding of
+        neighbouring decks overlap.
+
         Args:
             deck_file: Path to a Melee.gg CSV file.
             output_path: Not used (each deck gets an auto-named output).
+            pdf_path: If given, write every deck as a page of one PDF instead
+                of separate images. Pages are appended as decks finish.
+            order: Deck order — "csv", "player", "table", or "standing"
+                (see melee_csv_parser.ROW_ORDERS).
+            sheet_path: If given, assemble every deck into a contact sheet
+                instead of separate images. Each deck is one cell at the
+                (usually preview-scaled) config resolution.
+            sheet_columns: Thumbnails per contact sheet row.
+            sheet_rows: Rows per contact sheet image (None = one sheet).
+            sheet_label: Deck metadata column used as each thumbnail's label.
+            indices: Only render the decks at these CSV row positions (None = all).
+                Ignored for PDFs and contact sheets, which always hold every deck.
         """
         if not deck_file:
             print("No deck file provided.")
@@ -82,28 +185,192 @@ class DeckImageGenerator:
             return
 
         try:
-            from .melee_csv_parser import parse_melee_csv, _count_rows
+            from .melee_csv_parser import read_melee_rows, sort_rows, records_key
         except ImportError:
-            from decklister.melee_csv_parser import parse_melee_csv, _count_rows
+            from decklister.melee_csv_parser import read_melee_rows, sort_rows, records_key
 
-        total = _count_rows(deck_file)
+        try:
+            rows = read_melee_rows(deck_file)
+        except Exception as e:
+            print(f"Error loading deck: {e}")
+            return
+        total = len(rows)
         if total == 0:
             print("CSV file contains no decks.")
             return
 
-        print(f"Generating images for {total} deck(s)...")
-        is_multi_deck = total > 1
+        selected = sort_rows(rows, order)
+        if indices is not None and not (pdf_path or sheet_path):
+            indices = set(indices)
+            selected = [(i, row) for i, row in selected if i in indices]
+        print(f"Generating images for {len(selected)} deck(s)...")
+        jobs = [
+            DeckJob(
+                i, deck_file, row=row, deck_index=i, is_multi_deck=total > 1,
+                label=row.get("OwnerDisplayName") or row.get("OwnerUsername") or f"index {i}",
+                content_key=records_key(row) if self.dedupe else None,
+            )
+            for i, row in selected
+        ]
+        if pdf_path:
+            self._run_pdf(jobs, pdf_path)
+        elif sheet_path:
+            self._run_sheet(jobs, sheet_path, sheet_columns, sheet_rows, sheet_label)
+        else:
+            self._run_jobs(jobs)
 
-        for i in range(total):
-            try:
-                deck = parse_melee_csv(deck_file, deck_index=i)
-                display = deck.metadata.get("OwnerDisplayName") or deck.metadata.get("OwnerUsername", f"index {i}")
-                print(f"\n--- Deck {i + 1}/{total}: {display} ---")
-                self._generate_image(deck, deck_file, output_path=None, deck_index=i, is_multi_deck=is_multi_deck)
-            except Exception as e:
-                print(f"Error processing deck {i}: {e}")
+        self._save_atlas()
+        maintain_image_cache()
+        failed = [job for job in jobs if job.error is not None]
+        print(f"\nDone — {len(jobs)} deck(s) processed" + (f", {len(failed)} failed." if failed else "."))
+
+    def run_queue_job(self, deck_file, job):
+        """
+        Render one deck job from a work queue (see work_queue.py).
+
+        Args:
+            deck_file: The CSV the queue was made from (used to name outputs).
+            job: Job dict with the CSV "row", its "index", and a "label".
+
+        Returns:
+            Paths written. Raises if the deck failed.
+        """
+        deck_job = DeckJob(
+            job["index"], deck_file, row=job["row"], deck_index=job["index"], is_multi_deck=True, label=job.get("label"),
+        )
+        self._run_jobs([deck_job])
+        if deck_job.error is not None:
+            raise deck_job.error
+        return deck_job.outputs
+
+    def run_jobs(self, jobs):
+        """
+        Render DeckJobs built by the caller (e.g. from a batch manifest).
+
+        Jobs need a parsed `deck` and an `output_path`. The image cache and
+        tile atlas are left for the caller to save.
+
+        Returns:
+            The finished jobs, in order. Failed ones have `error` set.
+        """
+        return self._run_jobs(jobs)
+
+    def run_stream(self, jobs, on_done):
+        """
+        Render decks as they arrive, e.g. parsed from NDJSON lines on stdin.
+
+        The renderer, layer images, and image cache index stay warm between
+        decks, and download, render, and save overlap as in run_all().
+
+        Args:
+            jobs: Iterable of DeckJob with a parsed `deck`. It is read lazily
+                on a feeder thread, so it can be a pipe that stays open.
+            on_done: Called with each job as soon as it is saved or has failed.
+        """
+        self._start_dedupe([], link=True)
+        try:
+            run_stages(
+                jobs,
+                [("download", self._prepare_job), ("render", self._render_job), ("save", self._save_job)],
+                queue_size=self.queue_size, on_done=on_done,
+            )
+        finally:
+            self._save_atlas()
+            maintain_image_cache()
+
+    def planned_outputs(self, job):
+        """Every path a job will be written to, across all variants."""
+        names = [name for name, _, _ in self.variants] if self.variants else [None]
+        return [path for name in names for _, path in self._output_paths(job, name)]
+
+    def card_keys(self, deck):
+        """(card_set, card_number) for every card of every variant a deck is rendered in."""
+        return self._card_keys(*[variant_deck for _, variant_deck in self._apply_variants(deck)])
+
+    def _run_pdf(self, jobs, pdf_path):
+        """Run jobs through the pipeline with a save stage that appends each deck as a PDF page."""
+        if self.band_height:
+            print("Note: PDF pages need whole images; ignoring band_height.")
+            self.band_height = None
+
+        with PdfStreamWriter(pdf_path) as pdf:
+            def add_pages(job):
+                for _, image in job.images:
+                    pdf.add_page(image)
+                    job.outputs.append(f"{pdf_path}#page={pdf.page_count}")
+                print(f"Added page {pdf.page_count} ({job.label})")
+                job.images = None
+
+            self._run_jobs(jobs, save=add_pages)
+        print(f"PDF saved as {pdf_path} ({pdf.page_count} page(s))")
+
+    def _run_sheet(self, jobs, sheet_path, columns, rows_per_sheet, label_column):
+        """Run jobs through the pipeline with a save stage that adds each deck to a contact sheet."""
+        if self.band_height:
+            print("Note: contact sheets need whole thumbnails; ignoring band_height.")
+            self.band_height = None
+
+        count = len(jobs) * len(self.variants or [None])
+        with ContactSheet(sheet_path, count, self.config.resolution, columns=columns, rows_per_sheet=rows_per_sheet) as sheet:
+            def add_thumbnails(job):
+                label = job.deck.metadata.get(label_column) or job.label
+                for name, image in job.images:
+                    sheet.add(image, f"{label} ({name})" if name else label)
+                job.images = None
+
+            self._run_jobs(jobs, save=add_thumbnails)
+
+    def _run_jobs(self, jobs, save=None):
+        """
+        Run jobs through the parse → download → render → save pipeline.
+
+        Args:
+            jobs: Iterable of DeckJob.
+            save: Optional replacement for the save stage, called with each job.
+                Decks identical to an earlier one are only linked to its files
+                by the default save stage; custom ones always get an image.
+
+        Returns:
+            The finished jobs, in order.
+        """
+        jobs = list(jobs)
+        self._start_dedupe(jobs, link=save is None)
+        try:
+            from .melee_csv_parser import deck_from_row, load_card_cache
+        except ImportError:
+            from decklister.melee_csv_parser import deck_from_row, load_card_cache
+
+        card_cache = load_card_cache()
 
-        print(f"\nDone — {total} deck(s) processed.")
+        def parse(job):
+            if job.deck is None:
+                print(f"\n--- Deck {job.index + 1}: {job.label} ---")
+                job.deck = deck_from_row(job.row, cache=card_cache)
+
+        try:
+            return run_stages(
+                jobs,
+                [
+                    ("parse", parse),
+                    ("download", self._prepare_job),
+                    ("render", self._render_job),
+                    ("save", save or self._save_job),
+                ],
+                queue_size=self.queue_size,
+            )
+        finally:
+            self._prefixes.clear()  # Prefixes of decks that failed before rendering
+
+    def _start_dedupe(self, jobs, link):
+        """Count the renders sharing each decklist, so shared prefixes are kept exactly as long as needed."""
+        names = [name for name, _, _ in self.variants] if self.variants else [None]
+        self._prefix_refs = Counter(
+            (job.content_key, name) for job in jobs if job.content_key is not None for name in names
+        )
+        self._prefixes = {}
+        self._rendered = set()
+        self._written = {}
+        self._link_duplicates = link
 
     def _generate_image(self, deck, deck_file, output_path=None, player=None, deck_index=0, is_multi_deck=False):
         """
@@ -117,81 +384,306 @@ class DeckImageGenerator:
             deck_index: Deck index (for auto-naming).
             is_multi_deck: Whether the source has multiple decks.
         """
-        # Resolve variant card numbers and download images
-        self._apply_variants(deck)
-        self._download_images(deck)
+        job = DeckJob(
+            0, deck_file, deck=deck, output_path=output_path, player=player,
+            deck_index=deck_index, is_multi_deck=is_multi_deck, batch=False,
+        )
+        if self.stream and not self.band_height:
+            self._stream_job(job)
+        else:
+            self._prepare_job(job)
+            self._render_job(job)
+        self._save_job(job)
 
-        # Calculate card sizes
-        deck_layout = self._calculate_layout(self.config.deck_area, len(deck.main_deck))
-        sb_layout = self._calculate_layout(self.config.sb_area, len(deck.sideboard))
+    def _stream_job(self, job):
+        """
+        Download and render a job at the same time.
 
-        # If uniform sizing, use the smaller card size for both
-        if self.config.uniform_card_size and deck_layout and sb_layout:
-            min_width = min(deck_layout[0], sb_layout[0])
-            min_height = min(deck_layout[1], sb_layout[1])
-            deck_layout = (min_width, min_height, deck_layout[2], deck_layout[3], deck_layout[4])
-            sb_layout = (min_width, min_height, sb_layout[2], sb_layout[3], sb_layout[4])
+        The first variant is composited card by card as downloads finish.
+        By then every image is on disk, so any other variants render normally.
+        """
+        job.variant_decks = self._apply_variants(job.deck)
+        arrivals = ImageDownloader.download_images_streaming(
+            self._card_keys(*[variant_deck for _, variant_deck in job.variant_decks])
+        )
+        first_name, first_deck = job.variant_decks[0]
+        job.images = [(first_name, self._render(first_deck, arrivals=arrivals))]
+        for _ in arrivals:
+            pass  # Wait for images only the other variants use
+        job.images += [(name, self._render(variant_deck)) for name, variant_deck in job.variant_decks[1:]]
 
-        # Render
-        renderer = Renderer(self.config)
-        image = renderer.render(deck, deck_layout, sb_layout)
+    def _prepare_job(self, job):
+        """Resolve variant card numbers, then download the union of all variants' images at once."""
+        job.variant_decks = self._apply_variants(job.deck)
+        self._download_images(*[variant_deck for _, variant_deck in job.variant_decks])
 
-        # Save
-        output_path = output_path or self._auto_output_name(deck_file, player=player, deck_index=deck_index, is_multi_deck=is_multi_deck)
-        image.save(output_path)
-        print(f"Deck image saved as {output_path}")
+    def _render_job(self, job):
+        """Render every variant of a prepared job. In band mode, rendering happens in the save stage."""
+        if self.band_height:
+            return
+        job.images = [
+            (name, self._render(variant_deck) if job.content_key is None else self._render_deduped(job, name, variant_deck))
+            for name, variant_deck in job.variant_decks
+        ]
 
-    def _apply_variants(self, deck):
-        """Resolve variant card numbers for all cards in the deck."""
-        if not self.hyperspace and not self.showcase:
+    def _render_key(self, job, name, deck):
+        """Key of everything a batch deck's image depends on: its cards, variant, and metadata texts."""
+        key = ((job.content_key, name), self._get_renderer().metadata_texts(deck))
+        job.render_keys[name] = key
+        return key
+
+    def _render_deduped(self, job, name, deck):
+        """
+        Render a batch deck, reusing the work shared with identical decklists.
+
+        Returns None if an earlier deck rendered the very same image; the save
+        stage then links that deck's files instead.
+        """
+        renderer = self._get_renderer()
+        render_key = self._render_key(job, name, deck)
+        prefix_key = render_key[0]
+        self._prefix_refs[prefix_key] -= 1
+        remaining = self._prefix_refs[prefix_key]
+
+        if self._link_duplicates and render_key in self._rendered:
+            if remaining <= 0:
+                self._prefixes.pop(prefix_key, None)
+            return None
+        self._rendered.add(render_key)
+
+        deck_area, deck_layout, sb_area, sb_layout = CardSizer.layout_for_config(
+            self.config, len(deck.main_deck), len(deck.sideboard)
+        )
+        prefix = self._prefixes.pop(prefix_key, None)
+        if prefix is None:
+            prefix = renderer.render_prefix(deck, deck_layout, sb_layout, deck_area=deck_area, sb_area=sb_area)
+        # Without metadata layers, later copies are linked rather than finished from the prefix
+        if remaining > 0 and (render_key[1] or not self._link_duplicates):
+            self._prefixes[prefix_key] = prefix  # Re-inserted, so most recently used
+            while len(self._prefixes) > MAX_PREFIXES:
+                del self._prefixes[next(iter(self._prefixes))]
+        return renderer.render_from_prefix(prefix, deck, deck_layout, sb_layout, deck_area=deck_area, sb_area=sb_area)
+
+    def _save_job(self, job):
+        """Encode and write a job's images, then drop them from memory."""
+        if self.band_height:
+            self._save_banded_job(job)
             return
+        for name, image in job.images:
+            render_key = job.render_keys.get(name)
+            paths = self._output_paths(job, name)
+            if image is None:
+                sources = self._written.get(render_key)
+                if sources is not None:
+                    self._link_outputs(job, [path for _, path in paths], sources)
+                    continue
+                # The deck this one duplicates failed to save; render it after all
+                image = self._render(dict(job.variant_decks)[name])
+            for spec, path in paths:
+                if spec is None:
+                    image.save(path)
+                else:
+                    spec.save(image, path)
+                job.outputs.append(path)
+                print(f"Deck image saved as {path}")
+            if render_key is not None:
+                self._written[render_key] = [path for _, path in paths]
+        job.images = None
 
-        for card in deck.leaders + deck.bases + deck.main_deck + deck.sideboard:
-            card.card_number = resolve_variant(
-                card.card_set, card.card_number,
-                hyperspace=self.hyperspace,
-                showcase=self.showcase,
+    @staticmethod
+    def _link_outputs(job, paths, sources):
+        """Hardlink an earlier deck's identical outputs to paths, copying where links are unsupported."""
+        for path, source in zip(paths, sources):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                os.link(source, tmp_path)
+            except OSError:
+                shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, path)
+            job.outputs.append(path)
+            print(f"Deck image saved as {path} (identical to {source})")
+
+    def _save_banded_job(self, job):
+        """Render each variant band by band straight into streaming PNG writers."""
+        renderer = self._get_renderer()
+        for name, deck in job.variant_decks:
+            paths = [path for _, path in self._output_paths(job, name)]
+            render_key = self._render_key(job, name, deck) if job.content_key is not None else None
+            if render_key in self._written:
+                self._link_outputs(job, paths, self._written[render_key])
+                continue
+            deck_area, deck_layout, sb_area, sb_layout = CardSizer.layout_for_config(
+                self.config, len(deck.main_deck), len(deck.sideboard)
             )
+            writers = []
+            try:
+                for path in paths:
+                    writers.append(PngStreamWriter(path, self.config.resolution))
+                for band in renderer.render_bands(
+                    deck, deck_layout, sb_layout, self.band_height, deck_area=deck_area, sb_area=sb_area
+                ):
+                    for writer in writers:
+                        writer.write(band)
+            except BaseException:
+                for writer in writers:
+                    writer.abort()
+                raise
+            for writer in writers:
+                writer.close()
+                job.outputs.append(writer.path)
+                print(f"Deck image saved as {writer.path}")
+            if render_key is not None:
+                self._written[render_key] = paths
 
-    def _download_images(self, deck):
-        """Download images for all cards in the deck concurrently."""
-        cards = []
-        for card in deck.leaders + deck.bases + deck.main_deck + deck.sideboard:
-            cards.append((card.card_set, card.card_number))
-        ImageDownloader.download_images_batch(cards)
+    def _output_paths(self, job, name):
+        """
+        Resolve every file a job's variant is written to.
 
-    def _calculate_layout(self, area, card_count):
-        """Calculate card layout for an area. Returns None if area or count is missing."""
-        if area is None or card_count <= 0:
-            return None
-        return CardSizer.calculate(area, card_count, padding=self.config.padding)
+        Returns:
+            List of (OutputSpec or None, path). None means a plain full-size save.
+        """
+        if job.output_path:
+            return self._spec_paths(job, name, self._variant_path(job.output_path, name))
+        suffix = "_".join(part for part in (name, "preview" if self.preview else None) if part)
+
+        def derived(candidate):
+            # Explicit output paths are the same whatever the deck's name, so only the others are numbered
+            return [path for spec, path in self._spec_paths(job, name, candidate)
+                    if spec is None or job.batch or not spec.path]
+
+        path = self._auto_output_name(
+            job.deck_file, player=job.player, deck_index=job.deck_index,
+            is_multi_deck=job.is_multi_deck, suffix=suffix or None, derived=derived,
+        )
+        return self._spec_paths(job, name, path)
 
-    def _auto_output_name(self, deck_file, player=None, deck_index=0, is_multi_deck=False):
+    def _spec_paths(self, job, name, path):
+        """Pair each output spec with the file it writes for a deck output path."""
+        if not self.outputs:
+            return [(None, path)]
+        paths = []
+        for spec in self.outputs:
+            # Batch jobs always derive their names from the deck
+            explicit = not job.batch
+            spec_path = spec.output_path(path, use_path=explicit)
+            if explicit and spec.path:
+                spec_path = self._variant_path(spec_path, name)
+            paths.append((spec, spec_path))
+        return paths
+
+    def _render(self, deck, arrivals=None):
+        """
+        Calculate card sizes and render a (variant-resolved) deck. Returns an RGB image.
+
+        If `arrivals` (from download_images_streaming) is given, cards are
+        composited as their downloads finish.
+        """
+        # Calculate card sizes (and the deck/sideboard areas when split_area is used)
+        deck_area, deck_layout, sb_area, sb_layout = CardSizer.layout_for_config(
+            self.config, len(deck.main_deck), len(deck.sideboard)
+        )
+        renderer = self._get_renderer()
+        if arrivals is not None:
+            return renderer.render_streaming(
+                deck, deck_layout, sb_layout, arrivals, deck_area=deck_area, sb_area=sb_area
+            )
+        return renderer.render(deck, deck_layout, sb_layout, deck_area=deck_area, sb_area=sb_area)
+
+    def _get_renderer(self):
+        """One Renderer per generator, so layer images are decoded once per run."""
+        if self._renderer is None:
+            if self.preview is not None:
+                tile_cache = self.tile_cache if self.tile_cache is not None else {}
+                self._renderer = Renderer(self.config, tile_atlas=self.tile_atlas, tile_cache=tile_cache, draft=True)
+            else:
+                self._renderer = Renderer(self.config, tile_atlas=self.tile_atlas, tile_cache=self.tile_cache)
+        return self._renderer
+
+    @staticmethod
+    def _variant_path(output_path, name):
+        """Insert _<name> before the extension of an explicit output path."""
+        if not name:
+            return output_path
+        base, ext = os.path.splitext(output_path)
+        return f"{base}_{name}{ext or '.png'}"
+
+    def invalidate(self, paths):
+        """Forget cached copies of layer images that changed on disk (watch mode)."""
+        if self._renderer is not None:
+            self._renderer.invalidate(paths)
+
+    def _save_atlas(self):
+        """Persist tiles added to the atlas during this run (build mode only)."""
+        if self.tile_atlas is not None:
+            self.tile_atlas.save()
+
+    def _apply_variants(self, deck):
+        """
+        Resolve variant card numbers for every requested variant.
+
+        The parsed deck is not modified, so it can be reused across variants.
+
+        Returns:
+            List of (name, resolved Deck). name is None in single-variant mode.
+        """
+        if self.variants is None:
+            return [(None, resolve_deck_variant(deck, hyperspace=self.hyperspace, showcase=self.showcase))]
+        return [
+            (name, resolve_deck_variant(deck, hyperspace=hyperspace, showcase=showcase))
+            for name, hyperspace, showcase in self.variants
+        ]
+
+    def _download_images(self, *decks):
+        """Download images for all cards in the given decks concurrently, in one batch."""
+        ImageDownloader.download_images_batch(self._card_keys(*decks))
+
+    @staticmethod
+    def _card_keys(*decks):
+        """(card_set, card_number) for every card in the given decks."""
+        cards = []
+        for deck in decks:
+            for card in deck.leaders + deck.bases + deck.main_deck + deck.sideboard:
+                cards.append((card.card_set, card.card_number))
+        return cards
+
+    def _auto_output_name(self, deck_file, player=None, deck_index=0, is_multi_deck=False, suffix=None, derived=None):
         """
         Generate an output filename based on the input file.
 
         - Base name from input file (without extension)
         - Multi-deck CSV: append _PlayerName or _index_N
-        - Auto-increment if file exists: name.png, name_2.png, etc.
+        - Multi-variant: append _<variant name>
+        - Auto-increment if file exists: name.png, name_2.png, etc. (unless overwriting)
+
+        Args:
+            derived: Optional fn(name) returning the files actually written
+                under a name (e.g. name_1920w.webp for output specs). A name
+                is taken if any of them exists. Defaults to the name itself.
         """
-        import re
+        derived = derived or (lambda path: [path])
         base = os.path.splitext(os.path.basename(deck_file))[0]
+        if self.output_dir:
+            base = os.path.join(self.output_dir, base)
 
         # For multi-deck CSVs, add a disambiguator
         if is_multi_deck:
             if player:
-                # Sanitize player name for use in a filename
-                safe_player = re.sub(r'[^\w\-. ]', '', player).strip().replace(' ', '_')
-                base = f"{base}_{safe_player}"
+                base = f"{base}_{safe_filename(player)}"
             else:
                 base = f"{base}_index_{deck_index}"
 
+        if suffix:
+            base = f"{base}_{suffix}"
+
         # Auto-increment if file already exists
+        def taken(path):
+            return any(os.path.isfile(written) for written in derived(path))
+
         candidate = f"{base}.png"
-        if not os.path.isfile(candidate):
+        if self.overwrite or not taken(candidate):
             return candidate
 
         n = 2
-        while os.path.isfile(f"{base}_{n}.png"):
+        while taken(f"{base}_{n}.png"):
             n += 1
         return f"{base}_{n}.png"
\ No newline at end of file
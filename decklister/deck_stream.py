@@ -0,0 +1,91 @@
+"""
+Newline-delimited JSON (NDJSON) deck input and results.
+
+Each input line is one deck in either deck JSON format. Two optional keys are
+read next to the deck's own: "id", echoed in the result and used in the
+output name, and "output", an explicit output path. Blank lines are skipped.
+
+For every deck, one result line is written as soon as it is saved or fails:
+
+    {"line": 3, "id": "r2-t14", "ok": true, "outputs": ["stdin_r2-t14.png"], "seconds": 0.84, "error": null}
+
+"seconds" is the time spent downloading, rendering, and saving the deck.
+"""
+import json
+
+try:
+    from .deck import Deck
+    from .pipeline import DeckJob
+except ImportError:
+    from decklister.deck import Deck
+    from decklister.pipeline import DeckJob
+
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+class StreamJob(DeckJob):
+    """A DeckJob read from one NDJSON line."""
+
+    def __init__(self, line, deck_file):
+        super().__init__(line, deck_file, label=f"line {line}", player=f"line {line}", is_multi_deck=True)
+        self.id = None  # The line's "id", if it has one
+
+
+def read_deck_lines(lines, deck_file="stdin"):
+    """
+    Turn NDJSON lines into StreamJobs, one at a time as they are read.
+
+    A line that is not a valid deck gives a job with `error` already set, so
+    it is still reported in order.
+
+    Args:
+        lines: Iterable of text lines (a file or sys.stdin).
+        deck_file: Name auto-named outputs are based on.
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        job = StreamJob(number, deck_file)
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("expected a deck object")
+            if data.get("id") is not None:
+                job.id = data["id"]
+                job.label = job.player = str(job.id)
+            job.output_path = data.get("output")
+            job.deck = Deck.from_json(data)
+        except Exception as e:
+            job.error = ValueError(f"line {number}: {e}")
+            print(f"Error reading deck on line {number}: {e}")
+        yield job
+
+
+def job_result(job):
+    """The NDJSON result record of a finished (or failed) job."""
+    return {
+        "line": job.index,
+        "id": job.id,
+        "ok": job.error is None,
+        "outputs": job.outputs,
+        "seconds": round(sum(job.timings.values()), 3),
+        "error": None if job.error is None else str(job.error),
+    }
+
+
+class ResultWriter:
+    """on_done callback writing one result line per job to a stream, flushed right away."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.ok = 0
+        self.failed = 0
+
+    def __call__(self, job):
+        if job.error is None:
+            self.ok += 1
+        else:
+            self.failed += 1
+        self.stream.write(json.dumps(job_result(job), ensure_ascii=False) + "\n")
+        self.stream.flush()
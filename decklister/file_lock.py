@@ -0,0 +1,188 @@
+"""
+Lock files for caches shared between processes and hosts.
+
+A lock is a file created with O_CREAT | O_EXCL, which is atomic on local
+disks and on NFSv3+. Its content names the holder for debugging, plus a
+random token so a holder only ever removes its own lock. While a lock is
+held, a background thread touches it every `stale_after / 4` seconds; a lock
+whose file has not been touched for `stale_after` seconds belongs to a
+process that died (or a host that went away) and is broken by the next
+process that wants it.
+
+Removing a lock (releasing it or breaking it as stale) reads the file and
+unlinks it only if it still holds the expected token. The path is never
+emptied for anyone else to fill, so at most one process holds the lock,
+except in the short window between that read and the unlink: a process
+that breaks the same stale lock first and takes a fresh one exactly then
+loses it. That needs a lock left stale and two processes racing to break
+it within microseconds, which the heartbeat keeps to crashed holders.
+
+Writers pair a lock with write-to-temp-then-os.replace(), so readers never
+see a half-written file even if they don't take the lock.
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+
+STALE_AFTER = 120  # Seconds before an untouched lock is considered abandoned
+POLL_INTERVAL = 0.1
+
+
+def temp_path(path):
+    """A temporary path next to `path` that no other thread, process, or host will pick."""
+    return f"{path}.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _read_token(path):
+    """Content of a lock file, or None if it is gone."""
+    try:
+        with open(path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _remove_if_token(path, token):
+    """Unlink `path` if it still holds `token`. Returns True if the path is gone."""
+    current = _read_token(path)
+    if current is None:
+        return True
+    if current != token:
+        return False
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    return True
+
+
+class FileLock:
+    """
+    Exclusive lock on `path + ".lock"`.
+
+    Usage:
+        with FileLock(cache_path):
+            ...read, merge, write to temp, os.replace...
+
+        lock = FileLock(image_path)
+        if lock.acquire(timeout=0):
+            ...
+    """
+
+    def __init__(self, path, stale_after=STALE_AFTER):
+        self.path = f"{path}.lock"
+        self.stale_after = stale_after
+        self.held = False
+        self._token = None  # Content of the lock file while held
+        self._heartbeat = None
+
+    def acquire(self, timeout=None):
+        """
+        Take the lock, waiting up to `timeout` seconds (None = forever, 0 = don't wait).
+
+        Returns:
+            True if the lock is now held.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if self._break_if_stale():
+                    continue
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(POLL_INTERVAL)
+                continue
+            self._token = f"{socket.gethostname()} {os.getpid()} {time.time():.0f} {uuid.uuid4().hex}\n"
+            with os.fdopen(fd, "w") as f:
+                f.write(self._token)
+            self.held = True
+            self._heartbeat = _Heartbeat(self)
+            self._heartbeat.start()
+            return True
+
+    def release(self):
+        if not self.held:
+            return
+        self.held = False
+        self._heartbeat.stop()
+        self._heartbeat = None
+        if not _remove_if_token(self.path, self._token):
+            print(f"Warning: lock {self.path} was broken as stale while held; leaving the new holder's lock")
+
+    def touch(self):
+        """Refresh the lock's mtime if we still hold it. Returns False once it was taken from us."""
+        if _read_token(self.path) != self._token:
+            return False
+        try:
+            os.utime(self.path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def wait(self, timeout=None):
+        """
+        Wait until nobody holds the lock, without taking it.
+
+        Returns:
+            True if the lock was released (or broken as stale) in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while os.path.exists(self.path):
+            if self._break_if_stale():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+        return True
+
+    def _break_if_stale(self):
+        """Remove an abandoned lock. Returns True if the lock file is gone."""
+        token = _read_token(self.path)
+        try:
+            age = time.time() - os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return True
+        if token is None or age < self.stale_after:
+            return token is None
+        # Only the lock we judged stale is removed: if another process broke it
+        # and took a fresh one meanwhile, the token differs and it is left alone
+        if not _remove_if_token(self.path, token):
+            return False
+        print(f"Warning: breaking stale lock {self.path} ({age:.0f}s old)")
+        return True
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+class _Heartbeat:
+    """Touch a held lock file in the background so a long holder isn't broken as stale."""
+
+    def __init__(self, lock):
+        self.lock = lock
+        # Several touches per stale period, so one slow touch doesn't lose the lock
+        self.interval = lock.stale_after / 4
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lock-heartbeat", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.lock.touch():
+                return
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
@@ -1,4 +1,3 @@
-import shutil
 import sys
 import os
 import subprocess
@@ -19,9 +18,11 @@ except ImportError:
     from decklister.config import Config
 
 try:
-    from .app_paths import get_app_data_dir
+    from .image_cache import get_image_cache_index
 except ImportError:
-    from decklister.app_paths import get_app_data_dir
+    from decklister.image_cache import get_image_cache_index
+
+PREVIEW_SCALE = 0.25  # Scale of "Draft preview" renders
 
 
 class LogSignal(QObject):
@@ -134,6 +135,12 @@ class DeckListerGUI(QMainWindow):
         self.showcase_check.setToolTip("Use showcase variant art for leader cards (overrides hyperspace for leaders)")
         options_layout.addWidget(self.showcase_check)
 
+        self.preview_check = QCheckBox("Draft preview")
+        self.preview_check.setToolTip(
+            f"Fast low-resolution render at {int(PREVIEW_SCALE * 100)}% scale for checking a layout"
+        )
+        options_layout.addWidget(self.preview_check)
+
         options_layout.addStretch()
         layout.addWidget(options_group)
 
@@ -243,6 +250,9 @@ class DeckListerGUI(QMainWindow):
             self._append_log("  Variant: Hyperspace")
         if showcase:
             self._append_log("  Variant: Showcase leaders")
+        preview = PREVIEW_SCALE if self.preview_check.isChecked() else None
+        if preview:
+            self._append_log(f"  Mode: Draft preview ({int(preview * 100)}% scale)")
 
         # CSV-specific options
         player = None
@@ -268,12 +278,13 @@ class DeckListerGUI(QMainWindow):
         # Run in a thread to keep the GUI responsive
         thread = threading.Thread(
             target=self._run_generator,
-            args=(deck_file, config_file, output_file, hyperspace, showcase, player, deck_index, generate_all),
+            args=(deck_file, config_file, output_file, hyperspace, showcase, player, deck_index, generate_all, preview),
             daemon=True,
         )
         thread.start()
 
-    def _run_generator(self, deck_file, config_file, output_file, hyperspace, showcase, player, deck_index, generate_all):
+    def _run_generator(self, deck_file, config_file, output_file, hyperspace, showcase, player, deck_index, generate_all,
+                       preview=None):
         """Worker thread that runs the generator and streams log messages in real-time."""
 
         # Custom stream that emits each line to the GUI as it's written
@@ -298,7 +309,7 @@ class DeckListerGUI(QMainWindow):
 
         try:
             config = Config.from_file(config_file)
-            generator = DeckImageGenerator(config=config, hyperspace=hyperspace, showcase=showcase)
+            generator = DeckImageGenerator(config=config, hyperspace=hyperspace, showcase=showcase, preview=preview)
 
             # Replace sys.stdout directly so all print() calls in this thread go to our stream
             old_stdout = sys.stdout
@@ -401,25 +412,14 @@ class DeckListerGUI(QMainWindow):
 
     # --- Clear Cache ---
     def _clear_cache(self):
-        """Clear the card image cache."""
+        """Clear the card image cache (images and draft thumbnails). Card IDs, the atlas, and settings are kept."""
         self._append_log("Clearing cache...")
         try:
-            cache_dir = get_app_data_dir()
-            self._append_log(f"Cache directory: {cache_dir}")
-            if os.path.isdir(cache_dir):
-                # Remove all files in the cache directory
-                for filename in os.listdir(cache_dir):
-                    file_path = os.path.join(cache_dir, filename)
-                    try:
-                        if os.path.isfile(file_path) or os.path.islink(file_path):
-                            os.unlink(file_path)
-                        elif os.path.isdir(file_path):
-                            shutil.rmtree(file_path)
-                    except Exception as e:
-                        self._append_log(f"Failed to delete {file_path}: {e}")
-                self._append_log("✓ Cache cleared.")
-            else:
-                self._append_log("Cache directory not found, nothing to clear.")
+            index = get_image_cache_index()
+            self._append_log(f"Cache directory: {index.directory}")
+            index.clear()
+            index.save()
+            self._append_log("✓ Cache cleared.")
         except Exception as e:
             self._append_log(f"Error clearing cache: {e}")
 
@@ -0,0 +1,323 @@
+"""
+In-memory index of the on-disk card image cache.
+
+Checking the filesystem for every card (and creating its set folder) costs a
+few syscalls per card, which adds up on a network-mounted cache. The index
+lists the cache directory once per process, one scandir per set folder, and
+is updated as images are downloaded, so "is this card cached, and where?" is
+answered from memory.
+
+The cache can also be kept to a byte budget. A manifest in the cache folder
+records when each image was last used, the budget, and pinned sets; prune()
+removes the least recently used images of unpinned sets until the cache fits.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+try:
+    from .app_paths import get_image_cache_dir, get_thumbnail_dir
+    from .file_lock import FileLock, temp_path
+except ImportError:
+    from decklister.app_paths import get_image_cache_dir, get_thumbnail_dir
+    from decklister.file_lock import FileLock, temp_path
+
+MANIFEST_NAME = "manifest.json"
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def card_filename(card_number):
+    """File name of a card image. Numeric card numbers are zero-padded to 3 digits."""
+    card_number = str(card_number)
+    return f"{card_number.zfill(3) if card_number.isdigit() else card_number}.png"
+
+
+def parse_size(text):
+    """Parse a byte size such as "800M", "2G", "1.5GB", or "500000"."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"invalid size {text!r} (e.g. 800M or 2G)")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def format_size(size):
+    """Format a byte count for display, e.g. 1.4 GB."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class ImageCacheIndex:
+    """
+    Set of cached card images, keyed by set folder and file name.
+
+    The directory is scanned on the first lookup. Images written by other
+    processes after that are not seen until refresh(); they are simply
+    downloaded again.
+    """
+
+    def __init__(self, directory, thumbnail_dir=None):
+        self.directory = directory
+        # Draft thumbnail folder (or a function returning it, called only when images are removed);
+        # thumbnails are removed along with their images
+        self.thumbnail_dir = thumbnail_dir
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self.max_bytes = None  # Byte budget for prune(); None = unbounded
+        self.pinned = set()  # Sets prune() never evicts
+        self._files = None  # card_set → set of file names, filled by the first scan
+        self._access = {}  # "SET/NNN.png" → last use (epoch seconds)
+        self._touched = {}  # Uses since the manifest was last saved
+        self._removed = set()  # Images this process removed since then; None = all (clear())
+        self._settings_changed = False
+        self.added = 0  # Images added since the last prune(); the cache only grows through these
+        self._lock = threading.Lock()
+
+    def path(self, card_set, card_number):
+        """Where a card's image lives in the cache (whether or not it is there yet)."""
+        return os.path.join(self.directory, card_set, card_filename(card_number))
+
+    def set_dir(self, card_set):
+        """A set's folder, created the first time it is needed."""
+        set_dir = os.path.join(self.directory, card_set)
+        files = self._scanned()
+        if card_set not in files:
+            os.makedirs(set_dir, exist_ok=True)
+            with self._lock:
+                files.setdefault(card_set, set())
+        return set_dir
+
+    def contains(self, card_set, card_number):
+        """True if the card's image is in the cache."""
+        return card_filename(card_number) in self._scanned().get(card_set, ())
+
+    def add(self, card_set, card_number):
+        """Record an image that has just been written to the cache."""
+        files = self._scanned()
+        with self._lock:
+            files.setdefault(card_set, set()).add(card_filename(card_number))
+            self.added += 1
+        self.touch(card_set, card_number)
+
+    def touch(self, card_set, card_number):
+        """Record that a card's image was used, for least-recently-used eviction."""
+        with self._lock:
+            self._touched[f"{card_set}/{card_filename(card_number)}"] = int(time.time())
+
+    def discard(self, card_set, card_number):
+        """Forget an image that was removed from the cache."""
+        files = self._scanned()
+        with self._lock:
+            files.get(card_set, set()).discard(card_filename(card_number))
+
+    def load(self):
+        """Scan the cache and read the manifest now rather than on the first lookup."""
+        self._scanned()
+        return self
+
+    def refresh(self):
+        """Drop the index; the next lookup lists the directory again."""
+        with self._lock:
+            self._files = None
+
+    def set_budget(self, max_bytes=None, pin=(), unpin=()):
+        """Change the byte budget and pinned sets. Saved with the manifest."""
+        self._scanned()
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes or None  # 0 removes the budget
+            self.pinned |= set(pin)
+            self.pinned -= set(unpin)
+            self._settings_changed = True
+
+    def usage(self):
+        """
+        Size and last use of every cached image.
+
+        Images the manifest has no record of count as last used when written.
+
+        Returns:
+            List of (card_set, file name, bytes, last use), oldest first.
+        """
+        files = self._scanned()
+        with self._lock:
+            access = {**self._access, **self._touched}
+            listing = [(card_set, name) for card_set, names in files.items() for name in names]
+        entries = []
+        for card_set, name in listing:
+            try:
+                st = os.stat(os.path.join(self.directory, card_set, name))
+            except FileNotFoundError:
+                continue
+            entries.append((card_set, name, st.st_size, access.get(f"{card_set}/{name}", int(st.st_mtime))))
+        entries.sort(key=lambda entry: entry[3])
+        return entries
+
+    def prune(self, max_bytes=None):
+        """
+        Remove least recently used images of unpinned sets until the cache fits the budget.
+
+        Args:
+            max_bytes: Budget to prune to. Defaults to the saved budget.
+
+        Returns:
+            (images removed, bytes freed)
+        """
+        self._scanned()
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        if max_bytes is None:
+            return 0, 0
+        entries = self.usage()
+        self.added = 0
+        thumbnail_dir = None
+        total = sum(size for _, _, size, _ in entries)
+        removed = freed = 0
+        for card_set, name, size, _ in entries:
+            if total <= max_bytes:
+                break
+            if card_set in self.pinned:
+                continue
+            try:
+                os.remove(os.path.join(self.directory, card_set, name))
+            except FileNotFoundError:
+                pass
+            if thumbnail_dir is None:
+                thumbnail_dir = self._thumbnail_dir() or ""
+            if thumbnail_dir:
+                try:
+                    os.remove(os.path.join(thumbnail_dir, card_set, name))
+                except FileNotFoundError:
+                    pass
+            with self._lock:
+                self._files.get(card_set, set()).discard(name)
+                self._access.pop(f"{card_set}/{name}", None)
+                self._touched.pop(f"{card_set}/{name}", None)
+                if self._removed is not None:
+                    self._removed.add(f"{card_set}/{name}")
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def clear(self):
+        """Remove every cached image and draft thumbnail. Budget and pinned sets are kept."""
+        for directory in (self.directory, self._thumbnail_dir()):
+            if not directory or not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                set_dirs = [entry.path for entry in entries if entry.is_dir()]
+            for set_dir in set_dirs:
+                shutil.rmtree(set_dir)
+        with self._lock:
+            self._files = {}
+            self._access = {}
+            self._touched = {}
+            self._removed = None
+
+    def save(self):
+        """
+        Write last-use times, budget, and pinned sets to the manifest.
+
+        Times recorded by other processes since this one loaded the manifest
+        are kept; the later of the two wins.
+        """
+        self._scanned()
+        os.makedirs(self.directory, exist_ok=True)
+        with FileLock(self.manifest_path):
+            self._merge_and_write()
+
+    def _thumbnail_dir(self):
+        return self.thumbnail_dir() if callable(self.thumbnail_dir) else self.thumbnail_dir
+
+    def _merge_and_write(self):
+        disk = self._read_manifest()
+        with self._lock:
+            # Forget images removed here; keep times other processes recorded
+            if self._removed is None:
+                access = {}
+            else:
+                access = {key: used for key, used in disk.get("access", {}).items() if key not in self._removed}
+            for key, used in {**self._access, **self._touched}.items():
+                if used > access.get(key, 0):
+                    access[key] = used
+            if not self._settings_changed:
+                self.max_bytes = disk.get("max_bytes")
+                self.pinned = set(disk.get("pinned", []))
+            data = {"max_bytes": self.max_bytes, "pinned": sorted(self.pinned), "access": access}
+            self._access = access
+            self._touched = {}
+            self._removed = set()
+            self._settings_changed = False
+        tmp_path = temp_path(self.manifest_path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: ignoring unreadable image cache manifest {self.manifest_path}: {e}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _scanned(self):
+        files = self._files
+        if files is None:
+            with self._lock:
+                if self._files is None:
+                    self._files = self._scan()
+                    manifest = self._read_manifest()
+                    self._access = manifest.get("access", {})
+                    if not self._settings_changed:
+                        self.max_bytes = manifest.get("max_bytes")
+                        self.pinned = set(manifest.get("pinned", []))
+                files = self._files
+        return files
+
+    def _scan(self):
+        files = {}
+        try:
+            with os.scandir(self.directory) as sets:
+                set_dirs = [entry.name for entry in sets if entry.is_dir()]
+        except FileNotFoundError:
+            return files
+        for card_set in set_dirs:
+            with os.scandir(os.path.join(self.directory, card_set)) as entries:
+                files[card_set] = {entry.name for entry in entries if entry.name.endswith(".png")}
+        return files
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_image_cache_index():
+    """The process-wide index of the app's image cache."""
+    global _index
+    directory = get_image_cache_dir()
+    with _index_lock:
+        if _index is None or _index.directory != directory:
+            _index = ImageCacheIndex(directory, thumbnail_dir=get_thumbnail_dir)
+        return _index
+
+
+def maintain_image_cache():
+    """Save the manifest and, if images were added to a cache with a budget, prune it. Called after each run."""
+    index = get_image_cache_index()
+    try:
+        index.save()
+        if not index.added:
+            return
+        removed, freed = index.prune()
+        if removed:
+            index.save()
+            print(f"Image cache: removed {removed} least recently used image(s), {format_size(freed)}.")
+    except OSError as e:
+        print(f"Warning: could not maintain the image cache: {e}")
@@ -1,20 +1,27 @@
 import os
+import threading
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 try:
-    from .app_paths import get_image_cache_dir
+    from .image_cache import get_image_cache_index, card_filename
+    from .file_lock import FileLock, temp_path
+    from . import network
 except ImportError:
-    from decklister.app_paths import get_image_cache_dir
+    from decklister.image_cache import get_image_cache_index, card_filename
+    from decklister.file_lock import FileLock, temp_path
+    from decklister import network
 
 
 CDN_BASE = "https://swudb.com/images/cards"
-MAX_WORKERS = 8  # Number of concurrent downloads
+
+_inflight = {}  # Image path → Event set when the download in progress finishes
+_inflight_lock = threading.Lock()
 
 
 def _images_dir():
     """Get the base directory for card images."""
-    return get_image_cache_dir()
+    return get_image_cache_index().directory
 
 
 def download_images(card_set, card_number=None):
@@ -30,11 +37,12 @@ def download_images(card_set, card_number=None):
         print("No card set specified.")
         return
 
-    output_dir = os.path.join(_images_dir(), card_set)
-    os.makedirs(output_dir, exist_ok=True)
+    index = get_image_cache_index()
+    output_dir = index.set_dir(card_set)
 
     if card_number is not None:
-        download_card(card_set, card_number, output_dir)
+        if download_card(card_set, card_number, output_dir) != -1:
+            index.add(card_set, card_number)
     else:
         # Download all cards in sequence until we get a 404
         i = 1
@@ -42,51 +50,131 @@ def download_images(card_set, card_number=None):
             result = download_card(card_set, i, output_dir)
             if result == -1:
                 break
+            index.add(card_set, i)
             i += 1
 
 
+def _missing_cards(unique_cards):
+    """
+    Return the (card_set, card_number) pairs not in the image cache yet, creating their set dirs.
+
+    Cached cards are marked as used, so the cache evicts images nobody asks for.
+    """
+    index = get_image_cache_index()
+    to_download = []
+    for card_set, card_number in unique_cards:
+        if index.contains(card_set, card_number):
+            index.touch(card_set, card_number)
+        else:
+            to_download.append((card_set, card_number))
+    for card_set in {card_set for card_set, _ in to_download}:
+        index.set_dir(card_set)
+    return to_download
+
+
+def _record_download(card_set, card_number, future):
+    """Report a finished download and add the image to the cache index. Returns True if it is on disk."""
+    try:
+        result = future.result()
+    except Exception as e:
+        print(f"Error downloading {card_set} #{card_number}: {e}")
+        return False
+    if result == -1:
+        return False
+    get_image_cache_index().add(card_set, card_number)
+    return True
+
+
 def download_images_batch(cards):
     """
     Download images for a list of (card_set, card_number) tuples concurrently.
 
     Args:
         cards: List of (card_set, card_number) tuples.
+
+    Returns:
+        Sorted list of the (card_set, card_number) tuples whose images could
+        not be downloaded (not found, or the download failed). In offline
+        mode nothing is fetched, and every image not in the cache is listed.
     """
     # Deduplicate and prepare output dirs
     unique_cards = list(set(cards))
-    for card_set, _ in unique_cards:
-        os.makedirs(os.path.join(_images_dir(), card_set), exist_ok=True)
-
-    # Filter out already-downloaded cards
-    to_download = []
-    for card_set, card_number in unique_cards:
-        num_str = str(card_number).zfill(3) if str(card_number).isdigit() else str(card_number)
-        filepath = os.path.join(_images_dir(), card_set, f"{num_str}.png")
-        if not os.path.isfile(filepath):
-            to_download.append((card_set, card_number))
+    to_download = _missing_cards(unique_cards)
 
     if not to_download:
-        return
+        return []
+    if network.is_offline():
+        return _sorted_cards(to_download)
 
     print(f"Downloading {len(to_download)} card image(s)...")
+    failed = []
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    with ThreadPoolExecutor(max_workers=network.pool_size()) as executor:
         futures = {
             executor.submit(download_card, card_set, card_number, os.path.join(_images_dir(), card_set)): (card_set, card_number)
             for card_set, card_number in to_download
         }
         for future in as_completed(futures):
             card_set, card_number = futures[future]
-            try:
-                future.result()
-            except Exception as e:
-                print(f"Error downloading {card_set} #{card_number}: {e}")
+            if not _record_download(card_set, card_number, future):
+                failed.append((card_set, card_number))
+    return _sorted_cards(failed)
+
+
+def _sorted_cards(cards):
+    return sorted(cards, key=lambda card: (card[0], str(card[1])))
+
+
+def download_images_streaming(cards):
+    """
+    Start downloading images for a list of (card_set, card_number) tuples and
+    return an iterator over the tuples in the order their images become available.
+
+    Downloads start before this function returns, so the caller can do other
+    work (e.g. prepare static layers) before iterating. Cards already on disk
+    are yielded first. Failed downloads are still yielded, so the caller can
+    draw a placeholder; in offline mode, so is every missing image, right away.
+    """
+    unique_cards = list(dict.fromkeys(cards))
+    to_download = _missing_cards(unique_cards)
+    missing = set(to_download)
+    cached = [card for card in unique_cards if card not in missing]
+    if network.is_offline():
+        cached += to_download  # Nothing to wait for
+        to_download = []
+
+    executor = None
+    futures = {}
+    if to_download:
+        print(f"Downloading {len(to_download)} card image(s)...")
+        executor = ThreadPoolExecutor(max_workers=network.pool_size())
+        futures = {
+            executor.submit(download_card, card_set, card_number, os.path.join(_images_dir(), card_set)): (card_set, card_number)
+            for card_set, card_number in to_download
+        }
+
+    def arrivals():
+        try:
+            yield from cached
+            for future in as_completed(futures):
+                card_set, card_number = futures[future]
+                _record_download(card_set, card_number, future)
+                yield (card_set, card_number)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    return arrivals()
 
 
 def download_card(card_set, card_number, output_dir):
     """
     Download a single card image via the API.
 
+    Safe to call for the same card from several threads, processes, or hosts
+    sharing one cache: one caller fetches the image while the others wait
+    for it, and the file appears all at once via os.replace().
+
     Args:
         card_set (str): The card set identifier.
         card_number (str or int): The card number.
@@ -95,24 +183,54 @@ def download_card(card_set, card_number, output_dir):
     Returns:
         1 if downloaded, 0 if already exists, -1 if not found.
     """
-    card_number = str(card_number)
-    # Pad to 3 digits for the filename
-    num_str = card_number.zfill(3) if card_number.isdigit() else card_number
-    filename = f"{num_str}.png"
+    filename = card_filename(card_number)
+    num_str = filename[:-len(".png")]
     filepath = os.path.join(output_dir, filename)
+    if network.is_offline():
+        return 0 if os.path.isfile(filepath) else -1
+
+    # Single flight within this process: later callers wait for the first
+    with _inflight_lock:
+        done = _inflight.get(filepath)
+        if done is None:
+            _inflight[filepath] = threading.Event()
+    if done is not None:
+        done.wait()
+        return 0 if os.path.isfile(filepath) else -1
+    try:
+        return _download_locked(card_set, num_str, filepath)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(filepath).set()
+
+
+def _download_locked(card_set, num_str, filepath):
+    """Fetch an image under its lock file, unless another process fetches it first."""
+    lock = FileLock(filepath)
+    while not lock.acquire(timeout=0):
+        lock.wait()  # Another process or host is downloading this card
+        if os.path.isfile(filepath):
+            return 0
+    try:
+        if os.path.isfile(filepath):
+            return 0
+        return _fetch_card(card_set, num_str, filepath)
+    finally:
+        lock.release()
 
-    if os.path.isfile(filepath):
-        return 0
 
+def _fetch_card(card_set, num_str, filepath):
     url = f"{CDN_BASE}/{card_set}/{num_str}.png"
     print(f"Downloading {card_set} #{num_str}...")
 
+    tmp_path = temp_path(filepath)
     try:
-        response = requests.get(url, allow_redirects=True, timeout=15)
+        response = network.get(url, allow_redirects=True, timeout=15)
         response.raise_for_status()
 
-        with open(filepath, "wb") as f:
+        with open(tmp_path, "wb") as f:
             f.write(response.content)
+        os.replace(tmp_path, filepath)
 
         return 1
 
@@ -124,6 +242,10 @@ def download_card(card_set, card_number, output_dir):
 
     except Exception as e:
         print(f"Failed to download {card_set} #{num_str}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
         return -1
 
 
@@ -0,0 +1,156 @@
+"""
+Incremental re-rendering for live coverage.
+
+When the same player's deck is shown repeatedly with small changes (usually a
+few sideboard swaps), only the grid cells whose card or count changed need to
+be redrawn. LiveRenderer diffs two decks, renders just the changed regions
+through the full layer stack, and pastes them into the previous image.
+"""
+try:
+    from .card_sizer import CardSizer
+    from .renderer import Renderer
+    from . import image_downloader as ImageDownloader
+except ImportError:
+    from decklister.card_sizer import CardSizer
+    from decklister.renderer import Renderer
+    from decklister import image_downloader as ImageDownloader
+
+
+def _card_key(card):
+    return (card.card_set, card.card_number, card.count)
+
+
+class LiveRenderer:
+    """
+    Keeps a Renderer (with its decoded layers and prepared tiles) warm between
+    renders, and redraws only what changed between two versions of a deck.
+
+    Decks passed in are rendered as-is: resolve variants before calling.
+    """
+
+    # Fall back to a full render when the changed regions cover more than this
+    # fraction of the canvas.
+    FULL_REDRAW_FRACTION = 0.5
+
+    def __init__(self, config, renderer=None):
+        self.config = config
+        self.renderer = renderer or Renderer(config, tile_cache={})
+
+    def render(self, deck):
+        """Render a deck from scratch. Returns an RGB image."""
+        self._download_images(deck.leaders + deck.bases + deck.main_deck + deck.sideboard)
+        deck_area, deck_layout, sb_area, sb_layout = self._layouts(deck)
+        return self.renderer.render(deck, deck_layout, sb_layout, deck_area=deck_area, sb_area=sb_area)
+
+    def update(self, prev_deck, prev_image, new_deck):
+        """
+        Return the image for new_deck, reusing prev_image where nothing changed.
+
+        Args:
+            prev_deck: The Deck that prev_image was rendered from.
+            prev_image: The previous output image (from render() or update()).
+            new_deck: The updated Deck.
+
+        Returns:
+            A new image; prev_image is not modified.
+        """
+        regions = self.changed_regions(prev_deck, new_deck)
+        if regions is None:
+            return self.render(new_deck)
+
+        image = prev_image.copy()
+        if not regions:
+            return image
+
+        prev_cards = {_card_key(c) for c in prev_deck.leaders + prev_deck.bases + prev_deck.main_deck + prev_deck.sideboard}
+        self._download_images([
+            c for c in new_deck.leaders + new_deck.bases + new_deck.main_deck + new_deck.sideboard
+            if _card_key(c) not in prev_cards
+        ])
+
+        deck_area, deck_layout, sb_area, sb_layout = self._layouts(new_deck)
+        for region in regions:
+            part = self.renderer.render_region(
+                new_deck, deck_layout, sb_layout, region, deck_area=deck_area, sb_area=sb_area
+            )
+            image.paste(part.convert(image.mode), region[:2])
+        return image
+
+    def changed_regions(self, prev_deck, new_deck):
+        """
+        List the canvas rectangles that differ between two decks.
+
+        Returns:
+            A list of (x0, y0, x1, y1) rectangles, or None if a full render is
+            needed (metadata shown on the image changed, or most of the canvas
+            is affected).
+        """
+        if prev_deck.metadata != new_deck.metadata and self._uses_metadata():
+            return None
+
+        regions = []
+        self._diff_slots(prev_deck.leaders, new_deck.leaders, self.config.leader_areas, regions)
+        self._diff_slots(prev_deck.bases, new_deck.bases, self.config.base_areas, regions)
+
+        prev_deck_area, prev_deck_layout, prev_sb_area, prev_sb_layout = self._layouts(prev_deck)
+        new_deck_area, new_deck_layout, new_sb_area, new_sb_layout = self._layouts(new_deck)
+        self._diff_grid(
+            prev_deck.main_deck, new_deck.main_deck,
+            (prev_deck_area, prev_deck_layout), (new_deck_area, new_deck_layout), regions,
+        )
+        self._diff_grid(
+            prev_deck.sideboard, new_deck.sideboard,
+            (prev_sb_area, prev_sb_layout), (new_sb_area, new_sb_layout), regions,
+        )
+
+        width, height = self.config.resolution
+        clipped = []
+        for x0, y0, x1, y1 in regions:
+            rect = (max(0, x0), max(0, y0), min(width, x1), min(height, y1))
+            if rect[0] < rect[2] and rect[1] < rect[3] and rect not in clipped:
+                clipped.append(rect)
+
+        changed = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in clipped)
+        if changed > self.FULL_REDRAW_FRACTION * width * height:
+            return None
+        return clipped
+
+    def _diff_slots(self, prev_cards, new_cards, areas, regions):
+        """Mark leader/base areas whose card changed."""
+        areas = areas or []
+        for i in range(min(max(len(prev_cards), len(new_cards)), len(areas))):
+            prev = _card_key(prev_cards[i]) if i < len(prev_cards) else None
+            new = _card_key(new_cards[i]) if i < len(new_cards) else None
+            if prev != new:
+                regions.append(tuple(areas[i]))
+
+    def _diff_grid(self, prev_cards, new_cards, prev_grid, new_grid, regions):
+        """Mark grid cells whose card or count changed, or the whole grid if its layout changed."""
+        if prev_grid != new_grid:
+            for area, layout in (prev_grid, new_grid):
+                if area is not None:
+                    regions.append(tuple(area))
+            return
+
+        area, layout = new_grid
+        if area is None or layout is None:
+            return
+        for i in range(max(len(prev_cards), len(new_cards))):
+            prev = _card_key(prev_cards[i]) if i < len(prev_cards) else None
+            new = _card_key(new_cards[i]) if i < len(new_cards) else None
+            if prev != new:
+                regions.append(Renderer.grid_cell(area, layout, i))
+
+    def _layouts(self, deck):
+        return CardSizer.layout_for_config(self.config, len(deck.main_deck), len(deck.sideboard))
+
+    def _uses_metadata(self):
+        """True if any layer draws deck metadata."""
+        return any(
+            isinstance(layer, dict) and layer.get("type") == "csv_field"
+            for layer in self.config.layers
+        )
+
+    def _download_images(self, cards):
+        if cards:
+            ImageDownloader.download_images_batch([(c.card_set, c.card_number) for c in cards])
@@ -6,19 +6,23 @@ are resolved by looking up card names against the swudb.com API.
 Resolved names are cached in card_cache.json to avoid redundant API calls.
 """
 import csv
+import hashlib
 import json
 import os
 import sys
 import urllib.parse
-import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 try:
     from .deck import Card, Deck
     from .app_paths import get_card_cache_path
+    from .file_lock import FileLock, temp_path
+    from . import network
 except ImportError:
     from decklister.deck import Card, Deck
     from decklister.app_paths import get_card_cache_path
+    from decklister.file_lock import FileLock, temp_path
+    from decklister import network
 
 SWUDB_SEARCH = "https://swudb.com/api/search"
 SWUDB_HEADERS = {
@@ -29,14 +33,23 @@ SWUDB_HEADERS = {
     ),
     "Accept": "application/json",
 }
-MAX_WORKERS = 4  # Conservative to avoid rate-limiting
+
+# Row orders for batch output → CSV columns to sort by (first non-empty wins).
+# None keeps the CSV order.
+ROW_ORDERS = {
+    "csv": None,
+    "player": ("OwnerDisplayName", "OwnerUsername"),
+    "table": ("TableNumber", "Table"),
+    "standing": ("Rank", "Standing"),
+}
 
 
 def _cache_key(name, subtitle):
     return f"{name}|{subtitle}" if subtitle else name
 
 
-def _load_cache():
+def load_card_cache():
+    """The card name → ID cache from card_cache.json ({} if missing or unreadable)."""
     cache_path = get_card_cache_path()
     if os.path.exists(cache_path):
         try:
@@ -48,10 +61,21 @@ def _load_cache():
 
 
 def _save_cache(cache):
+    """
+    Merge `cache` into card_cache.json.
+
+    Several processes may share the file, so it is re-read under a lock and
+    entries others saved in the meantime are kept (and added to `cache`).
+    """
     cache_path = get_card_cache_path()
     try:
-        with open(cache_path, "w", encoding="utf-8") as f:
-            json.dump(cache, f, ensure_ascii=False, indent=2)
+        with FileLock(cache_path):
+            merged = {**load_card_cache(), **cache}
+            tmp_path = temp_path(cache_path)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, cache_path)
+        cache.update(merged)
     except Exception as e:
         print(f"Warning: could not save card cache: {e}")
 
@@ -73,7 +97,7 @@ def _lookup_card_id(name, subtitle):
             f"{SWUDB_SEARCH}/{urllib.parse.quote(query)}"
             f"?grouping=cards&sortorder=setno&sortdir=asc"
         )
-        resp = requests.get(url, headers=SWUDB_HEADERS, timeout=10)
+        resp = network.get(url, headers=SWUDB_HEADERS, timeout=10)
         resp.raise_for_status()
 
         printings = resp.json().get("printings", [])
@@ -108,8 +132,19 @@ def _count_rows(path):
         return 1
 
 
-def _select_row(rows, player_name=None, deck_index=0):
-    """Pick which CSV row to use and return it."""
+def display_name(row, default=""):
+    """The name a row's player goes by: display name, else username."""
+    return row.get("OwnerDisplayName") or row.get("OwnerUsername") or default
+
+
+def select_row(rows, player_name=None, deck_index=0):
+    """
+    Pick the CSV row of one deck: the player's (by display name, username,
+    or full name) if player_name is given, else the one at deck_index.
+
+    Raises:
+        ValueError: If there are no rows, no such player, or no such index.
+    """
     if not rows:
         raise ValueError("CSV file contains no decks.")
 
@@ -135,7 +170,7 @@ def _select_row(rows, player_name=None, deck_index=0):
 
     row = rows[deck_index]
     if len(rows) > 1:
-        display = row.get("OwnerDisplayName") or row.get("OwnerUsername", "?")
+        display = display_name(row, "?")
         print(
             f"CSV contains {len(rows)} decks — using index {deck_index} ({display}). "
             f"Use --player or --index to select a different deck."
@@ -143,21 +178,14 @@ def _select_row(rows, player_name=None, deck_index=0):
     return row
 
 
-def parse_melee_csv(path, player_name=None, deck_index=0):
+def read_melee_rows(path):
     """
-    Parse a Melee.gg CSV export and return a Deck object.
-
-    Card IDs are resolved via the swu-db.com API. When a card appears in
-    multiple sets, the first API result is used.
+    Read every row of a Melee.gg CSV export.
 
-    Args:
-        path: Path to the Melee.gg CSV file.
-        player_name: OwnerDisplayName, OwnerUsername, or full name to filter by.
-                     If None, deck_index is used instead.
-        deck_index: 0-based row index when player_name is not given (default 0).
+    Handles a UTF-8 BOM and repairs double UTF-8 encoding.
 
     Returns:
-        Deck object ready for rendering.
+        List of row dicts (column name → value).
     """
     # Read raw bytes to detect encoding issues
     with open(path, "rb") as f:
@@ -181,34 +209,113 @@ def parse_melee_csv(path, player_name=None, deck_index=0):
 
     import io
     reader = csv.DictReader(io.StringIO(text))
-    rows = list(reader)
+    return list(reader)
 
-    row = _select_row(rows, player_name=player_name, deck_index=deck_index)
 
-    deck_name = row.get("Name", "")
-    print(f"Parsing deck: {deck_name}")
+def sort_rows(rows, order="csv"):
+    """
+    Return (index, row) pairs in the requested order.
+
+    Numeric columns sort numerically and text columns case-insensitively.
+    Rows missing the column go last, in CSV order. The index is the row's
+    position in the CSV, so output names stay stable across orders.
+    """
+    if order not in ROW_ORDERS:
+        raise ValueError(f"unknown order {order!r} (choose from {', '.join(ROW_ORDERS)})")
+    indexed = list(enumerate(rows))
+    columns = ROW_ORDERS[order]
+    if columns is None:
+        return indexed
+
+    def key(item):
+        index, row = item
+        value = next((row.get(c, "").strip() for c in columns if (row.get(c) or "").strip()), "")
+        if not value:
+            return (2, 0, "", index)
+        try:
+            return (0, float(value), "", index)
+        except ValueError:
+            return (1, 0, value.casefold(), index)
+
+    return sorted(indexed, key=key)
 
+
+def _parse_records(row):
+    """Decode a row's Records field: a JSON list, or JSON objects separated by "|"."""
     records_raw = row.get("Records", "[]")
     try:
         stripped = records_raw.strip()
         if stripped.startswith("["):
-            records = json.loads(stripped)
-        else:
-            records = [json.loads(part.strip()) for part in stripped.split("|") if part.strip()]
+            return json.loads(stripped)
+        return [json.loads(part.strip()) for part in stripped.split("|") if part.strip()]
     except json.JSONDecodeError as e:
         raise ValueError(
-            f"Could not parse Records field for deck '{deck_name}': {e}\n"
+            f"Could not parse Records field for deck '{row.get('Name', '')}': {e}\n"
             f"Raw value (first 200 chars): {records_raw[:200]!r}"
         ) from e
 
-    # Collect unique (name, subtitle) pairs to minimise API calls
-    unique_cards = {}
-    for rec in records:
-        key = (rec["n"], rec.get("s"))
-        unique_cards[key] = None
+
+def records_key(row):
+    """
+    Hash of a row's decklist, ignoring the player and other metadata.
+
+    Rows with equal keys parse to decks with the same cards in the same order,
+    so they render identically apart from metadata layers. Returns None if
+    the Records field cannot be read.
+    """
+    try:
+        records = [[rec["n"], rec.get("s"), rec["q"], rec["c"]] for rec in _parse_records(row)]
+    except (ValueError, KeyError, TypeError):
+        return None
+    return hashlib.sha1(json.dumps(records).encode("utf-8")).hexdigest()
+
+
+def parse_melee_csv(path, player_name=None, deck_index=0):
+    """
+    Parse a Melee.gg CSV export and return a Deck object.
+
+    Card IDs are resolved via the swu-db.com API. When a card appears in
+    multiple sets, the first API result is used.
+
+    Args:
+        path: Path to the Melee.gg CSV file.
+        player_name: OwnerDisplayName, OwnerUsername, or full name to filter by.
+                     If None, deck_index is used instead.
+        deck_index: 0-based row index when player_name is not given (default 0).
+
+    Returns:
+        Deck object ready for rendering.
+    """
+    rows = read_melee_rows(path)
+    row = select_row(rows, player_name=player_name, deck_index=deck_index)
+    return deck_from_row(row)
+
+
+def card_names(row):
+    """The (name, subtitle) pairs of every card in a row's decklist, in order of first appearance."""
+    return list(dict.fromkeys((rec["n"], rec.get("s")) for rec in _parse_records(row)))
+
+
+def resolve_card_ids(names, cache=None):
+    """
+    Resolve card names to IDs, from the cache or the swudb.com API.
+
+    Names not in the cache are looked up in parallel, and the results are
+    saved to card_cache.json. In offline mode they are left unresolved.
+
+    Args:
+        names: Iterable of (name, subtitle) pairs.
+        cache: Card name → ID cache dict. Loaded from card_cache.json if not given.
+
+    Returns:
+        Dict of (name, subtitle) → "SET_NUMBER", or None for names that
+        could not be resolved.
+    """
+    unique_cards = dict.fromkeys(names)
 
     # Check cache first
-    cache = _load_cache()
+    if cache is None:
+        cache = load_card_cache()
     for key in unique_cards:
         name, subtitle = key
         cached = cache.get(_cache_key(name, subtitle))
@@ -217,9 +324,11 @@ def parse_melee_csv(path, player_name=None, deck_index=0):
 
     # Resolve remaining card IDs from the API in parallel
     uncached = {k: v for k, v in unique_cards.items() if v is None}
-    if uncached:
+    if uncached and network.is_offline():
+        print(f"Offline: {len(uncached)} card name(s) not in the card cache ({len(unique_cards) - len(uncached)} cached).")
+    elif uncached:
         print(f"Resolving {len(uncached)} card(s) via swu-db.com API ({len(unique_cards) - len(uncached)} cached)...")
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        with ThreadPoolExecutor(max_workers=network.pool_size()) as executor:
             futures = {
                 executor.submit(_lookup_card_id, name, subtitle): (name, subtitle)
                 for name, subtitle in uncached
@@ -234,6 +343,29 @@ def parse_melee_csv(path, player_name=None, deck_index=0):
         _save_cache(cache)
     else:
         print(f"All {len(unique_cards)} card(s) resolved from cache.")
+    return unique_cards
+
+
+def deck_from_row(row, cache=None, card_ids=None):
+    """
+    Build a Deck from one row of a Melee.gg CSV export.
+
+    Args:
+        row: Row dict from read_melee_rows().
+        cache: Card name → ID cache dict to reuse across rows. Loaded from
+               card_cache.json if not given.
+        card_ids: (name, subtitle) → ID dict from resolve_card_ids() covering
+               this row's cards. Resolved here if not given.
+
+    Returns:
+        Deck object ready for rendering.
+    """
+    deck_name = row.get("Name", "")
+    print(f"Parsing deck: {deck_name}")
+    records = _parse_records(row)
+    unique_cards = card_ids if card_ids is not None else resolve_card_ids(
+        [(rec["n"], rec.get("s")) for rec in records], cache
+    )
 
     # Build Deck from records
     leaders, bases, main_deck, sideboard = [], [], [], []
@@ -0,0 +1,241 @@
+"""
+The one way decklister reaches the network.
+
+Every HTTP request (card images and card name lookups) goes through get(), so
+offline mode can switch all of them off in one place. Offline, get() raises
+OfflineError at once instead of waiting for a connection timeout, and the
+downloader and name resolver do not even try: missing images and names are
+reported as missing.
+
+Online, requests to each host share two limits, whichever thread makes them:
+
+    rate        a token bucket: at most `rate_limit` requests start per
+                second, with bursts of up to `burst` after a quiet spell
+    concurrency an adaptive limit on requests in flight (AIMD). It starts
+                at `concurrency` and doubles every round trip until the
+                host pushes back, then grows by one per round trip. It
+                halves on a 429 or 5xx response, a failed request, or a
+                response `latency_factor` times slower than the fastest so
+                far, at most once per round trip.
+
+429 and 5xx responses are retried up to `retries` times. A Retry-After
+header pauses every request to the host, not just the one that got it.
+Thread pools are sized to `max_concurrency`, so the adaptive limit, not the
+pool, decides how many requests run at once.
+"""
+import threading
+import time
+import urllib.parse
+
+import requests
+
+# Settings, changed with configure() (CLI flags or the config's "network" object)
+DEFAULTS = {
+    "concurrency": 8,  # Requests in flight per host to start with
+    "min_concurrency": 1,
+    "max_concurrency": 32,  # Also the size of the download and lookup thread pools
+    "rate_limit": 100.0,  # Requests started per second per host (0 = no limit)
+    "burst": 50,  # Requests that may start at once after a quiet spell
+    "latency_factor": 4.0,  # Slowdown over the fastest response that counts as congestion (0 = ignore latency)
+    "retries": 3,  # Retries of a request answered with 429 or 5xx
+}
+MIN_BASELINE = 0.1  # Seconds; responses faster than this never count as slow
+BACKOFF = 0.5  # Seconds before the first retry without a Retry-After header; doubles per retry
+
+_offline = False
+_settings = dict(DEFAULTS)
+_hosts = {}  # Host → HostLimiter
+_hosts_lock = threading.Lock()
+
+
+class OfflineError(requests.exceptions.ConnectionError):
+    """Raised by get() in offline mode instead of making a request."""
+
+
+def set_offline(offline=True):
+    """Switch all network access off (or back on) for this process."""
+    global _offline
+    _offline = offline
+
+
+def is_offline():
+    return _offline
+
+
+def configure(**settings):
+    """
+    Change network settings (see DEFAULTS). None values are ignored.
+
+    Raises:
+        ValueError: For unknown names or out-of-range values.
+    """
+    unknown = set(settings) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"unknown network setting(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(DEFAULTS)}")
+    merged = {**_settings, **{name: value for name, value in settings.items() if value is not None}}
+    for name in ("concurrency", "min_concurrency", "max_concurrency", "burst"):
+        if not isinstance(merged[name], int) or merged[name] < 1:
+            raise ValueError(f"network setting {name} must be a whole number of at least 1")
+    for name in ("rate_limit", "latency_factor", "retries"):
+        if not isinstance(merged[name], (int, float)) or merged[name] < 0:
+            raise ValueError(f"network setting {name} must be 0 or more")
+    if merged["min_concurrency"] > merged["max_concurrency"]:
+        raise ValueError("network setting min_concurrency must be at most max_concurrency")
+    merged["concurrency"] = max(merged["min_concurrency"], min(merged["concurrency"], merged["max_concurrency"]))
+    _settings.update(merged)
+    with _hosts_lock:
+        _hosts.clear()  # New limits apply to requests from now on
+
+
+def pool_size():
+    """Threads to give a download or lookup pool."""
+    return _settings["max_concurrency"]
+
+
+class TokenBucket:
+    """Start at most `rate` requests per second, in bursts of up to `burst`, across threads."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wait for a token."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    self._updated = self._paused_until  # No tokens accrue during a pause
+                    wait = self._paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hand out no tokens for this long (e.g. a Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class AdaptiveLimit:
+    """
+    Concurrency limit adjusted by AIMD: slow start, additive increase,
+    multiplicative decrease.
+    """
+
+    def __init__(self, initial, minimum, maximum, latency_factor):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.decreases = 0
+        self.peak = initial
+        self._slow_start = True
+        self._fastest = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Wait for a slot. Returns the start time to pass to release()."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started, failed=False):
+        """
+        Free a slot and adjust the limit.
+
+        Args:
+            started: acquire()'s return value.
+            failed: The request failed or was refused (429, 5xx).
+        """
+        elapsed = time.monotonic() - started
+        with self._condition:
+            self.in_flight -= 1
+            slow = bool(
+                self.latency_factor and self._fastest is not None
+                and elapsed > self.latency_factor * max(self._fastest, MIN_BASELINE)
+            )
+            if not failed:
+                self._fastest = elapsed if self._fastest is None else min(self._fastest, elapsed)
+            if failed or slow:
+                # Only requests started after the last cut reflect it, so cut once per round trip
+                if started >= self._last_decrease:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._slow_start = False
+                    self._last_decrease = time.monotonic()
+                    self.decreases += 1
+            else:
+                # Slow start adds one per response (doubling per round trip); then one per round trip
+                self.limit = min(self.maximum, self.limit + (1 if self._slow_start else 1 / self.limit))
+                self.peak = max(self.peak, int(self.limit))
+            self._condition.notify_all()
+
+
+class HostLimiter:
+    """The rate and concurrency limits shared by every request to one host."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.bucket = TokenBucket(settings["rate_limit"], settings["burst"]) if settings["rate_limit"] else None
+        self.concurrency = AdaptiveLimit(
+            settings["concurrency"], settings["min_concurrency"], settings["max_concurrency"], settings["latency_factor"],
+        )
+
+    def get(self, url, **kwargs):
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            started = self.concurrency.acquire()
+            failed = True
+            try:
+                response = requests.get(url, **kwargs)
+                failed = response.status_code == 429 or response.status_code >= 500
+            finally:
+                self.concurrency.release(started, failed=failed)
+            if not failed or attempt >= self.settings["retries"]:
+                return response
+            wait = _retry_after(response)
+            if wait is not None and self.bucket is not None:
+                self.bucket.pause(wait)
+            time.sleep(wait if wait is not None else BACKOFF * 2 ** attempt)
+            attempt += 1
+
+
+def _retry_after(response):
+    """Seconds from a Retry-After header given in seconds, or None."""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+def host_limiter(url):
+    """The HostLimiter for a URL's host."""
+    host = urllib.parse.urlsplit(url).netloc
+    with _hosts_lock:
+        limiter = _hosts.get(host)
+        if limiter is None:
+            limiter = _hosts[host] = HostLimiter(dict(_settings))
+        return limiter
+
+
+def get(url, **kwargs):
+    """requests.get() within the host's rate and concurrency limits, unless offline mode is on."""
+    if _offline:
+        raise OfflineError(f"Offline mode: not fetching {url}")
+    return host_limiter(url).get(url, **kwargs)
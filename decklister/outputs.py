@@ -0,0 +1,135 @@
+"""
+Output specs for writing one composed deck image at several sizes and formats.
+
+The canvas is composed once, at the size of the largest output, and each
+output is produced from it with a single downscale and encode.
+"""
+import os
+from PIL import Image
+
+# File extension → Pillow format name
+FORMATS = {".png": "PNG", ".webp": "WEBP", ".jpg": "JPEG", ".jpeg": "JPEG"}
+# Pillow format name → default file extension
+EXTENSIONS = {"PNG": ".png", "WEBP": ".webp", "JPEG": ".jpg"}
+
+
+class OutputSpec:
+    """
+    One output file: where it goes, how wide it is, and how it is encoded.
+
+    Config form ("outputs" list):
+        {"suffix": "1080p", "width": 1920, "format": "webp", "quality": 90}
+    CLI form (repeated -o):
+        out.png, out_1080p.webp@1920, thumb.jpg@400
+    """
+
+    def __init__(self, path=None, width=None, format=None, suffix=None, quality=None):
+        """
+        Args:
+            path: Explicit output path (single-deck runs). If None, the path is
+                derived from the deck's output name plus `suffix`.
+            width: Output width in pixels; height keeps the canvas aspect
+                ratio. None means the full canvas width.
+            format: "png", "webp", or "jpeg". Defaults to the path's extension, then PNG.
+            suffix: Added to the derived file name as "_<suffix>". Defaults to "<width>w".
+            quality: Encoder quality for WebP/JPEG (optional).
+        """
+        if width is not None and int(width) <= 0:
+            raise ValueError(f"output width must be positive, not {width!r}")
+        if format is not None:
+            format = format.upper()
+            format = "JPEG" if format == "JPG" else format
+            if format not in EXTENSIONS:
+                raise ValueError(f"unsupported output format {format!r} (use png, webp, or jpeg)")
+        elif path is not None and os.path.splitext(path)[1].lower() not in FORMATS:
+            raise ValueError(f"cannot tell the output format of {path!r} (use .png, .webp, or .jpg)")
+        self.path = path
+        self.width = int(width) if width is not None else None
+        self.format = format
+        self.suffix = suffix
+        self.quality = quality
+
+    def __repr__(self):
+        return f"OutputSpec(path={self.path!r}, width={self.width!r}, format={self.image_format!r})"
+
+    @classmethod
+    def parse(cls, text):
+        """Parse a CLI output: "path" or "path@WIDTH"."""
+        path, sep, width = text.rpartition("@")
+        if not sep:
+            return cls(path=text)
+        try:
+            width = int(width)
+        except ValueError:
+            raise ValueError(f"invalid output {text!r}: expected PATH or PATH@WIDTH")
+        return cls(path=path, width=width)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a spec from one entry of the config "outputs" list."""
+        if not isinstance(data, dict):
+            raise ValueError(f"each entry in outputs must be an object, not {data!r}")
+        return cls(
+            path=data.get("path"),
+            width=data.get("width"),
+            format=data.get("format"),
+            suffix=data.get("suffix"),
+            quality=data.get("quality"),
+        )
+
+    @property
+    def image_format(self):
+        if self.format:
+            return self.format
+        if self.path:
+            return FORMATS[os.path.splitext(self.path)[1].lower()]
+        return "PNG"
+
+    def target_size(self, size):
+        """Output size for a canvas of `size`. Outputs are never upscaled."""
+        width, height = size
+        if self.width is None or self.width >= width:
+            return size
+        return (self.width, max(1, round(height * self.width / width)))
+
+    def output_path(self, base_path, use_path=True):
+        """
+        Resolve where this output is written.
+
+        Args:
+            base_path: The deck's output path (explicit or auto-named).
+            use_path: If False, ignore an explicit path (batch runs write one
+                file per deck, so explicit paths would collide).
+        """
+        if self.path and use_path:
+            return self.path
+        base = os.path.splitext(base_path)[0]
+        suffix = self.suffix or (f"{self.width}w" if self.width else None)
+        if suffix:
+            base = f"{base}_{suffix}"
+        return base + EXTENSIONS[self.image_format]
+
+    def save(self, image, path):
+        """Downscale the composed image if needed and encode it to path."""
+        size = self.target_size(image.size)
+        if size != image.size:
+            image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+        fmt = self.image_format
+        if fmt == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        params = {}
+        if self.quality is not None:
+            params["quality"] = self.quality
+        image.save(path, fmt, **params)
+
+
+def render_scale(specs, resolution):
+    """
+    Fraction of the config resolution the canvas needs to cover every output.
+
+    Returns 1.0 unless every output is narrower than the config resolution,
+    in which case the canvas is composed at the largest output's width.
+    """
+    if not specs or any(spec.width is None for spec in specs):
+        return 1.0
+    return min(1.0, max(spec.width for spec in specs) / resolution[0])
@@ -0,0 +1,125 @@
+"""
+Streaming multi-page PDF writer.
+
+Each page is one deck image, JPEG-encoded and written to the file as soon as
+it is added, so only the byte offsets of finished objects stay in memory. The
+page tree, catalog, and cross-reference table are written by close().
+"""
+import io
+import os
+
+DEFAULT_DPI = 150  # Image pixels per inch when sizing pages
+DEFAULT_QUALITY = 90  # JPEG quality of page images
+
+_PAGES_ID = 2  # Object number reserved for the page tree (written last)
+_CATALOG_ID = 1
+
+
+class PdfStreamWriter:
+    """
+    Write deck images as consecutive PDF pages.
+
+    Usage:
+        with PdfStreamWriter("decks.pdf") as pdf:
+            for image in images:
+                pdf.add_page(image)
+
+    Each page is sized to its image at `dpi`. The file is written to a
+    temporary path and moved into place by close().
+    """
+
+    def __init__(self, path, dpi=DEFAULT_DPI, quality=DEFAULT_QUALITY):
+        self.path = path
+        self.dpi = dpi
+        self.quality = quality
+        self._offsets = {}  # object number → byte offset
+        self._next_id = 3
+        self._page_ids = []
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        # Binary comment after the header marks the file as binary for transfer tools
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self):
+        return len(self._page_ids)
+
+    def _allocate(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(f"{obj_id} 0 obj\n".encode("ascii"))
+        self._file.write(body)
+        if stream is not None:
+            self._file.write(b"\nstream\n")
+            self._file.write(stream)
+            self._file.write(b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def add_page(self, image):
+        """Encode an image and append it as a new page."""
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=self.quality)
+        data = buffer.getvalue()
+        del buffer
+
+        width_pt = image.width * 72 / self.dpi
+        height_pt = image.height * 72 / self.dpi
+        image_id, content_id, page_id = self._allocate(), self._allocate(), self._allocate()
+
+        self._write_object(image_id, (
+            f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode /Length {len(data)} >>"
+        ).encode("ascii"), data)
+        content = f"q {width_pt:.2f} 0 0 {height_pt:.2f} 0 0 cm /Im0 Do Q".encode("ascii")
+        self._write_object(content_id, f"<< /Length {len(content)} >>".encode("ascii"), content)
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent {_PAGES_ID} 0 R /MediaBox [0 0 {width_pt:.2f} {height_pt:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("ascii"))
+        self._page_ids.append(page_id)
+
+    def close(self):
+        """Write the page tree, catalog, and cross-reference table, then move the PDF into place."""
+        if self._file is None:
+            return
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(_PAGES_ID, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode("ascii"))
+        self._write_object(_CATALOG_ID, f"<< /Type /Catalog /Pages {_PAGES_ID} 0 R >>".encode("ascii"))
+
+        xref_offset = self._file.tell()
+        size = self._next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            lines.append(f"{self._offsets[obj_id]:010d} 00000 n \n")
+        lines.append(f"trailer\n<< /Size {size} /Root {_CATALOG_ID} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self._file.write("".join(lines).encode("ascii"))
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard a partly written PDF."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+        return False
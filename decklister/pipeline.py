@@ -0,0 +1,110 @@
+"""
+Staged, pipelined batch processing.
+
+Each stage runs on its own thread and hands work to the next through a
+bounded queue. While one deck is rendering, the next deck's images can be
+downloading and the previous deck's PNG can be encoding. A full queue blocks
+the stage in front of it, so at most a few decks are in memory at once.
+"""
+import queue
+import threading
+import time
+
+_DONE = object()  # End-of-stream marker passed down the queues
+
+
+class DeckJob:
+    """
+    One deck moving through the pipeline.
+
+    Stages fill in fields as they go. If a stage raises, `error` is set and
+    later stages pass the job through without calling their stage function.
+    """
+
+    def __init__(self, index, deck_file, label=None, row=None, deck=None, output_path=None,
+                 player=None, deck_index=0, is_multi_deck=False, content_key=None, batch=True):
+        self.index = index  # Position in the batch
+        self.deck_file = deck_file
+        self.label = label or f"index {index}"
+        self.row = row  # Raw CSV row, if the deck still needs parsing
+        self.batch = batch  # One of many decks: explicit paths in output specs would collide, so they are ignored
+        self.deck = deck
+        self.output_path = output_path
+        self.player = player
+        self.deck_index = deck_index
+        self.is_multi_deck = is_multi_deck
+        self.content_key = content_key  # Hash of the decklist; equal keys render the same cards
+        self.variant_decks = None  # [(variant name, resolved Deck)]
+        self.images = None  # [(variant name, rendered Image)]
+        self.render_keys = {}  # variant name → key of everything the image depends on
+        self.outputs = []  # Paths written
+        self.error = None
+        self.timings = {}  # stage name → seconds
+
+    def __repr__(self):
+        return f"DeckJob({self.index}, {self.label!r})"
+
+
+def run_stages(items, stages, queue_size=2, on_done=None):
+    """
+    Push items through a list of stages, each on its own thread.
+
+    Args:
+        items: Iterable of DeckJob (or any object with `error` and `timings`).
+            It is consumed on a feeder thread, so it can be an endless stream.
+        stages: List of (name, fn). fn(item) processes the item in place.
+        queue_size: Max items waiting in front of each stage (backpressure).
+        on_done: Optional fn(item) called as each item leaves the last stage,
+            failed or not. Items are then not collected, so a long-running
+            stream doesn't keep every finished item in memory.
+
+    Returns:
+        The items in their original order, after the last stage (empty with on_done).
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    finished = []
+
+    def feed():
+        try:
+            for item in items:
+                queues[0].put(item)
+        except Exception as e:
+            print(f"Error reading batch input: {e}")
+        finally:
+            queues[0].put(_DONE)
+
+    def work(i, name, fn):
+        inbox = queues[i]
+        outbox = queues[i + 1] if i + 1 < len(queues) else None
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                if outbox is not None:
+                    outbox.put(_DONE)
+                return
+            if item.error is None:
+                start = time.perf_counter()
+                try:
+                    fn(item)
+                except Exception as e:
+                    item.error = e
+                    print(f"Error in {name} stage for {item!r}: {e}")
+                item.timings[name] = time.perf_counter() - start
+            if outbox is not None:
+                outbox.put(item)
+            elif on_done is not None:
+                try:
+                    on_done(item)
+                except Exception as e:
+                    print(f"Error reporting {item!r}: {e}")
+            else:
+                finished.append(item)
+
+    threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+    for i, (name, fn) in enumerate(stages):
+        threads.append(threading.Thread(target=work, args=(i, name, fn), name=f"pipeline-{name}", daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return finished
@@ -0,0 +1,100 @@
+"""
+Streaming PNG encoder.
+
+Pillow encodes a PNG from one complete image. PngStreamWriter instead takes
+the image as a sequence of horizontal bands and compresses each into IDAT
+chunks as it arrives, so only one band needs to be in memory at a time.
+"""
+import os
+import struct
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Pillow mode → (PNG color type, bytes per pixel)
+COLOR_TYPES = {"RGB": (2, 3), "RGBA": (6, 4), "L": (0, 1)}
+
+
+def _write_chunk(f, kind, data):
+    f.write(struct.pack(">I", len(data)))
+    f.write(kind)
+    f.write(data)
+    f.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+
+class PngStreamWriter:
+    """
+    Write a PNG band by band.
+
+    Usage:
+        with PngStreamWriter("out.png", (width, height)) as writer:
+            for band in bands:
+                writer.write(band)
+
+    The file is written to a temporary path and moved into place when the
+    last row has been written, so a failed render never leaves a truncated PNG.
+    """
+
+    def __init__(self, path, size, mode="RGB", compress_level=6):
+        if mode not in COLOR_TYPES:
+            raise ValueError(f"unsupported PNG mode {mode!r}")
+        self.path = path
+        self.width, self.height = size
+        self.mode = mode
+        self.rows_written = 0
+        color_type, self._bytes_per_pixel = COLOR_TYPES[mode]
+        self._compressor = zlib.compressobj(compress_level)
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(PNG_SIGNATURE)
+        _write_chunk(self._file, b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, color_type, 0, 0, 0))
+
+    def write(self, band):
+        """Append a band (a PIL Image as wide as the PNG) below the rows written so far."""
+        if band.mode != self.mode:
+            band = band.convert(self.mode)
+        if band.width != self.width:
+            raise ValueError(f"band is {band.width}px wide, PNG is {self.width}px")
+        if self.rows_written + band.height > self.height:
+            raise ValueError("more rows written than the PNG height")
+        raw = band.tobytes()
+        stride = self.width * self._bytes_per_pixel
+        # Every scanline starts with its filter type; 0 = no filter
+        filtered = b"".join(b"\x00" + raw[i:i + stride] for i in range(0, len(raw), stride))
+        data = self._compressor.compress(filtered)
+        if data:
+            _write_chunk(self._file, b"IDAT", data)
+        self.rows_written += band.height
+
+    def close(self):
+        """Finish the PNG and move it into place."""
+        if self._file is None:
+            return
+        if self.rows_written != self.height:
+            self.abort()
+            raise ValueError(f"PNG closed after {self.rows_written} of {self.height} rows")
+        _write_chunk(self._file, b"IDAT", self._compressor.flush())
+        _write_chunk(self._file, b"IEND", b"")
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard a partly written PNG."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+        return False
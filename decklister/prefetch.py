@@ -0,0 +1,152 @@
+"""
+Prefetch: warm the card ID and image caches for an event without rendering.
+
+The card names of every deck are resolved in one batch (card_cache.json
+first, then the swudb.com API). Each deck is then built in every requested
+variant, and the union of their images is downloaded concurrently. Render
+nodes sharing the image cache then start the event with nothing to fetch.
+
+Names that could not be resolved, decks that could not be read, and images
+that could not be downloaded are collected in a PrefetchReport, so a run can
+fail loudly before the event rather than render decks with missing cards.
+
+In offline mode (see network.py) nothing is fetched, so the same pass is the
+up-front check of --offline: the report lists every name and image that is
+not in the local caches.
+"""
+import os
+
+from PIL import ImageFont
+
+try:
+    from .deck import Deck
+    from .image_cache import maintain_image_cache
+    from .melee_csv_parser import read_melee_rows, select_row, card_names, resolve_card_ids, deck_from_row
+    from .variant_resolver import resolve_deck_variant
+    from . import image_downloader as ImageDownloader
+    from . import network
+except ImportError:
+    from decklister.deck import Deck
+    from decklister.image_cache import maintain_image_cache
+    from decklister.melee_csv_parser import read_melee_rows, select_row, card_names, resolve_card_ids, deck_from_row
+    from decklister.variant_resolver import resolve_deck_variant
+    from decklister import image_downloader as ImageDownloader
+    from decklister import network
+
+MAX_LISTED = 5  # Decks named per unresolved card in the report
+
+
+class PrefetchReport:
+    """What a prefetch covered, and everything it could not."""
+
+    def __init__(self):
+        self.decks = 0  # Decks read
+        self.images = 0  # Unique card images needed across all variants
+        self.unresolved = {}  # (name, subtitle) → labels of the decks using the card
+        self.bad_decks = []  # (label, error) of decks that could not be read
+        self.failed = []  # (card_set, card_number) of images that could not be downloaded
+        self.missing_files = []  # Config files (layer images, fonts) that cannot be opened
+
+    @property
+    def ok(self):
+        return not (self.unresolved or self.bad_decks or self.failed or self.missing_files)
+
+    def print(self):
+        offline = network.is_offline()
+        print(f"\n{'Offline check' if offline else 'Prefetch'}: {self.decks} deck(s), {self.images} card image(s).")
+        if self.missing_files:
+            print(f"{len(self.missing_files)} config file(s) could not be opened:")
+            for path in self.missing_files:
+                print(f"  {path}")
+        if self.bad_decks:
+            print(f"{len(self.bad_decks)} deck(s) could not be read:")
+            for label, error in self.bad_decks:
+                print(f"  {label}: {error}")
+        if self.unresolved:
+            print(f"{len(self.unresolved)} card name(s) {'are not in the card cache' if offline else 'could not be resolved'}:")
+            for (name, subtitle), labels in sorted(self.unresolved.items(), key=lambda item: (item[0][0], item[0][1] or "")):
+                shown = ", ".join(labels[:MAX_LISTED]) + (", ..." if len(labels) > MAX_LISTED else "")
+                print(f"  {name}{f' / {subtitle}' if subtitle else ''} — {len(labels)} deck(s): {shown}")
+        if self.failed:
+            print(f"{len(self.failed)} image(s) {'are not in the image cache' if offline else 'could not be downloaded'}:")
+            for card_set, card_number in self.failed:
+                print(f"  {card_set} #{card_number}")
+        if self.ok:
+            print("Every card is cached.")
+
+
+def _row_label(deck_file, row, index):
+    player = row.get("OwnerDisplayName") or row.get("OwnerUsername")
+    return f"{os.path.basename(deck_file)}: {player or f'index {index}'}"
+
+
+def missing_config_files(config):
+    """Layer images, fonts, and the count background a config names that cannot be opened."""
+    missing = []
+    for path in sorted(config.asset_paths()):
+        if os.path.isfile(path):
+            continue
+        try:
+            ImageFont.truetype(path, 10)  # Fonts are also found by name in the system font folders
+        except OSError:
+            missing.append(path)
+    return missing
+
+
+def prefetch(deck_files, variants=((False, False),), player=None, deck_index=None):
+    """
+    Resolve and download every card image the given decks need.
+
+    Args:
+        deck_files: Melee.gg CSV exports (every row is prefetched) and deck JSON files.
+        variants: (hyperspace, showcase) pairs to prefetch each deck in.
+        player, deck_index: If either is given, only the deck of each CSV
+            they select (as with --player/--index).
+
+    Returns:
+        PrefetchReport.
+    """
+    report = PrefetchReport()
+    decks = []  # Decks of JSON files
+    rows = []  # (label, row, names) of CSV rows
+    for deck_file in deck_files:
+        if not deck_file.lower().endswith(".csv"):
+            try:
+                decks.append(Deck.from_json_file(deck_file))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                report.bad_decks.append((os.path.basename(deck_file), e))
+            continue
+        try:
+            selected = list(enumerate(read_melee_rows(deck_file)))
+            if player is not None or deck_index is not None:
+                row = select_row([row for _, row in selected], player_name=player, deck_index=deck_index or 0)
+                selected = [(i, r) for i, r in selected if r is row]
+        except (OSError, ValueError) as e:
+            report.bad_decks.append((os.path.basename(deck_file), e))
+            continue
+        for i, row in selected:
+            label = _row_label(deck_file, row, i)
+            try:
+                rows.append((label, row, card_names(row)))
+            except (ValueError, KeyError, TypeError) as e:
+                report.bad_decks.append((label, e))
+
+    # One resolution batch for the names of every deck
+    card_ids = resolve_card_ids([name for _, _, names in rows for name in names]) if rows else {}
+    for label, row, names in rows:
+        for name in names:
+            if card_ids.get(name) is None:
+                report.unresolved.setdefault(name, []).append(label)
+        decks.append(deck_from_row(row, card_ids=card_ids))
+    report.decks = len(decks)
+
+    cards = set()
+    for deck in decks:
+        for hyperspace, showcase in variants:
+            variant_deck = resolve_deck_variant(deck, hyperspace=hyperspace, showcase=showcase)
+            for card in variant_deck.leaders + variant_deck.bases + variant_deck.main_deck + variant_deck.sideboard:
+                cards.add((card.card_set, card.card_number))
+    report.images = len(cards)
+    report.failed = ImageDownloader.download_images_batch(list(cards))
+    maintain_image_cache()
+    return report
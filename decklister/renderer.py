@@ -1,16 +1,24 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw, ImageFont
 try:
     from .count_overlay import CountOverlay
-    from .app_paths import get_image_cache_dir
+    from .app_paths import get_thumbnail_dir
+    from .image_cache import get_image_cache_index, card_filename
 except ImportError:
     from decklister.count_overlay import CountOverlay
-    from decklister.app_paths import get_image_cache_dir
+    from decklister.app_paths import get_thumbnail_dir
+    from decklister.image_cache import get_image_cache_index, card_filename
 
 # Corner radius measured at the source image resolution (1117x1560)
 SOURCE_CORNER_RADIUS = 46
 SOURCE_IMAGE_HEIGHT = 1560
 
+# Long side of the cached card thumbnails that draft renders decode instead of
+# the full-size source (a quarter of the source height)
+THUMBNAIL_SIZE = 390
+
 
 class Renderer:
     """
@@ -25,13 +33,32 @@ class Renderer:
       - A [r,g,b] list →  {"type": "color", "color": ...}
     """
 
-    def __init__(self, config, count_overlay=None):
+    def __init__(self, config, count_overlay=None, tile_atlas=None, tile_cache=None, draft=False):
         self.config = config
         self.count_overlay = count_overlay or CountOverlay(
             count_background=config.count_background
         )
-
-    def render(self, deck, deck_layout, sb_layout):
+        self.tile_atlas = tile_atlas  # Optional TileAtlas of pre-decoded card tiles
+        # Optional dict of prepared (masked + resized) tiles keyed by
+        # (card_set, card_number, width, height). Share one across renders to
+        # skip decoding the same card twice.
+        self.tile_cache = tile_cache
+        # Draft renders (previews) resample with BILINEAR instead of LANCZOS and
+        # decode small cached thumbnails instead of full-size card images.
+        self.draft = draft
+        self.resample = Image.BILINEAR if draft else Image.LANCZOS
+        self._layer_images = {}  # path → decoded RGBA layer image
+        self._resized_layers = {}  # (path, width, height) → layer image resized to its area
+        self._tile_pool = None  # Thread pool for tile preparation, created on first use
+        self._tile_pool_size = 0
+        self._banding = False  # Set by render_bands: image layers are resized strip by strip, uncached
+
+    @staticmethod
+    def _intersects(rect, region):
+        """True if two (x0, y0, x1, y1) rectangles overlap."""
+        return rect[0] < region[2] and region[0] < rect[2] and rect[1] < region[3] and region[1] < rect[3]
+
+    def render(self, deck, deck_layout, sb_layout, deck_area=None, sb_area=None):
         """
         Render the full deck image.
 
@@ -39,40 +66,235 @@ class Renderer:
             deck: Deck object.
             deck_layout: (card_width, card_height, cols, rows, padding) for deck_area, or None.
             sb_layout: (card_width, card_height, cols, rows, padding) for sb_area, or None.
+            deck_area: Area for the deck grid. Defaults to config.deck_area.
+            sb_area: Area for the sideboard grid. Defaults to config.sb_area.
 
         Returns:
             PIL Image (RGB) of the final composed deck image.
         """
         img_width, img_height = self.config.resolution
-        canvas = Image.new("RGBA", (img_width, img_height), (30, 30, 30, 255))
+        canvas = self.render_region(deck, deck_layout, sb_layout, (0, 0, img_width, img_height), deck_area, sb_area)
+        return canvas.convert("RGB")
+
+    def render_region(self, deck, deck_layout, sb_layout, region, deck_area=None, sb_area=None):
+        """
+        Render only the pixels inside `region` of the full canvas.
+
+        The result is pixel-identical to cropping a full render, but layers,
+        cards, and text outside the region are skipped. Image layers are
+        resized whole (once per size) and cropped to the region.
+
+        Args:
+            region: (x0, y0, x1, y1) rectangle in canvas coordinates.
+            Other arguments are as for render().
+
+        Returns:
+            PIL Image (RGBA) the size of the region.
+        """
+        deck_area = deck_area or self.config.deck_area
+        sb_area = sb_area or self.config.sb_area
+        canvas = Image.new("RGBA", (region[2] - region[0], region[3] - region[1]), (30, 30, 30, 255))
+        origin = (region[0], region[1])
+
+        self._apply_layers(canvas, self.config.layers, deck, deck_layout, sb_layout, deck_area, sb_area, origin)
+        return canvas
 
-        for layer in self.config.layers:
+    def _apply_layers(self, canvas, layers, deck, deck_layout, sb_layout, deck_area, sb_area, origin=(0, 0)):
+        """Apply a run of config layers (cards included) to the canvas."""
+        for layer in layers:
             layer_type, layer_data = self._parse_layer(layer)
-            if layer_type == "color":
-                fill = Image.new("RGBA", (img_width, img_height), layer_data)
-                canvas.alpha_composite(fill)
-            elif layer_type == "image":
-                self._apply_image_layer(canvas, layer_data["path"], layer_data.get("area"))
-            elif layer_type == "cards":
-                self._draw_leaders(canvas, deck)
-                self._draw_bases(canvas, deck)
-                if deck_layout and self.config.deck_area:
-                    self._draw_card_grid(canvas, deck.main_deck, self.config.deck_area, deck_layout)
-                if sb_layout and self.config.sb_area:
-                    self._draw_card_grid(canvas, deck.sideboard, self.config.sb_area, sb_layout)
-            elif layer_type == "text":
-                self._draw_text_layer(canvas, layer_data, text=layer_data.get("text", ""))
-            elif layer_type == "csv_field":
-                column = layer_data.get("column", "")
-                meta = deck.metadata or {}
-                if column == "DeckName":
-                    text = meta.get("AdminGivenName") or meta.get("Name", "")
-                else:
-                    text = meta.get(column, f"[{column}]")
-                self._draw_text_layer(canvas, layer_data, text=text)
+            if layer_type == "cards":
+                self._draw_cards(canvas, deck, deck_layout, sb_layout, deck_area, sb_area, origin)
+            else:
+                self._apply_layer(canvas, layer_type, layer_data, deck, origin)
+
+    def metadata_layer_index(self):
+        """Index of the first layer that draws deck metadata (len(layers) if none does)."""
+        for i, layer in enumerate(self.config.layers):
+            if self._parse_layer(layer)[0] == "csv_field":
+                return i
+        return len(self.config.layers)
+
+    def metadata_texts(self, deck):
+        """The strings the metadata layers draw for a deck. Decks with equal cards and texts render alike."""
+        return tuple(
+            self._csv_field_text(deck, layer_data)
+            for layer_type, layer_data in map(self._parse_layer, self.config.layers)
+            if layer_type == "csv_field"
+        )
+
+    def render_prefix(self, deck, deck_layout, sb_layout, deck_area=None, sb_area=None):
+        """
+        Render only the layers before the first metadata layer.
+
+        The result depends on the cards alone, so decks with the same list can
+        share it and finish with render_from_prefix().
+
+        Returns:
+            PIL Image (RGBA) of the full canvas.
+        """
+        deck_area = deck_area or self.config.deck_area
+        sb_area = sb_area or self.config.sb_area
+        canvas = Image.new("RGBA", self.config.resolution, (30, 30, 30, 255))
+        layers = self.config.layers[:self.metadata_layer_index()]
+        self._apply_layers(canvas, layers, deck, deck_layout, sb_layout, deck_area, sb_area)
+        return canvas
+
+    def render_from_prefix(self, prefix, deck, deck_layout, sb_layout, deck_area=None, sb_area=None):
+        """
+        Finish a render_prefix() canvas for a deck. `prefix` is left unchanged.
+
+        Returns:
+            PIL Image (RGB), identical to render().
+        """
+        deck_area = deck_area or self.config.deck_area
+        sb_area = sb_area or self.config.sb_area
+        layers = self.config.layers[self.metadata_layer_index():]
+        if not layers:
+            return prefix.convert("RGB")
+        canvas = prefix.copy()
+        self._apply_layers(canvas, layers, deck, deck_layout, sb_layout, deck_area, sb_area)
+        return canvas.convert("RGB")
+
+    def render_bands(self, deck, deck_layout, sb_layout, band_height, deck_area=None, sb_area=None):
+        """
+        Render the deck image as horizontal bands, top to bottom.
+
+        Each band goes through render_region, so peak memory scales with the
+        band size rather than the canvas size. Card tiles that straddle a band
+        boundary are kept until the last band they touch, then dropped. Image
+        layers are resized only for the strip a band needs and not cached, so
+        they can differ from render() by rounding (a level or two per channel).
+
+        Args:
+            band_height: Height of each band in pixels (the last may be shorter).
+            Other arguments are as for render().
+
+        Yields:
+            PIL Images (RGB), full canvas width, in order from the top.
+        """
+        deck_area = deck_area or self.config.deck_area
+        sb_area = sb_area or self.config.sb_area
+        width, height = self.config.resolution
+        band_height = max(1, int(band_height))
+
+        # Lowest canvas row each card image is drawn at, to know when its tile can go
+        last_row = {}
+        slots = [(self.config.leader_areas or [], deck.leaders), (self.config.base_areas or [], deck.bases)]
+        for areas, cards in slots:
+            for area, card in zip(areas, cards):
+                key = (card.card_set, card.card_number)
+                last_row[key] = max(last_row.get(key, 0), area[3])
+        for cards, area, layout in [(deck.main_deck, deck_area, deck_layout), (deck.sideboard, sb_area, sb_layout)]:
+            if layout and area:
+                for i, card in enumerate(cards):
+                    key = (card.card_set, card.card_number)
+                    last_row[key] = max(last_row.get(key, 0), self.grid_cell(area, layout, i)[3])
+
+        own_cache = self.tile_cache is None
+        if own_cache:
+            self.tile_cache = {}
+        self._banding = True
+        try:
+            for y0 in range(0, height, band_height):
+                y1 = min(height, y0 + band_height)
+                band = self.render_region(deck, deck_layout, sb_layout, (0, y0, width, y1), deck_area, sb_area)
+                yield band.convert("RGB")
+                del band
+                if own_cache:
+                    for key in [k for k in self.tile_cache if last_row.get(k[:2], 0) <= y1]:
+                        del self.tile_cache[key]
+        finally:
+            self._banding = False
+            if own_cache:
+                self.tile_cache = None
+
+    def render_streaming(self, deck, deck_layout, sb_layout, arrivals, deck_area=None, sb_area=None):
+        """
+        Render a deck while its card images are still downloading.
+
+        Layers below the cards layer are composited, and layer images above
+        it are decoded and resized, before waiting on any download. Then each
+        card is composited as soon as `arrivals` yields its image, in whatever
+        order downloads finish. The layers above the cards are applied last.
+        The result matches render() as long as card areas don't overlap.
+
+        Args:
+            arrivals: Iterator of (card_set, card_number) tuples, yielded once
+                each card's image is on disk (see
+                image_downloader.download_images_streaming).
+            Other arguments are as for render().
+
+        Returns:
+            PIL Image (RGB) of the final composed deck image.
+        """
+        deck_area = deck_area or self.config.deck_area
+        sb_area = sb_area or self.config.sb_area
+        canvas = Image.new("RGBA", self.config.resolution, (30, 30, 30, 255))
+        origin = (0, 0)
+
+        layers = [self._parse_layer(layer) for layer in self.config.layers]
+        cards_index = next((i for i, (t, _) in enumerate(layers) if t == "cards"), len(layers))
+
+        # Static layers: composite everything below the cards, warm everything above
+        for layer_type, layer_data in layers[:cards_index]:
+            self._apply_layer(canvas, layer_type, layer_data, deck, origin)
+        for layer_type, layer_data in layers[cards_index + 1:]:
+            if layer_type == "image":
+                self._warm_image_layer(layer_data["path"], layer_data.get("area"))
+
+        if cards_index < len(layers):
+            # Map each card image to the slots it fills
+            slots = {}
+            areas = [(self.config.leader_areas or [], deck.leaders), (self.config.base_areas or [], deck.bases)]
+            for special_areas, cards in areas:
+                for area, card in zip(special_areas, cards):
+                    slots.setdefault((card.card_set, card.card_number), []).append(
+                        lambda card=card, area=area: self._draw_special_card(canvas, card, area, origin)
+                    )
+            for cards, area, layout in [(deck.main_deck, deck_area, deck_layout), (deck.sideboard, sb_area, sb_layout)]:
+                if not (layout and area):
+                    continue
+                for i, card in enumerate(cards):
+                    cell = self.grid_cell(area, layout, i)
+                    slots.setdefault((card.card_set, card.card_number), []).append(
+                        lambda card=card, cell=cell, layout=layout: self._draw_grid_cell(canvas, card, cell, layout, origin)
+                    )
+
+            for card_set, card_number in arrivals:
+                for draw in slots.pop((card_set, str(card_number)), []):
+                    draw()
+            # Anything the iterator never produced still gets drawn (as a placeholder if missing)
+            for draws in slots.values():
+                for draw in draws:
+                    draw()
+
+        for layer_type, layer_data in layers[cards_index + 1:]:
+            self._apply_layer(canvas, layer_type, layer_data, deck, origin)
 
         return canvas.convert("RGB")
 
+    def _apply_layer(self, canvas, layer_type, layer_data, deck, origin=(0, 0)):
+        """Apply one non-cards layer to the canvas."""
+        if layer_type == "color":
+            fill = Image.new("RGBA", canvas.size, layer_data)
+            canvas.alpha_composite(fill)
+        elif layer_type == "image":
+            self._apply_image_layer(canvas, layer_data["path"], layer_data.get("area"), origin)
+        elif layer_type == "text":
+            self._draw_text_layer(canvas, layer_data, text=layer_data.get("text", ""), origin=origin)
+        elif layer_type == "csv_field":
+            self._draw_text_layer(canvas, layer_data, text=self._csv_field_text(deck, layer_data), origin=origin)
+
+    @staticmethod
+    def _csv_field_text(deck, data):
+        """Resolve the string a csv_field layer draws for a deck."""
+        column = data.get("column", "")
+        meta = deck.metadata or {}
+        if column == "DeckName":
+            return meta.get("AdminGivenName") or meta.get("Name", "")
+        return meta.get(column, f"[{column}]")
+
     def _parse_layer(self, layer):
         """
         Normalize a layer spec to (type, data).
@@ -112,7 +334,7 @@ class Renderer:
 
         return (None, None)
 
-    def _draw_text_layer(self, canvas, data, text):
+    def _draw_text_layer(self, canvas, data, text, origin=(0, 0)):
         """Draw text onto the canvas at a position or within an area."""
         color = data.get("color", [255, 255, 255])
         color = tuple(color) if len(color) == 4 else (*color, 255)
@@ -128,6 +350,7 @@ class Renderer:
         draw = ImageDraw.Draw(canvas)
         area = data.get("area")
         position = data.get("position")
+        ox, oy = origin
 
         if area:
             x0, y0, x1, y1 = area
@@ -137,82 +360,227 @@ class Renderer:
                 x, anchor = x1, "rt"
             else:
                 x, anchor = x0, "lt"
-            draw.text((x, y0), text, font=font, fill=color, anchor=anchor)
+            draw.text((x - ox, y0 - oy), text, font=font, fill=color, anchor=anchor)
         elif position:
-            draw.text(tuple(position), text, font=font, fill=color, anchor="lt")
+            draw.text((position[0] - ox, position[1] - oy), text, font=font, fill=color, anchor="lt")
         else:
-            draw.text((0, 0), text, font=font, fill=color)
+            draw.text((-ox, -oy), text, font=font, fill=color)
 
-    def _apply_image_layer(self, canvas, path, area=None):
+    def _apply_image_layer(self, canvas, path, area=None, origin=(0, 0)):
         """
         Composite an RGBA image onto the canvas.
 
         If area is None the image fills the full canvas.
         If area is [x0, y0, x1, y1] the image is stretched to that rectangle.
         """
+        if area is None:
+            area = (0, 0, *self.config.resolution)
+        x0, y0, x1, y1 = area
+        w, h = x1 - x0, y1 - y0
+        if w <= 0 or h <= 0:
+            print(f"Skipping layer {path} — area {area} has invalid dimensions ({w}x{h})")
+            return
+
+        ox, oy = origin
+        region = (ox, oy, ox + canvas.width, oy + canvas.height)
+        if not self._intersects(area, region):
+            return
         try:
-            img = Image.open(path).convert("RGBA")
-            if area is None:
-                img = img.resize(canvas.size, Image.LANCZOS)
-                canvas.alpha_composite(img)
+            cx0, cy0 = max(x0, region[0]), max(y0, region[1])
+            cx1, cy1 = min(x1, region[2]), min(y1, region[3])
+            if self._banding and (cy0, cy1) != (y0, y1) and (path, w, h) not in self._resized_layers:
+                # A band resizes only its own rows, so memory scales with the band, not the layer
+                img = self._resized_layer_strip(path, w, h, cy0 - y0, cy1 - y0)
+                if (cx0, cx1) != (x0, x1):
+                    img = img.crop((cx0 - x0, 0, cx1 - x0, img.height))
             else:
-                x0, y0, x1, y1 = area
-                w, h = x1 - x0, y1 - y0
-                if w <= 0 or h <= 0:
-                    print(f"Skipping layer {path} — area {area} has invalid dimensions ({w}x{h})")
-                    return
-                img = img.resize((w, h), Image.LANCZOS)
-                canvas.alpha_composite(img, (x0, y0))
+                # Resize the whole layer once (cached) and crop it, so every region
+                # samples exactly the pixels a full render does
+                img = self._resized_layer_image(path, w, h)
+                if (cx0, cy0, cx1, cy1) != (x0, y0, x1, y1):
+                    img = img.crop((cx0 - x0, cy0 - y0, cx1 - x0, cy1 - y0))
+            canvas.alpha_composite(img, (cx0 - ox, cy0 - oy))
         except Exception as e:
             print(f"Failed to load layer image {path}: {e}")
 
-    def _draw_leaders(self, canvas, deck):
+    def _resized_layer_image(self, path, width, height):
+        """Layer image resized to its whole area, cached since every deck reuses it."""
+        key = (path, width, height)
+        img = self._resized_layers.get(key)
+        if img is None:
+            img = self._layer_image(path).resize((width, height), self.resample)
+            self._resized_layers[key] = img
+        return img
+
+    def _resized_layer_strip(self, path, width, height, top, bottom):
+        """
+        Rows top..bottom of a layer image resized to width x height, without resizing the rest.
+
+        Pillow reads the filter's support from beyond the strip, so this samples
+        like a whole resize up to rounding.
+        """
+        src = self._layer_image(path)
+        scale = src.height / height
+        return src.resize((width, bottom - top), self.resample, box=(0, top * scale, src.width, bottom * scale))
+
+    def _warm_image_layer(self, path, area=None):
+        """Decode and resize an image layer ahead of time (errors surface when it is applied)."""
+        x0, y0, x1, y1 = area or (0, 0, *self.config.resolution)
+        if x1 - x0 <= 0 or y1 - y0 <= 0:
+            return
+        try:
+            self._resized_layer_image(path, x1 - x0, y1 - y0)
+        except Exception:
+            pass
+
+    def _layer_image(self, path):
+        """Decode a layer image once per renderer."""
+        img = self._layer_images.get(path)
+        if img is None:
+            with Image.open(path) as src:
+                img = src.convert("RGBA")
+            self._layer_images[path] = img
+        return img
+
+    def invalidate(self, paths):
+        """Forget decoded layer images of files that changed on disk, so the next render reloads them."""
+        paths = set(paths)
+        for path in paths:
+            self._layer_images.pop(path, None)
+        for key in [key for key in self._resized_layers if key[0] in paths]:
+            del self._resized_layers[key]
+
+    def _composite(self, canvas, img, x, y, origin):
+        """Composite img with its top-left at canvas coordinate (x, y), clipped to the canvas."""
+        dx, dy = x - origin[0], y - origin[1]
+        sx, sy = max(0, -dx), max(0, -dy)
+        if sx >= img.width or sy >= img.height or dx + img.width <= 0 or dy + img.height <= 0:
+            return
+        if dx >= canvas.width or dy >= canvas.height:
+            return
+        if img.mode != "RGBA":
+            img = img.convert("RGBA")
+        canvas.alpha_composite(img, (max(0, dx), max(0, dy)), (sx, sy))
+
+    def _draw_cards(self, canvas, deck, deck_layout, sb_layout, deck_area, sb_area, origin=(0, 0)):
+        """
+        Draw the "cards" layer: leaders, bases, deck grid, then sideboard grid.
+
+        With config.render_threads > 1, tiles are decoded, masked, resized,
+        and given their count on a thread pool (Pillow releases the GIL for
+        most of that work), then composited in order on this thread.
+        """
+        threads = self.config.render_threads or 1
+        if threads <= 1:
+            self._draw_leaders(canvas, deck, origin)
+            self._draw_bases(canvas, deck, origin)
+            if deck_layout and deck_area:
+                self._draw_card_grid(canvas, deck.main_deck, deck_area, deck_layout, origin)
+            if sb_layout and sb_area:
+                self._draw_card_grid(canvas, deck.sideboard, sb_area, sb_layout, origin)
+            return
+
+        region = (origin[0], origin[1], origin[0] + canvas.width, origin[1] + canvas.height)
+        jobs = []  # (prepare function, args), in compositing order
+        for areas, cards in [(self.config.leader_areas or [], deck.leaders), (self.config.base_areas or [], deck.bases)]:
+            for card, area in zip(cards, areas):
+                jobs.append((self._special_tile, (card, area, region)))
+        for cards, area, layout in [(deck.main_deck, deck_area, deck_layout), (deck.sideboard, sb_area, sb_layout)]:
+            if not (layout and area):
+                continue
+            for i, card in enumerate(cards):
+                cell = self.grid_cell(area, layout, i)
+                if self._intersects(cell, region):
+                    jobs.append((self._grid_tile, (card, cell, layout)))
+
+        for placed in self._get_tile_pool(threads).map(lambda job: job[0](*job[1]), jobs):
+            if placed is not None:
+                self._composite(canvas, placed[0], placed[1], placed[2], origin)
+
+    def _get_tile_pool(self, threads):
+        """Thread pool kept for the renderer's lifetime, so threads aren't respawned per render."""
+        if self._tile_pool is None or self._tile_pool_size != threads:
+            if self._tile_pool is not None:
+                self._tile_pool.shutdown(wait=False)
+            self._tile_pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="decklister-tiles")
+            self._tile_pool_size = threads
+        return self._tile_pool
+
+    def _draw_leaders(self, canvas, deck, origin=(0, 0)):
         """Place leader cards into their designated areas."""
         areas = self.config.leader_areas or []
         for i, leader in enumerate(deck.leaders):
             if i >= len(areas):
                 break
-            self._draw_special_card(canvas, leader, areas[i])
+            self._draw_special_card(canvas, leader, areas[i], origin)
 
-    def _draw_bases(self, canvas, deck):
+    def _draw_bases(self, canvas, deck, origin=(0, 0)):
         """Place base cards into their designated areas."""
         areas = self.config.base_areas or []
         for i, base in enumerate(deck.bases):
             if i >= len(areas):
                 break
-            self._draw_special_card(canvas, base, areas[i])
+            self._draw_special_card(canvas, base, areas[i], origin)
 
-    def _draw_special_card(self, canvas, card, area):
+    def _draw_special_card(self, canvas, card, area, origin=(0, 0)):
         """Load and composite a single card (leader/base) into an area, preserving aspect ratio."""
+        region = (origin[0], origin[1], origin[0] + canvas.width, origin[1] + canvas.height)
+        placed = self._special_tile(card, area, region)
+        if placed is not None:
+            self._composite(canvas, placed[0], placed[1], placed[2], origin)
+
+    def _special_tile(self, card, area, region):
+        """
+        Prepare a leader/base tile fitted and centered in its area.
+
+        Returns:
+            (image, x, y) in canvas coordinates, or None if there is nothing to draw.
+        """
         x0, y0, x1, y1 = area
         area_width, area_height = x1 - x0, y1 - y0
         if area_width <= 0 or area_height <= 0:
             print(f"Skipping card {card} — area {area} has invalid dimensions ({area_width}x{area_height})")
-            return
+            return None
+        if not self._intersects(area, region):
+            return None
         img_path = self._card_image_path(card)
         try:
-            card_img = Image.open(img_path).convert("RGBA")
+            card_img = Image.open(img_path)  # Lazy — only the header is read here
             orig_w, orig_h = card_img.size
             if orig_w <= 0 or orig_h <= 0:
-                return
-
-            # Apply rounded corners at source resolution (pixel-perfect)
-            card_img = self._apply_rounded_corners(card_img)
+                return None
 
             # Fit within the area while preserving aspect ratio
             scale = min(area_width / orig_w, area_height / orig_h)
             new_w = int(orig_w * scale)
             new_h = int(orig_h * scale)
-            card_img = card_img.resize((new_w, new_h), Image.LANCZOS)
 
-            # Center within the area and composite
+            tile = self._cached_tile(card, new_w, new_h)
+            if tile is not None:
+                card_img = tile
+            else:
+                # Apply rounded corners at source resolution (pixel-perfect)
+                card_img = self._apply_rounded_corners(self._decode_card(card, img_path, new_w, new_h, card_img))
+                card_img = card_img.resize((new_w, new_h), self.resample)
+                self._store_tile(card, card_img)
+
+            # Center within the area
             paste_x = x0 + (area_width - new_w) // 2
             paste_y = y0 + (area_height - new_h) // 2
-            canvas.alpha_composite(card_img, (paste_x, paste_y))
+            return (card_img, paste_x, paste_y)
         except Exception as e:
             print(f"Failed to load {img_path}: {e}")
+            return None
+
+    @staticmethod
+    def grid_cell(area, layout, index):
+        """Return the (x0, y0, x1, y1) canvas rectangle of grid cell `index`."""
+        card_width, card_height, cols, rows, padding = layout
+        x = area[0] + (index % cols) * (card_width + padding)
+        y = area[1] + (index // cols) * (card_height + padding)
+        return (x, y, x + card_width, y + card_height)
 
-    def _draw_card_grid(self, canvas, cards, area, layout):
+    def _draw_card_grid(self, canvas, cards, area, layout, origin=(0, 0)):
         """
         Draw a list of cards in a grid within the given area.
 
@@ -221,34 +589,104 @@ class Renderer:
             cards: List of Card objects.
             area: (x0, y0, x1, y1) rectangle for the grid.
             layout: (card_width, card_height, cols, rows, padding) from CardSizer.
+            origin: Canvas coordinate of the image's top-left corner (for region renders).
         """
-        x0, y0, x1, y1 = area
-        card_width, card_height, cols, rows, padding = layout
+        if not cards:
+            return
+
+        region = (origin[0], origin[1], origin[0] + canvas.width, origin[1] + canvas.height)
 
         for i, card in enumerate(cards):
-            col = i % cols
-            row = i // cols
-            x = x0 + col * (card_width + padding)
-            y = y0 + row * (card_height + padding)
+            cell = self.grid_cell(area, layout, i)
+            if self._intersects(cell, region):
+                self._draw_grid_cell(canvas, card, cell, layout, origin)
 
-            card_img = self._load_card_image(card, card_width, card_height)
-            card_img = self.count_overlay.apply(card_img, card.count)
+    def _draw_grid_cell(self, canvas, card, cell, layout, origin=(0, 0)):
+        """Load one grid card, draw its count, and composite it at its cell."""
+        card_img, x, y = self._grid_tile(card, cell, layout)
+        self._composite(canvas, card_img, x, y, origin)
 
-            if card_img.mode != "RGBA":
-                card_img = card_img.convert("RGBA")
-            canvas.alpha_composite(card_img, (x, y))
+    def _grid_tile(self, card, cell, layout):
+        """Prepare one grid tile with its count. Returns (image, x, y)."""
+        card_img = self._load_card_image(card, layout[0], layout[1])
+        card_img = self.count_overlay.apply(card_img, card.count)
+        return (card_img, cell[0], cell[1])
 
     def _load_card_image(self, card, width, height):
         """Load a card image, apply rounded corners at source resolution, then resize."""
+        tile = self._cached_tile(card, width, height)
+        if tile is not None:
+            # Cached and atlas tiles are shared; the count overlay draws in place
+            return tile.copy()
         img_path = self._card_image_path(card)
         try:
-            img = Image.open(img_path).convert("RGBA")
+            img = self._decode_card(card, img_path, width, height)
             img = self._apply_rounded_corners(img)
-            return img.resize((width, height), Image.LANCZOS)
+            img = img.resize((width, height), self.resample)
+            self._store_tile(card, img)
+            return img.copy() if self.tile_cache is not None else img
         except Exception as e:
             print(f"Failed to load {img_path}: {e}")
             return Image.new("RGBA", (width, height), (80, 80, 80, 255))
 
+    def _decode_card(self, card, img_path, width, height, source=None):
+        """
+        Decode a card image as RGBA for a tile of the given size.
+
+        Draft renders read the cached thumbnail when the tile fits inside it.
+
+        Args:
+            source: The already-opened (lazy) source image, if the caller has one.
+        """
+        if self.draft and max(width, height) <= THUMBNAIL_SIZE:
+            thumb = self._card_thumbnail(card, img_path)
+            if thumb is not None:
+                return thumb
+        if source is None:
+            source = Image.open(img_path)
+        return source.convert("RGBA")
+
+    def _card_thumbnail(self, card, img_path):
+        """Load a card's thumbnail, creating it from the source image on first use."""
+        thumb_path = self._thumbnail_path(card)
+        try:
+            with Image.open(thumb_path) as thumb:
+                return thumb.convert("RGBA")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: ignoring unreadable thumbnail {thumb_path}: {e}")
+        try:
+            with Image.open(img_path) as src:
+                src.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.LANCZOS)
+                thumb = src.convert("RGBA")
+        except Exception:
+            return None  # The caller reports the missing source
+        tmp_path = f"{thumb_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+            thumb.save(tmp_path, "PNG", compress_level=1)
+            os.replace(tmp_path, thumb_path)
+        except OSError as e:
+            print(f"Warning: could not cache thumbnail {thumb_path}: {e}")
+        return thumb
+
+    def _cached_tile(self, card, width, height):
+        """Return a prepared tile from the in-memory cache or the atlas, or None."""
+        key = (card.card_set, card.card_number, width, height)
+        if self.tile_cache is not None and key in self.tile_cache:
+            return self.tile_cache[key]
+        if self.tile_atlas is None:
+            return None
+        return self.tile_atlas.get(card.card_set, card.card_number, width, height)
+
+    def _store_tile(self, card, img):
+        """Remember a freshly prepared tile in the in-memory cache and the atlas (build mode)."""
+        if self.tile_cache is not None:
+            self.tile_cache[(card.card_set, card.card_number, img.width, img.height)] = img
+        if self.tile_atlas is not None and self.tile_atlas.writable and not self.draft:
+            self.tile_atlas.add(card.card_set, card.card_number, img)
+
     def _apply_rounded_corners(self, img):
         """
         Apply a rounded corner alpha mask to an image.
@@ -297,4 +735,8 @@ class Renderer:
 
     def _card_image_path(self, card):
         """Build the file path for a card image."""
-        return os.path.join(get_image_cache_dir(), card.card_set, f"{card.card_number}.png")
\ No newline at end of file
+        return get_image_cache_index().path(card.card_set, card.card_number)
+
+    def _thumbnail_path(self, card):
+        """Build the file path for a card's draft-preview thumbnail."""
+        return os.path.join(get_thumbnail_dir(), card.card_set, card_filename(card.card_number))
\ No newline at end of file
@@ -1,8 +1,21 @@
 import pytest
+from . import app_paths
 from .card_sizer import CardSizer
 from .deck import Deck, Card
 
 
+@pytest.fixture(autouse=True)
+def app_data_dir(tmp_path, monkeypatch):
+    """Keep every cache, thumbnail, and atlas a test touches out of the project folder."""
+    cached = (app_paths.get_image_cache_dir, app_paths.get_thumbnail_dir, app_paths.get_atlas_dir)
+    for function in cached:
+        function.cache_clear()
+    monkeypatch.setattr(app_paths, "get_app_data_dir", lambda: str(tmp_path / "app_data"))
+    yield tmp_path / "app_data"
+    for function in cached:
+        function.cache_clear()
+
+
 # ---- CardSizer Tests ----
 
 class TestCardSizer:
@@ -61,6 +74,74 @@ class TestCardSizer:
         w, h, _, _, _ = CardSizer.calculate((0, 0, 1000, 1000), 1, aspect_ratio=1.0)
         assert abs(w - h) <= 1  # Should be roughly square
 
+    @staticmethod
+    def _brute_force(area, card_count, padding, aspect_ratio):
+        """Reference: try every column count, keep the largest card (ties → more columns)."""
+        import math
+        avail_w, avail_h = area[2] - area[0], area[3] - area[1]
+        best = None
+        for cols in range(1, card_count + 1):
+            rows = math.ceil(card_count / cols)
+            max_w = (avail_w - (cols - 1) * padding) / cols
+            max_h = (avail_h - (rows - 1) * padding) / rows
+            if max_w <= 0 or max_h <= 0:
+                continue
+            if max_h * aspect_ratio <= max_w:
+                w, h = int(max_h * aspect_ratio), int(max_h)
+            else:
+                w, h = int(max_w), int(max_w / aspect_ratio)
+            if w <= 0 or h <= 0:
+                continue
+            if best is None or w * h > best[0] * best[1] or (w * h == best[0] * best[1] and cols > best[2]):
+                best = (w, h, cols, rows, padding)
+        return best
+
+    def test_matches_brute_force(self):
+        import random
+        rng = random.Random(7)
+        for _ in range(2000):
+            area = (0, 0, rng.randint(1, 2500), rng.randint(1, 1500))
+            count = rng.randint(1, 80)
+            padding = rng.choice([0, 3, 10, 40])
+            aspect = rng.choice([5.0 / 7.0, 1.0, 7.0 / 5.0])
+            expected = self._brute_force(area, count, padding, aspect)
+            assert CardSizer.calculate(area, count, padding, aspect) == expected
+
+    def test_fixed_columns(self):
+        w, h, cols, rows, _ = CardSizer.calculate((0, 0, 1000, 1000), 10, columns=5)
+        assert (cols, rows) == (5, 2)
+        assert 5 * w + 4 * 3 <= 1000
+
+    def test_fixed_columns_clamped_to_card_count(self):
+        _, _, cols, rows, _ = CardSizer.calculate((0, 0, 1000, 1000), 3, columns=8)
+        assert (cols, rows) == (3, 1)
+
+    def test_max_card_width(self):
+        w, h, _, _, _ = CardSizer.calculate((0, 0, 1000, 1000), 1, max_card_width=200)
+        assert w == 200
+        assert h == int(200 / CardSizer.DEFAULT_ASPECT_RATIO)
+
+    def test_split_area_balances_card_sizes(self):
+        deck_area, sb_area = CardSizer.split_area((0, 0, 1600, 1000), 30, 10, padding=5)
+        assert deck_area[3] + 5 == sb_area[1]
+        deck = CardSizer.calculate(deck_area, 30, 5)
+        sb = CardSizer.calculate(sb_area, 10, 5)
+        # Moving the split one pixel either way can't raise the smaller card size
+        for shift in (-1, 1):
+            d = CardSizer.calculate((0, 0, 1600, deck_area[3] + shift), 30, 5)
+            s = CardSizer.calculate((0, sb_area[1] + shift, 1600, 1000), 10, 5)
+            assert min(d[0], s[0]) <= min(deck[0], sb[0])
+
+    def test_split_area_width_axis(self):
+        deck_area, sb_area = CardSizer.split_area((0, 0, 1600, 1000), 30, 10, axis="width")
+        assert deck_area[1] == sb_area[1] == 0
+        assert deck_area[2] < sb_area[0]
+
+    def test_split_area_without_sideboard(self):
+        deck_area, sb_area = CardSizer.split_area((0, 0, 1600, 1000), 30, 0)
+        assert deck_area == [0, 0, 1600, 1000]
+        assert sb_area is None
+
 
 # ---- Deck Parsing Tests ----
 
@@ -167,7 +248,7 @@ class TestDeckParsing:
 
 # ---- Variant Resolver Tests ----
 
-from .variant_resolver import resolve_variant
+from .variant_resolver import resolve_variant, parse_variants, resolve_deck_variant
 
 class TestVariantResolver:
     def test_no_variants_returns_original(self):
@@ -210,3 +291,1069 @@ class TestVariantResolver:
         assert resolve_variant("SOR", "18", showcase=True) == str(4 * 252 - 52 + 18)
         # Card 19 is not a leader
         assert resolve_variant("SOR", "19", showcase=True) == "19"
+
+    def test_parse_variants(self):
+        assert parse_variants("normal, hyperspace,showcase") == [
+            ("normal", False, False),
+            ("hyperspace", True, False),
+            ("showcase", False, True),
+        ]
+
+    def test_parse_variants_combined(self):
+        assert parse_variants("hyperspace+showcase") == [("hyperspace+showcase", True, True)]
+
+    def test_parse_variants_unknown_raises(self):
+        with pytest.raises(ValueError, match="Unknown variant"):
+            parse_variants("normal,foil")
+
+    def test_resolve_deck_variant_leaves_original_untouched(self):
+        deck = Deck.from_json({
+            "leaders": [{"id": "SOR_003"}],
+            "deck": [{"id": "SOR_050", "count": 3}],
+        })
+        hyperspace = resolve_deck_variant(deck, hyperspace=True, showcase=True)
+        assert hyperspace.leaders[0].card_number == str(4 * 252 - 52 + 3)
+        assert hyperspace.main_deck[0].card_number == "302"
+        assert hyperspace.main_deck[0].count == 3
+        assert deck.leaders[0].card_number == "003"
+        assert deck.main_deck[0].card_number == "050"
+
+
+# ---- Tile Atlas Tests ----
+
+import os
+from PIL import Image, ImageChops, ImageStat
+from .tile_atlas import TileAtlas
+
+
+class TestTileAtlas:
+    def test_missing_tile_returns_none(self, tmp_path):
+        atlas = TileAtlas(directory=str(tmp_path))
+        assert atlas.get("SOR", "010", 50, 70) is None
+
+    def test_round_trip_across_instances(self, tmp_path):
+        writer = TileAtlas(directory=str(tmp_path), writable=True)
+        writer.add("SOR", "010", Image.new("RGBA", (50, 70), (10, 20, 30, 255)))
+        writer.add("SOR", "011", Image.new("RGBA", (50, 70), (40, 50, 60, 128)))
+        writer.save()
+
+        reader = TileAtlas(directory=str(tmp_path))
+        tile = reader.get("SOR", "011", 50, 70)
+        assert tile.size == (50, 70)
+        assert tile.getpixel((0, 0)) == (40, 50, 60, 128)
+        assert reader.get("SOR", "010", 60, 84) is None
+
+    def test_concurrent_writers_share_the_atlas(self, tmp_path):
+        # Two builders opened the same atlas and append in turn
+        first = TileAtlas(directory=str(tmp_path), writable=True)
+        second = TileAtlas(directory=str(tmp_path), writable=True)
+        colors = {}
+        for i in range(6):
+            colors[f"{i:03d}"] = (i * 40, 10, 20, 255)
+            (first if i % 2 else second).add("SOR", f"{i:03d}", Image.new("RGBA", (5, 7), colors[f"{i:03d}"]))
+        first.save()
+        second.save()  # Must keep the tiles first saved
+
+        reader = TileAtlas(directory=str(tmp_path))
+        assert len(reader) == 6
+        assert all(reader.get("SOR", number, 5, 7).getpixel((2, 3)) == color for number, color in colors.items())
+        assert sorted(os.listdir(tmp_path)) == ["tiles.bin", "tiles.json"]
+
+    def test_read_only_atlas_ignores_add(self, tmp_path):
+        atlas = TileAtlas(directory=str(tmp_path))
+        atlas.add("SOR", "010", Image.new("RGBA", (5, 7)))
+        assert len(atlas) == 0
+
+
+# ---- Renderer Tests ----
+
+import random
+from .config import Config
+from .renderer import Renderer
+
+
+class _DirRenderer(Renderer):
+    """Renderer reading card images from a test folder."""
+
+    def __init__(self, config, image_dir, **kwargs):
+        super().__init__(config, **kwargs)
+        self.image_dir = image_dir
+
+    def _card_image_path(self, card):
+        return os.path.join(self.image_dir, card.card_set, f"{card.card_number}.png")
+
+    def _thumbnail_path(self, card):
+        return os.path.join(self.image_dir, "thumbnails", card.card_set, f"{card.card_number}.png")
+
+
+def _write_card_images(image_dir, card_ids):
+    """Write small solid-color source images for the given SET_NUMBER ids."""
+    for i, card_id in enumerate(card_ids):
+        card_set, number = card_id.split("_", 1)
+        os.makedirs(os.path.join(image_dir, card_set), exist_ok=True)
+        color = (40 * i % 256, 90 + 20 * i % 166, 200 - 10 * i % 200)
+        Image.new("RGB", (112, 156), color).save(os.path.join(image_dir, card_set, f"{number}.png"))
+
+
+def _render_fixture(tmp_path, main_count=7, sb_count=3):
+    ids = [f"TST_{i:03d}" for i in range(1, main_count + sb_count + 3)]
+    _write_card_images(str(tmp_path), ids)
+    deck = Deck.from_json({
+        "leaders": [{"id": ids[0]}],
+        "bases": [{"id": ids[1]}],
+        "deck": [{"id": i, "count": 2} for i in ids[2:2 + main_count]],
+        "sideboard": [{"id": i} for i in ids[2 + main_count:]],
+    })
+    config = Config(
+        resolution=(400, 300),
+        layers=[[20, 40, 60], {"type": "cards"}, {"type": "color", "color": [255, 0, 0, 40]}],
+        leader_areas=[[5, 5, 75, 105]],
+        base_areas=[[5, 110, 75, 210]],
+        deck_area=[80, 5, 395, 200],
+        sb_area=[80, 210, 395, 295],
+    )
+    deck_layout = CardSizer.calculate(config.deck_area, main_count, config.padding)
+    sb_layout = CardSizer.calculate(config.sb_area, sb_count, config.padding)
+    return deck, config, deck_layout, sb_layout
+
+
+class TestRenderer:
+    def test_region_matches_full_render(self, tmp_path):
+        deck, config, deck_layout, sb_layout = _render_fixture(tmp_path)
+        config.layers.append({"type": "text", "text": "Deck", "position": [60, 100], "size": 30})
+        renderer = _DirRenderer(config, str(tmp_path))
+        full = renderer.render(deck, deck_layout, sb_layout)
+        for region in [(0, 0, 400, 300), (70, 95, 180, 230), (391, 0, 400, 17), (1, 1, 2, 2)]:
+            part = renderer.render_region(deck, deck_layout, sb_layout, region).convert("RGB")
+            assert part.tobytes() == full.crop(region).tobytes()
+
+    def test_region_matches_full_render_with_image_layers(self, tmp_path):
+        deck, config, deck_layout, sb_layout = _render_fixture(tmp_path)
+        for name, size in [("bg.png", (137, 91)), ("logo.png", (61, 43))]:
+            Image.effect_noise(size, 60).convert("RGBA").save(tmp_path / name)
+        # Both layers are scaled by non-integer factors
+        config.layers[1:1] = [str(tmp_path / "bg.png"), {"type": "image", "path": str(tmp_path / "logo.png"), "area": [33, 47, 251, 199]}]
+        renderer = _DirRenderer(config, str(tmp_path))
+        full = renderer.render(deck, deck_layout, sb_layout)
+        rng = random.Random(3)
+        for _ in range(40):
+            x0, y0 = rng.randrange(399), rng.randrange(299)
+            region = (x0, y0, rng.randrange(x0 + 1, 401), rng.randrange(y0 + 1, 301))
+            part = renderer.render_region(deck, deck_layout, sb_layout, region).convert("RGB")
+            assert part.tobytes() == full.crop(region).tobytes(), region
+
+    def test_threaded_tiles_match_sequential(self, tmp_path):
+        deck, config, deck_layout, sb_layout = _render_fixture(tmp_path, main_count=15, sb_count=5)
+        sequential = _DirRenderer(config, str(tmp_path)).render(deck, deck_layout, sb_layout)
+        config.render_threads = 4
+        threaded = _DirRenderer(config, str(tmp_path))
+        assert threaded.render(deck, deck_layout, sb_layout).tobytes() == sequential.tobytes()
+        part = threaded.render_region(deck, deck_layout, sb_layout, (70, 95, 180, 230)).convert("RGB")
+        assert part.tobytes() == sequential.crop((70, 95, 180, 230)).tobytes()
+
+    def test_scaled_config(self):
+        config = Config(
+            resolution=(3840, 2160),
+            layers=[{"type": "image", "path": "logo.png", "area": [100, 100, 500, 300]},
+                    {"type": "text", "text": "Hi", "position": [40, 80], "size": 60}, [1, 2, 3]],
+            leader_areas=[[0, 0, 400, 560]],
+            deck_area=[400, 0, 3840, 2160],
+            padding=6,
+            max_card_width=300,
+        )
+        small = config.scaled(0.25)
+        assert small.resolution == (960, 540)
+        assert small.layers[0]["area"] == [25, 25, 125, 75]
+        assert small.layers[1]["position"] == [10, 20] and small.layers[1]["size"] == 15
+        assert small.leader_areas == [[0, 0, 100, 140]]
+        assert (small.deck_area, small.sb_area, small.padding, small.max_card_width) == ([100, 0, 960, 540], None, 2, 75)
+        assert config.resolution == (3840, 2160) and config.layers[0]["area"] == [100, 100, 500, 300]
+
+    def test_draft_preview_matches_full_composition(self, tmp_path):
+        deck, config, deck_layout, sb_layout = _render_fixture(tmp_path)
+        full = _DirRenderer(config, str(tmp_path)).render(deck, deck_layout, sb_layout)
+        small = config.scaled(0.5)
+        preview = _DirRenderer(small, str(tmp_path), draft=True).render(
+            deck,
+            CardSizer.calculate(small.deck_area, len(deck.main_deck), small.padding),
+            CardSizer.calculate(small.sb_area, len(deck.sideboard), small.padding),
+        )
+        assert preview.size == (200, 150)
+        assert os.path.isfile(os.path.join(str(tmp_path), "thumbnails", "TST", "003.png"))
+        # Same composition: the preview matches a downscaled full render closely
+        diff = ImageChops.difference(preview, full.resize(preview.size, Image.BILINEAR))
+        assert sum(ImageStat.Stat(diff).mean) / 3 < 12
+
+    def test_bands_match_full_render(self, tmp_path):
+        deck, config, deck_layout, sb_layout = _render_fixture(tmp_path)
+        renderer = _DirRenderer(config, str(tmp_path))
+        full = renderer.render(deck, deck_layout, sb_layout)
+        bands = list(renderer.render_bands(deck, deck_layout, sb_layout, 64))
+        assert [band.height for band in bands] == [64, 64, 64, 64, 44]
+        assert b"".join(band.tobytes() for band in bands) == full.tobytes()
+        assert renderer.tile_cache is None
+
+    def test_bands_resize_only_their_strip_of_image_layers(self, tmp_path):
+        deck, config, deck_layout, sb_layout = _render_fixture(tmp_path)
+        for name, size in [("bg.png", (137, 91)), ("logo.png", (61, 43))]:
+            Image.effect_noise(size, 60).convert("RGBA").save(tmp_path / name)
+        config.layers[1:1] = [str(tmp_path / "bg.png"), {"type": "image", "path": str(tmp_path / "logo.png"), "area": [33, 47, 251, 199]}]
+        full = _DirRenderer(config, str(tmp_path)).render(deck, deck_layout, sb_layout)
+        renderer = _DirRenderer(config, str(tmp_path))
+        banded = Image.new("RGB", full.size)
+        for i, band in enumerate(renderer.render_bands(deck, deck_layout, sb_layout, 64)):
+            banded.paste(band, (0, i * 64))
+        # No whole-layer copies are kept, and the strips sample like a whole resize up to rounding
+        assert renderer._resized_layers == {}
+        assert max(high for _, high in ImageChops.difference(banded, full).getextrema()) <= 3
+
+    def test_drawer_areas_to_config(self, tmp_path):
+        from .config_drawer import areas_to_config, preview_areas
+        rects = [("leader_area", [0, 0, 10, 14]), ("deck_area", [20, 0, 90, 50]), ("title", [0, 50, 40, 60])]
+        # The export keeps every area under the name it was drawn with
+        path = tmp_path / "drawn.json"
+        path.write_text(json.dumps(areas_to_config([100, 60], rects)))
+        assert json.loads(path.read_text()) == {
+            "resolution": [100, 60],
+            "leader_area": [0, 0, 10, 14],
+            "deck_area": [20, 0, 90, 50],
+            "title": [0, 50, 40, 60],
+        }
+        # Only the preview merges repeated leader and base areas into Config's lists
+        rects.append(("leader_area", [0, 20, 10, 34]))
+        assert preview_areas(rects) == {"leader_areas": [[0, 0, 10, 14], [0, 20, 10, 34]], "deck_area": [20, 0, 90, 50]}
+
+    def test_streaming_matches_full_render(self, tmp_path):
+        import random
+        deck, config, deck_layout, sb_layout = _render_fixture(tmp_path)
+        config.layers.insert(1, {"type": "text", "text": "Top", "position": [60, 100], "size": 30})
+        keys = list(dict.fromkeys(
+            (c.card_set, c.card_number) for c in deck.leaders + deck.bases + deck.main_deck + deck.sideboard
+        ))
+        random.Random(1).shuffle(keys)
+        full = _DirRenderer(config, str(tmp_path)).render(deck, deck_layout, sb_layout)
+        streamed = _DirRenderer(config, str(tmp_path)).render_streaming(deck, deck_layout, sb_layout, iter(keys[:-2]))
+        assert streamed.tobytes() == full.tobytes()
+
+
+# ---- Live Renderer Tests ----
+
+from .live_renderer import LiveRenderer
+from . import image_downloader
+
+
+class TestLiveRenderer:
+    @staticmethod
+    def _live(tmp_path, config, monkeypatch):
+        monkeypatch.setattr(image_downloader, "download_images_batch", lambda cards: [])
+        return LiveRenderer(config, renderer=_DirRenderer(config, str(tmp_path), tile_cache={}))
+
+    def test_count_change_redraws_one_cell(self, tmp_path, monkeypatch):
+        deck, config, _, _ = _render_fixture(tmp_path)
+        live = self._live(tmp_path, config, monkeypatch)
+        before = live.render(deck)
+
+        changed = Deck.from_json({
+            "leaders": [{"id": "TST_001"}],
+            "bases": [{"id": "TST_002"}],
+            "deck": [{"id": c.card_set + "_" + c.card_number, "count": c.count} for c in deck.main_deck],
+            "sideboard": [{"id": c.card_set + "_" + c.card_number, "count": 3} if i == 1 else
+                          {"id": c.card_set + "_" + c.card_number, "count": c.count}
+                          for i, c in enumerate(deck.sideboard)],
+        })
+        regions = live.changed_regions(deck, changed)
+        assert len(regions) == 1
+        after = live.update(deck, before, changed)
+        assert after.tobytes() == live.render(changed).tobytes()
+        assert after.tobytes() != before.tobytes()
+
+    def test_layout_change_matches_full_render(self, tmp_path, monkeypatch):
+        deck, config, _, _ = _render_fixture(tmp_path)
+        live = self._live(tmp_path, config, monkeypatch)
+        before = live.render(deck)
+        smaller = Deck(deck.leaders, deck.bases, deck.main_deck, deck.sideboard[:1])
+        assert live.update(deck, before, smaller).tobytes() == live.render(smaller).tobytes()
+
+    def test_metadata_change_forces_full_render(self, tmp_path, monkeypatch):
+        deck, config, _, _ = _render_fixture(tmp_path)
+        config.layers.append({"type": "csv_field", "column": "OwnerDisplayName", "position": [0, 0]})
+        live = self._live(tmp_path, config, monkeypatch)
+        renamed = Deck(deck.leaders, deck.bases, deck.main_deck, deck.sideboard, {"OwnerDisplayName": "B"})
+        assert live.changed_regions(deck, renamed) is None
+
+
+# ---- Pipeline Tests ----
+
+import threading
+import time
+from .pipeline import DeckJob, run_stages
+
+
+class TestPipeline:
+    def test_items_keep_order_and_pass_every_stage(self):
+        jobs = [DeckJob(i, "event.csv") for i in range(10)]
+
+        def double(job):
+            job.deck = job.index * 2
+
+        def add_one(job):
+            job.deck += 1
+
+        done = run_stages(jobs, [("a", double), ("b", add_one)])
+        assert [job.index for job in done] == list(range(10))
+        assert [job.deck for job in done] == [i * 2 + 1 for i in range(10)]
+        assert set(done[0].timings) == {"a", "b"}
+
+    def test_failed_job_skips_later_stages(self):
+        jobs = [DeckJob(i, "event.csv") for i in range(3)]
+        seen = []
+
+        def explode(job):
+            if job.index == 1:
+                raise ValueError("bad deck")
+
+        done = run_stages(jobs, [("parse", explode), ("render", lambda job: seen.append(job.index))])
+        assert seen == [0, 2]
+        assert isinstance(done[1].error, ValueError)
+
+    def test_stages_overlap_with_bounded_queues(self):
+        active = set()
+        overlap = []
+        lock = threading.Lock()
+
+        def stage(name):
+            def fn(job):
+                with lock:
+                    active.add(name)
+                    if len(active) > 1:
+                        overlap.append(tuple(sorted(active)))
+                time.sleep(0.02)
+                with lock:
+                    active.discard(name)
+            return fn
+
+        jobs = [DeckJob(i, "event.csv") for i in range(6)]
+        run_stages(jobs, [("download", stage("download")), ("render", stage("render"))], queue_size=1)
+        assert overlap
+
+
+# ---- Output Spec Tests ----
+
+from .outputs import OutputSpec, render_scale
+from .deck_image_generator import DeckImageGenerator
+
+
+class TestOutputs:
+    def test_parse_cli_output(self):
+        spec = OutputSpec.parse("out/deck_1080.webp@1920")
+        assert (spec.path, spec.width, spec.image_format) == ("out/deck_1080.webp", 1920, "WEBP")
+        assert OutputSpec.parse("deck.png").width is None
+        with pytest.raises(ValueError):
+            OutputSpec.parse("deck.png@wide")
+        with pytest.raises(ValueError):
+            OutputSpec.parse("deck.tiff")
+
+    def test_derived_paths_and_sizes(self):
+        spec = OutputSpec.from_dict({"width": 400, "format": "jpg"})
+        assert spec.output_path("decks/event_Alice.png") == "decks/event_Alice_400w.jpg"
+        assert OutputSpec(path="x.png", suffix="4k").output_path("a.png", use_path=False) == "a_4k.png"
+        assert spec.target_size((3840, 2160)) == (400, 225)
+        assert OutputSpec(width=8000).target_size((3840, 2160)) == (3840, 2160)
+
+    def test_render_scale_uses_largest_output(self):
+        assert render_scale([OutputSpec(width=1920), OutputSpec(width=400)], (3840, 2160)) == 0.5
+        assert render_scale([OutputSpec(width=1920), OutputSpec()], (3840, 2160)) == 1.0
+        assert render_scale([], (3840, 2160)) == 1.0
+
+    def test_one_render_writes_every_output(self, tmp_path):
+        config = Config(resolution=(800, 400), outputs=[
+            {"suffix": "full", "format": "png"},
+            {"width": 400, "format": "webp", "quality": 80},
+            {"width": 100, "format": "jpeg"},
+        ])
+        generator = DeckImageGenerator(config=config)
+        assert generator.config.resolution == (800, 400)
+        job = DeckJob(0, "deck.json", output_path=str(tmp_path / "deck.png"))
+        job.images = [(None, Image.new("RGB", (800, 400), (10, 20, 30)))]
+        generator._save_job(job)
+        sizes = {os.path.basename(path): Image.open(path).size for path in job.outputs}
+        assert sizes == {"deck_full.png": (800, 400), "deck_400w.webp": (400, 200), "deck_100w.jpg": (100, 50)}
+        assert DeckImageGenerator(config=config, outputs=[OutputSpec(width=200)]).config.resolution == (200, 100)
+
+    def test_auto_names_count_the_files_outputs_write(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        config = Config(resolution=(400, 200))
+
+        def save(generator, batch):
+            job = DeckJob(0, "deck.json", batch=batch)
+            job.images = [(None, Image.new("RGB", (400, 200)))]
+            generator._save_job(job)
+            return [os.path.basename(path) for path in job.outputs]
+
+        # deck.png is never written, so a rerun must still see deck_200w.webp
+        derived = DeckImageGenerator(config=config, outputs=[OutputSpec.parse("small.webp@200")])
+        assert save(derived, batch=True) == ["deck_200w.webp"]
+        assert save(derived, batch=True) == ["deck_2_200w.webp"]
+        # Explicit paths are written as given, and do not number anything
+        explicit = DeckImageGenerator(config=config, outputs=[OutputSpec.parse("small.webp@200")])
+        assert save(explicit, batch=False) == save(explicit, batch=False) == ["small.webp"]
+
+
+# ---- Streaming PNG Writer Tests ----
+
+from .png_writer import PngStreamWriter
+
+
+class TestPngStreamWriter:
+    def test_bands_decode_to_original(self, tmp_path):
+        image = Image.effect_noise((50, 37), 60).convert("RGB")
+        path = str(tmp_path / "out.png")
+        with PngStreamWriter(path, image.size) as writer:
+            for y in range(0, image.height, 10):
+                writer.write(image.crop((0, y, image.width, min(image.height, y + 10))))
+        with Image.open(path) as decoded:
+            assert decoded.mode == "RGB" and decoded.tobytes() == image.tobytes()
+
+    def test_failed_render_leaves_no_file(self, tmp_path):
+        path = str(tmp_path / "out.png")
+        with pytest.raises(RuntimeError):
+            with PngStreamWriter(path, (10, 10)) as writer:
+                writer.write(Image.new("RGB", (10, 5)))
+                raise RuntimeError("render failed")
+        assert os.listdir(str(tmp_path)) == []
+        writer = PngStreamWriter(path, (10, 10))
+        writer.write(Image.new("RGB", (10, 5)))
+        with pytest.raises(ValueError):
+            writer.close()
+        assert os.listdir(str(tmp_path)) == []
+
+
+# ---- PDF Export Tests ----
+
+import re
+from .pdf_writer import PdfStreamWriter
+from .melee_csv_parser import sort_rows
+
+
+class TestPdfExport:
+    def test_pages_and_xref(self, tmp_path):
+        path = str(tmp_path / "decks.pdf")
+        with PdfStreamWriter(path, dpi=72) as pdf:
+            pdf.add_page(Image.new("RGB", (200, 100), (255, 0, 0)))
+            pdf.add_page(Image.new("RGBA", (300, 150), (0, 0, 255, 255)))
+        data = open(path, "rb").read()
+        assert data.startswith(b"%PDF-1.4") and data.rstrip().endswith(b"%%EOF")
+        assert b"/Count 2" in data and b"/MediaBox [0 0 300.00 150.00]" in data
+        # Every xref entry points at the start of its object
+        xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+        entries = re.findall(rb"(\d{10}) 00000 n", data[xref:])
+        for obj_id, offset in enumerate(entries, start=1):
+            assert data[int(offset):].startswith(f"{obj_id} 0 obj".encode())
+
+    def test_sort_rows(self):
+        rows = [
+            {"OwnerDisplayName": "bob", "TableNumber": "10", "Rank": ""},
+            {"OwnerDisplayName": "Alice", "Table": "2", "Rank": "3"},
+            {"OwnerDisplayName": "", "OwnerUsername": "carl", "TableNumber": "", "Standing": "1"},
+        ]
+        assert [i for i, _ in sort_rows(rows, "player")] == [1, 0, 2]
+        assert [i for i, _ in sort_rows(rows, "table")] == [1, 0, 2]
+        assert [i for i, _ in sort_rows(rows, "standing")] == [2, 1, 0]
+        assert [i for i, _ in sort_rows(rows)] == [0, 1, 2]
+        with pytest.raises(ValueError):
+            sort_rows(rows, "seat")
+
+
+# ---- Contact Sheet Tests ----
+
+from .contact_sheet import ContactSheet
+
+
+class TestContactSheet:
+    def test_rows_split_across_sheets(self, tmp_path):
+        path = str(tmp_path / "sheet.png")
+        colors = [(200, 0, 0), (0, 200, 0), (0, 0, 200), (200, 200, 0), (0, 200, 200)]
+        with ContactSheet(path, 5, (40, 20), columns=2, rows_per_sheet=2, gap=4, label_height=10) as sheet:
+            for i, color in enumerate(colors):
+                sheet.add(Image.new("RGB", (40, 20), color), f"P{i}")
+        assert [os.path.basename(p) for p in sheet.paths] == ["sheet_1.png", "sheet_2.png"]
+        with Image.open(sheet.paths[0]) as first, Image.open(sheet.paths[1]) as second:
+            assert first.size == (92, 2 * 34 + 4) and second.size == (92, 34 + 4)
+            assert first.getpixel((4 + 44 + 20, 4 + 34 + 10)) == colors[3]
+            assert second.getpixel((4 + 20, 4 + 10)) == colors[4]
+            assert second.getpixel((4 + 44 + 20, 4 + 10)) == (20, 20, 20)  # Padded empty cell
+
+
+# ---- Identical Deck Tests ----
+
+from .melee_csv_parser import records_key
+from . import deck_image_generator
+
+
+class TestDedupe:
+    def test_records_key_ignores_metadata(self):
+        records = '[{"n": "Luke", "s": "Hero", "q": 1, "c": 6}, {"n": "Wing", "q": 3, "c": 0}]'
+        alice = {"OwnerDisplayName": "Alice", "Records": records}
+        bob = {"OwnerDisplayName": "Bob", "Records": records.replace(", ", ",  ")}
+        assert records_key(alice) == records_key(bob) is not None
+        assert records_key({"Records": records.replace('"q": 3', '"q": 2')}) != records_key(alice)
+        assert records_key({"Records": "[not json"}) is None
+
+    def test_identical_decks_share_prefix_and_link(self, tmp_path, monkeypatch):
+        deck, config, _, _ = _render_fixture(tmp_path)
+        config.layers.append({"type": "csv_field", "column": "OwnerDisplayName", "position": [5, 250], "size": 20})
+        generator = DeckImageGenerator(config=config)
+        generator._renderer = _DirRenderer(generator.config, str(tmp_path))
+        monkeypatch.setattr(generator, "_download_images", lambda *decks: None)
+        monkeypatch.chdir(tmp_path)
+
+        players = ["Alice", "Bob", "Alice"]
+        decks = [Deck(deck.leaders, deck.bases, deck.main_deck, deck.sideboard, {"OwnerDisplayName": p}) for p in players]
+        jobs = [
+            DeckJob(i, "event.csv", deck=d, player=p, deck_index=i, is_multi_deck=True, content_key="list")
+            for i, (d, p) in enumerate(zip(decks, players))
+        ]
+        generator._run_jobs(jobs)
+
+        alice, bob, alice_again = (job.outputs[0] for job in jobs)
+        assert os.path.samefile(alice, alice_again)
+        assert generator._prefixes == {}
+        deck_area, deck_layout, sb_area, sb_layout = CardSizer.layout_for_config(
+            generator.config, len(deck.main_deck), len(deck.sideboard)
+        )
+        expected = _DirRenderer(config, str(tmp_path)).render(decks[1], deck_layout, sb_layout, deck_area, sb_area)
+        with Image.open(bob) as image:
+            assert image.convert("RGB").tobytes() == expected.tobytes()
+
+    def test_shared_prefixes_are_bounded(self, tmp_path, monkeypatch):
+        deck, config, _, _ = _render_fixture(tmp_path)
+        config.layers.append({"type": "csv_field", "column": "OwnerDisplayName", "position": [5, 250], "size": 20})
+        generator = DeckImageGenerator(config=config)
+        generator._renderer = _DirRenderer(generator.config, str(tmp_path))
+        monkeypatch.setattr(generator, "_download_images", lambda *decks: None)
+        monkeypatch.setattr(deck_image_generator, "MAX_PREFIXES", 1)
+        monkeypatch.chdir(tmp_path)
+        prefixes, kept = [], []
+        render_prefix = generator._renderer.render_prefix
+
+        def counting_prefix(*args, **kwargs):
+            kept.append(len(generator._prefixes))
+            prefixes.append(args[0].metadata["OwnerDisplayName"])
+            return render_prefix(*args, **kwargs)
+        monkeypatch.setattr(generator._renderer, "render_prefix", counting_prefix)
+
+        # Lists a and b interleaved with one prefix kept: b1 evicts a's, a2 evicts b's,
+        # and a2's is still there for a3 since b2 was the last of its list
+        players = ["a1", "b1", "a2", "b2", "a3"]
+        jobs = [
+            DeckJob(i, "event.csv", deck=Deck(deck.leaders, deck.bases, deck.main_deck, deck.sideboard,
+                                             {"OwnerDisplayName": p}),
+                    player=p, deck_index=i, is_multi_deck=True, content_key=p[0])
+            for i, p in enumerate(players)
+        ]
+        generator._run_jobs(jobs)
+        assert prefixes == ["a1", "b1", "a2", "b2"] and max(kept) <= 1 and generator._prefixes == {}
+        assert [os.path.basename(job.outputs[0]) for job in jobs] == [f"event_{p}.png" for p in players]
+
+
+# ---- Image Cache Index Tests ----
+
+from . import image_cache
+from .image_cache import ImageCacheIndex, card_filename, parse_size
+
+
+class TestImageCacheIndex:
+    def test_scan_add_and_paths(self, tmp_path):
+        os.makedirs(tmp_path / "SOR")
+        Image.new("RGB", (4, 4)).save(tmp_path / "SOR" / "005.png")
+        (tmp_path / "SOR" / "006.png.123.tmp").write_bytes(b"")
+        index = ImageCacheIndex(str(tmp_path))
+        assert card_filename(5) == card_filename("005") == "005.png" and card_filename("T01") == "T01.png"
+        assert index.contains("SOR", "5") and not index.contains("SOR", "006") and not index.contains("SHD", "1")
+        assert index.path("SOR", 5) == os.path.join(str(tmp_path), "SOR", "005.png")
+        # Later additions come from the index, not the disk
+        index.add("SHD", "010")
+        assert index.contains("SHD", 10) and not os.path.isdir(tmp_path / "SHD")
+        assert os.path.isdir(index.set_dir("JTL"))
+        index.refresh()
+        assert not index.contains("SHD", 10) and index.contains("SOR", "005")
+
+    def test_missing_cards_uses_index(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(image_cache, "get_image_cache_dir", lambda: str(tmp_path))
+        os.makedirs(tmp_path / "SOR")
+        Image.new("RGB", (4, 4)).save(tmp_path / "SOR" / "001.png")
+        assert image_downloader._missing_cards([("SOR", "001"), ("SOR", "002"), ("SHD", "003")]) == [
+            ("SOR", "002"), ("SHD", "003")
+        ]
+        assert os.path.isdir(tmp_path / "SHD")
+        os.remove(tmp_path / "SOR" / "001.png")  # Not rescanned: the index still lists it
+        assert image_downloader._missing_cards([("SOR", "001")]) == []
+
+    def test_prune_evicts_least_recently_used(self, tmp_path):
+        for card_set, number in [("SOR", "001"), ("SOR", "002"), ("SHD", "001"), ("SHD", "002")]:
+            os.makedirs(tmp_path / card_set, exist_ok=True)
+            (tmp_path / card_set / f"{number}.png").write_bytes(b"x" * 100)
+        index = ImageCacheIndex(str(tmp_path))
+        index.set_budget(max_bytes=parse_size("250"), pin=["SHD"])
+        index._touched = {"SOR/001.png": 10, "SHD/001.png": 20, "SOR/002.png": 30, "SHD/002.png": 40}
+        index.save()
+        # Both SOR images go: SHD is pinned, even though its images are older
+        index._touched = {"SHD/001.png": 5}
+        assert index.prune() == (2, 200)
+        assert sorted(os.listdir(tmp_path / "SOR")) == [] and not index.contains("SOR", 2)
+        index.save()
+        reloaded = ImageCacheIndex(str(tmp_path))
+        assert reloaded.contains("SHD", 1) and reloaded.pinned == {"SHD"} and reloaded.max_bytes == 250
+        assert [(card_set, name) for card_set, name, _, _ in reloaded.usage()] == [("SHD", "001.png"), ("SHD", "002.png")]
+        assert parse_size("1.5G") == 1536 * 1024 ** 2 and parse_size("800mb") == 800 * 1024 ** 2
+        with pytest.raises(ValueError):
+            parse_size("lots")
+
+    def test_thumbnail_dir_resolved_only_to_remove(self, tmp_path, app_data_dir):
+        os.makedirs(tmp_path / "cache" / "SOR")
+        (tmp_path / "cache" / "SOR" / "001.png").write_bytes(b"x" * 100)
+        resolved = []
+        index = ImageCacheIndex(str(tmp_path / "cache"), thumbnail_dir=lambda: resolved.append(1) or app_paths.get_thumbnail_dir())
+        index.add("SOR", "002")
+        index.save()
+        assert index.prune(max_bytes=1000) == (0, 0) and not resolved
+        assert not os.path.exists(app_data_dir / "thumbnails")
+        os.makedirs(app_data_dir / "thumbnails" / "SOR")
+        (app_data_dir / "thumbnails" / "SOR" / "001.png").write_bytes(b"")
+        assert index.prune(max_bytes=0) == (1, 100)
+        assert resolved == [1] and os.listdir(app_data_dir / "thumbnails" / "SOR") == []
+
+
+# ---- Shared Cache Tests ----
+
+from .file_lock import FileLock
+from . import melee_csv_parser
+
+
+class TestSharedCache:
+    def test_lock_excludes_and_breaks_stale(self, tmp_path):
+        path = str(tmp_path / "card_cache.json")
+        holder = FileLock(path)
+        assert holder.acquire(timeout=0)
+        assert not FileLock(path).acquire(timeout=0.05)
+        old = time.time() - 600
+        os.utime(holder.path, (old, old))  # The holder died long ago
+        other = FileLock(path)
+        assert other.acquire(timeout=0) and other.wait(timeout=0) is False
+        holder.release()  # Came back after all: must not remove the lock other now holds
+        assert os.path.exists(other.path) and not FileLock(path).acquire(timeout=0)
+        other.release()
+        assert not os.path.exists(other.path) and os.listdir(tmp_path) == []
+
+    def test_lock_three_contenders(self, tmp_path):
+        path = str(tmp_path / "card_cache.json")
+        holder = FileLock(path)
+        assert holder.acquire(timeout=0)
+        old = time.time() - 600
+        os.utime(holder.path, (old, old))  # Looks dead to the other two
+        contenders = [FileLock(path), FileLock(path)]
+        barrier = threading.Barrier(2)
+        won = []
+
+        def contend(lock):
+            barrier.wait()
+            if lock.acquire(timeout=0.2):
+                won.append(lock)
+
+        threads = [threading.Thread(target=contend, args=(lock,)) for lock in contenders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(won) == 1
+        winner = won[0]
+        loser = contenders[1 - contenders.index(winner)]
+        holder.release()  # Late release of the broken lock leaves the winner's alone
+        assert os.path.exists(winner.path) and not loser.acquire(timeout=0)
+        winner.release()
+        assert loser.acquire(timeout=0)
+        loser.release()
+        assert os.listdir(tmp_path) == []
+
+    def test_lock_heartbeat_keeps_long_holder(self, tmp_path):
+        path = str(tmp_path / "card_cache.json")
+        holder = FileLock(path, stale_after=0.4)
+        assert holder.acquire(timeout=0)
+        # Held for longer than stale_after: the heartbeat keeps it fresh
+        assert not FileLock(path, stale_after=0.4).acquire(timeout=1.0)
+        holder.release()
+        assert os.listdir(tmp_path) == []
+
+    def test_download_single_flight(self, tmp_path, monkeypatch):
+        fetches = []
+
+        class Response:
+            content = b"png"
+            status_code = 200
+
+            def raise_for_status(self):
+                pass
+
+        def get(url, **kwargs):
+            fetches.append(url)
+            time.sleep(0.1)
+            return Response()
+
+        monkeypatch.setattr(image_downloader.requests, "get", get)
+        # Four threads want the same card: one fetch, everybody sees the file
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(image_downloader.download_card("SOR", 5, str(tmp_path))))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(fetches) == 1 and sorted(results) == [0, 0, 0, 1]
+        assert (tmp_path / "005.png").read_bytes() == b"png" and os.listdir(tmp_path) == ["005.png"]
+
+        # Another process holds the lock and finishes the download: no fetch here
+        lock = FileLock(str(tmp_path / "006.png"))
+        lock.acquire()
+
+        def other_process():
+            time.sleep(0.2)
+            (tmp_path / "006.png").write_bytes(b"theirs")
+            lock.release()
+
+        threading.Thread(target=other_process).start()
+        assert image_downloader.download_card("SOR", 6, str(tmp_path)) == 0 and len(fetches) == 1
+
+    def test_card_cache_merges_on_save(self, tmp_path, monkeypatch):
+        path = tmp_path / "card_cache.json"
+        monkeypatch.setattr(melee_csv_parser, "get_card_cache_path", lambda: str(path))
+        path.write_text('{"Luke": "SOR_005"}')
+        mine = {"Vader": "SOR_010"}
+        melee_csv_parser._save_cache(mine)
+        assert melee_csv_parser.load_card_cache() == mine == {"Luke": "SOR_005", "Vader": "SOR_010"}
+
+
+# ---- Work Queue Tests ----
+
+from .work_queue import WorkQueue, run_worker
+
+
+class TestWorkQueue:
+    def test_workers_finish_queue_and_retry(self, tmp_path):
+        jobs = [{"index": i, "label": f"P{i}"} for i in range(6)]
+        queue = WorkQueue.create(str(tmp_path), jobs, {"deck_file": "event.csv"}, stale_after=0.3, max_attempts=2)
+        crashed = queue.claim("crashed-worker")  # Claimed, then never heard from again
+        assert crashed[0] == "00000.json"
+
+        def render(job):
+            if job["index"] == 5:
+                raise ValueError("bad deck")
+            time.sleep(0.05)
+            return [f"event_index_{job['index']}.png"]
+
+        finished = []
+        workers = [threading.Thread(target=lambda n=n: finished.append(run_worker(queue, render, f"w{n}", 0.05)))
+                   for n in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert sum(finished) == 5
+        assert queue.counts() == {"pending": 0, "claimed": 0, "done": 5, "failed": 1}
+        done = dict(queue.jobs("done"))
+        assert done["00000.json"]["attempts"] == 1 and done["00000.json"]["worker"] in ("w0", "w1")
+        assert done["00003.json"]["outputs"] == ["event_index_3.png"]
+        (name, failed), = queue.jobs("failed")
+        assert name == "00005.json" and failed["attempts"] == 2 and failed["error"] == "bad deck"
+        with pytest.raises(ValueError):
+            WorkQueue.create(str(tmp_path), jobs, {})
+
+    def test_late_worker_leaves_new_claim_alone(self, tmp_path):
+        queue = WorkQueue.create(str(tmp_path), [{"index": 0}], {}, stale_after=60)
+        name, slow = queue.claim("slow")
+        old = time.time() - 600
+        os.utime(os.path.join(str(tmp_path), "claimed", name), (old, old))
+        assert queue.requeue_stale() == [name]
+        _, fresh = queue.claim("fresh")
+        # The requeued worker reports late: the fresh claim stays, nothing goes back to pending
+        queue.fail(name, slow, "timeout")
+        assert queue.counts() == {"pending": 0, "claimed": 1, "done": 0, "failed": 0}
+        queue.complete(name, slow, ["out.png"], 1.0)
+        assert queue.counts() == {"pending": 0, "claimed": 1, "done": 1, "failed": 0}
+        # Failing after the job is done only drops the claim
+        queue.fail(name, fresh, "crash")
+        assert queue.counts() == {"pending": 0, "claimed": 0, "done": 1, "failed": 0}
+
+
+# ---- Batch Manifest Tests ----
+
+import json
+from .batch_manifest import load_manifest, run_batch
+from . import batch_manifest
+from . import renderer as renderer_module
+from . import network
+from .__main__ import main_batch
+
+
+class TestBatchManifest:
+    def test_decks_times_configs_in_one_run(self, tmp_path, monkeypatch):
+        image_dir = tmp_path / "images"
+        deck, config, _, _ = _render_fixture(image_dir)
+        monkeypatch.setattr(image_cache, "get_image_cache_dir", lambda: str(image_dir))
+        downloads = []
+        monkeypatch.setattr(batch_manifest.ImageDownloader, "download_images_batch", lambda cards: downloads.append(set(cards)))
+        monkeypatch.setattr(renderer_module, "get_thumbnail_dir", lambda: str(tmp_path / "thumbnails"))
+        monkeypatch.chdir(tmp_path)
+
+        deck_json = {
+            "leaders": [{"id": f"{c.card_set}_{c.card_number}"} for c in deck.leaders],
+            "bases": [{"id": f"{c.card_set}_{c.card_number}"} for c in deck.bases],
+            "deck": [{"id": f"{c.card_set}_{c.card_number}", "count": c.count} for c in deck.main_deck],
+        }
+        for name in ("alice", "bob"):
+            (tmp_path / f"{name}.json").write_text(json.dumps(deck_json))
+        (tmp_path / "full.json").write_text(json.dumps({**vars(config), "layers": [[20, 40, 60], {"type": "cards"}]}))
+        (tmp_path / "jobs.json").write_text(json.dumps({
+            "decks": ["alice.json", "bob.json"],
+            "configs": {
+                "full": "full.json",
+                "thumbs": {"config": "full.json", "preview": 0.5, "variants": ["normal", "hyperspace"]},
+            },
+        }))
+
+        sources, targets = load_manifest(str(tmp_path / "jobs.json"))
+        assert run_batch(sources, targets) == []
+        assert sorted(os.listdir(tmp_path / "full")) == ["alice.png", "bob.png"]
+        assert sorted(os.listdir(tmp_path / "thumbs")) == [
+            "alice_hyperspace.png", "alice_normal.png", "bob_hyperspace.png", "bob_normal.png",
+        ]
+        with Image.open(tmp_path / "thumbs" / "bob_normal.png") as image:
+            assert image.size == (200, 150)
+        # One download for every deck in every variant, before anything renders
+        assert downloads[0] == set().union(*downloads[1:]) and ("TST", "001") in downloads[0]
+
+        targets[0].output = "{config}.png"  # Same file for every deck
+        with pytest.raises(ValueError, match="both be written"):
+            run_batch(sources, targets)
+        with pytest.raises(ValueError, match="placeholder"):
+            batch_manifest.parse_manifest({"decks": ["alice.json"], "configs": {"x": {"config": "full.json", "output": "{who}.png"}}})
+
+    def test_configs_network_settings_apply_to_the_batch(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(network, "_settings", dict(network.DEFAULTS))
+        monkeypatch.setattr(batch_manifest, "run_batch", lambda sources, targets, tile_atlas=None: [])
+        (tmp_path / "a.json").write_text(json.dumps({"network": {"rate_limit": 10, "max_concurrency": 4}}))
+        (tmp_path / "b.json").write_text("{}")
+        (tmp_path / "deck.json").write_text("{}")
+        (tmp_path / "c.json").write_text(json.dumps({"network": {"rate_limit": 20}}))
+        manifest = {"decks": ["deck.json"], "configs": {"a": "a.json", "b": "b.json", "a_again": "a.json"}}
+        (tmp_path / "jobs.json").write_text(json.dumps(manifest))
+
+        main_batch(["jobs.json", "--max-concurrency", "6"])
+        assert network._settings["rate_limit"] == 10 and network._settings["max_concurrency"] == 6  # The CLI wins
+
+        manifest["configs"]["c"] = "c.json"
+        (tmp_path / "jobs.json").write_text(json.dumps(manifest))
+        with pytest.raises(SystemExit):
+            main_batch(["jobs.json"])
+        assert "configs a and c set different network settings" in capsys.readouterr().err
+
+
+# ---- NDJSON Stream Tests ----
+
+import io
+from .deck_stream import read_deck_lines, ResultWriter
+
+
+class TestDeckStream:
+    def test_results_stream_in_order(self, tmp_path, monkeypatch):
+        deck, config, _, _ = _render_fixture(tmp_path)
+        generator = DeckImageGenerator(config=config, outputs=[OutputSpec(width=200, format="webp")])
+        generator._renderer = _DirRenderer(generator.config, str(tmp_path))
+        monkeypatch.setattr(generator, "_download_images", lambda *decks: None)
+        monkeypatch.setattr(image_cache, "get_image_cache_dir", lambda: str(tmp_path / "cache"))
+        monkeypatch.chdir(tmp_path)
+
+        line = json.dumps({"id": "r1", "leaders": [{"id": "TST_001"}], "bases": [{"id": "TST_002"}],
+                           "deck": [{"id": "TST_003", "count": 3}]})
+        lines = [line + "\n", "\n", "{not json\n", line.replace('"r1"', '7') + "\n"]
+        out = io.StringIO()
+        results = ResultWriter(out)
+        generator.run_stream(read_deck_lines(lines), results)
+
+        records = [json.loads(text) for text in out.getvalue().splitlines()]
+        assert [(r["line"], r["id"], r["ok"]) for r in records] == [(1, "r1", True), (3, None, False), (4, 7, True)]
+        assert records[0]["outputs"] == ["stdin_r1_200w.webp"] and records[2]["outputs"] == ["stdin_7_200w.webp"]
+        assert "line 3" in records[1]["error"] and (results.ok, results.failed) == (2, 1)
+        with Image.open(tmp_path / "stdin_r1_200w.webp") as image:
+            assert image.size == (200, 150)
+
+
+# ---- Watch Mode Tests ----
+
+from .watch_mode import WatchSession
+
+
+class TestWatchMode:
+    def test_config_asset_paths(self):
+        config = Config(
+            layers=["bg.png", {"type": "image", "path": "logo.png", "area": [0, 0, 9, 9]}, {"type": "cards"},
+                    {"type": "csv_field", "column": "OwnerDisplayName", "font": "fonts/title.ttf"}, [1, 2, 3]],
+            count_background="count.png",
+        )
+        assert config.asset_paths() == {"bg.png", "logo.png", "fonts/title.ttf", "count.png"}
+
+    def test_changes_rerender_only_what_they_affect(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "bg.png").write_bytes(b"one")
+        (tmp_path / "cfg.json").write_text(json.dumps({"layers": ["bg.png", {"type": "cards"}]}))
+        (tmp_path / "event.csv").write_text("Player,Decklist\nann,a\nbob,b\ncat,c\n")
+
+        tile_cache = {}
+
+        class FakeGenerator:
+            invalidated = []
+
+            def __init__(self):
+                self.tile_cache = tile_cache
+
+            def invalidate(self, paths):
+                self.invalidated.append(set(paths))
+
+        rendered = []
+        session = WatchSession(
+            "event.csv", "cfg.json", lambda config: FakeGenerator(),
+            lambda generator, deck_file, rows: rendered.append((deck_file, rows)),
+        )
+        assert session.watcher.paths == {"cfg.json", "event.csv", "bg.png"}
+        session.render_all()
+        assert rendered == [("event.csv", None)] and session.watcher.poll() == set()
+
+        (tmp_path / "event.csv").write_text("Player,Decklist\nann,a\nbob,B2\ncat,c\ndan,d\n")
+        changed = session.watcher.poll()
+        assert changed == {"event.csv"}
+        session.handle(changed)
+        assert rendered[-1] == ("event.csv", [1, 3])  # The edited row and the new one
+
+        (tmp_path / "bg.png").write_bytes(b"two!")
+        session.handle(session.watcher.poll())
+        assert FakeGenerator.invalidated == [{"bg.png"}] and rendered[-1] == ("event.csv", None)
+
+        (tmp_path / "cfg.json").write_text("{broken")
+        session.handle({"cfg.json"})  # Keeps the previous config and renders nothing
+        assert len(rendered) == 3
+
+        tile_cache["tile"] = "prepared"
+        (tmp_path / "cfg.json").write_text(json.dumps({"layers": [{"type": "cards"}]}))
+        session.handle({"cfg.json"})
+        assert len(rendered) == 4 and tile_cache == {}  # Tiles of the old layout are dropped
+
+
+# ---- Prefetch Tests ----
+
+import csv
+from . import prefetch as prefetch_module
+
+
+class TestPrefetch:
+    def test_union_of_variants_and_report(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(melee_csv_parser, "get_card_cache_path", lambda: str(tmp_path / "card_cache.json"))
+        (tmp_path / "card_cache.json").write_text('{"Luke|Hero": "SOR_005"}')
+        lookups = []
+        api = {"Wing": "SOR_100", "Vader": "SOR_010"}
+        monkeypatch.setattr(melee_csv_parser, "_lookup_card_id", lambda name, subtitle: lookups.append(name) or api.get(name))
+        requested = []
+
+        def download(cards):
+            requested.append(set(cards))
+            return [("SOR", "352")]  # Wing's hyperspace art is not on the CDN
+        monkeypatch.setattr(image_downloader, "download_images_batch", download)
+        monkeypatch.setattr(prefetch_module, "maintain_image_cache", lambda: None)
+
+        with open(tmp_path / "event.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, ["OwnerDisplayName", "Records"])
+            writer.writeheader()
+            writer.writerow({"OwnerDisplayName": "Ann", "Records": json.dumps(
+                [{"n": "Luke", "s": "Hero", "q": 1, "c": 6}, {"n": "Wing", "q": 3, "c": 0}, {"n": "Nobody", "q": 1, "c": 0}])})
+            writer.writerow({"OwnerDisplayName": "Bob", "Records": json.dumps(
+                [{"n": "Vader", "q": 1, "c": 6}, {"n": "Wing", "q": 2, "c": 0}, {"n": "Nobody", "q": 1, "c": 0}])})
+            writer.writerow({"OwnerDisplayName": "Cat", "Records": "[not json"})
+
+        report = prefetch_module.prefetch([str(tmp_path / "event.csv")], variants=[(False, False), (True, False)])
+        assert sorted(lookups) == ["Nobody", "Vader", "Wing"]  # Each name looked up once, across all decks
+        assert requested == [{("SOR", "005"), ("SOR", "100"), ("SOR", "010"), ("SOR", "257"), ("SOR", "352"), ("SOR", "262")}]
+        assert report.decks == 2 and report.images == 6
+        assert report.unresolved == {("Nobody", None): ["event.csv: Ann", "event.csv: Bob"]}
+        assert [label for label, _ in report.bad_decks] == ["event.csv: Cat"]
+        assert report.failed == [("SOR", "352")] and not report.ok
+
+    def test_offline_reports_without_network(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(network, "_offline", True)
+        monkeypatch.setattr(image_cache, "get_image_cache_dir", lambda: str(tmp_path / "cache"))
+        monkeypatch.setattr(melee_csv_parser, "get_card_cache_path", lambda: str(tmp_path / "card_cache.json"))
+        monkeypatch.setattr(network.requests, "get", lambda *args, **kwargs: pytest.fail("network used offline"))
+        (tmp_path / "cache" / "SOR").mkdir(parents=True)
+        (tmp_path / "cache" / "SOR" / "005.png").write_bytes(b"png")
+
+        assert melee_csv_parser.resolve_card_ids([("Luke", None)], {"Luke": "SOR_005"}) == {("Luke", None): "SOR_005"}
+        assert melee_csv_parser.resolve_card_ids([("Wing", None)], {}) == {("Wing", None): None}
+        assert image_downloader.download_images_batch([("SOR", "005"), ("SOR", "100"), ("SOR", "100")]) == [("SOR", "100")]
+        assert image_downloader.download_card("SOR", "100", str(tmp_path / "cache" / "SOR")) == -1
+        assert list(image_downloader.download_images_streaming([("SOR", "100"), ("SOR", "005")])) == [("SOR", "005"), ("SOR", "100")]
+        with pytest.raises(network.OfflineError):
+            network.get("https://swudb.com/")
+
+        config = Config(layers=[str(tmp_path / "gone.png"), {"type": "text", "text": "x", "font": "no-such-font.ttf"}])
+        assert prefetch_module.missing_config_files(config) == sorted([str(tmp_path / "gone.png"), "no-such-font.ttf"])
+
+
+# ---- Network Limit Tests ----
+
+from concurrent.futures import ThreadPoolExecutor
+from .benchmarks import StubCdn
+from .network import AdaptiveLimit
+
+
+class TestNetworkLimits:
+    @pytest.fixture(autouse=True)
+    def fresh_settings(self, monkeypatch):
+        monkeypatch.setattr(network, "_settings", dict(network.DEFAULTS))
+        monkeypatch.setattr(network, "_hosts", {})
+
+    def test_aimd(self):
+        limit = AdaptiveLimit(initial=4, minimum=1, maximum=10, latency_factor=0)
+        started = [limit.acquire() for _ in range(4)]
+        for start in started[:3]:
+            limit.release(start)
+        assert limit.limit == 7  # Slow start: one more per response
+        late = limit.acquire()
+        limit.release(late, failed=True)
+        assert limit.limit == 3.5 and limit.decreases == 1
+        limit.release(started[3], failed=True)  # Started before the cut: no second cut
+        assert limit.limit == 3.5
+        limit.release(limit.acquire())
+        assert limit.limit == 3.5 + 1 / 3.5  # Additive increase from here on
+
+    def test_backs_off_a_refusing_cdn(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(image_cache, "get_image_cache_dir", lambda: str(tmp_path))
+        monkeypatch.setattr(network, "BACKOFF", 0.05)
+        network.configure(concurrency=8, rate_limit=0)
+        cards = [("TST", str(i)) for i in range(1, 41)]
+        with StubCdn(latency=0.05, capacity=3) as cdn:
+            monkeypatch.setattr(image_downloader, "CDN_BASE", cdn.url + "/images/cards")
+            assert image_downloader.download_images_batch(cards) == []
+        limiter = network.host_limiter(cdn.url)
+        assert limiter.concurrency.decreases >= 1 and limiter.concurrency.limit < 8
+        assert cdn.refused < len(cards) and len(os.listdir(tmp_path / "TST")) == 40
+
+    def test_rate_limit_and_retry_after(self):
+        network.configure(rate_limit=40, burst=5, retries=2)
+        with StubCdn(latency=0) as cdn:
+            for _ in range(15):
+                assert network.get(cdn.url + "/a.png").status_code == 200
+        assert cdn.starts[-1] - cdn.starts[0] >= (15 - 5) / 40 * 0.9  # Burst of 5, then 40 per second
+
+        with StubCdn(latency=0.3, capacity=1, retry_after=0.2) as cdn:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                statuses = list(pool.map(lambda _: network.get(cdn.url + "/b.png").status_code, range(2)))
+        assert statuses == [200, 200] and cdn.refused >= 1
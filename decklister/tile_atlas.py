@@ -0,0 +1,151 @@
+"""
+Packed on-disk atlas of pre-decoded card tiles.
+
+Each tile is a card image that has already been decoded, masked with rounded
+corners, and resized to a grid cell size, stored as raw RGBA bytes in a single
+data file. A JSON index maps "SET_NUMBER@WIDTHxHEIGHT" to the tile's byte
+offset. Tiles are read through mmap, so every process rendering from the same
+atlas shares the OS page cache instead of decoding its own copy of each PNG.
+
+Several processes may build the same atlas at once: appends to the data file
+are made under a file lock, and save() merges the index on disk with its own.
+"""
+import json
+import mmap
+import os
+import threading
+from PIL import Image
+
+try:
+    from .app_paths import get_atlas_dir
+    from .file_lock import FileLock, temp_path
+except ImportError:
+    from decklister.app_paths import get_atlas_dir
+    from decklister.file_lock import FileLock, temp_path
+
+ATLAS_DATA_FILE = "tiles.bin"
+ATLAS_INDEX_FILE = "tiles.json"
+ATLAS_VERSION = 1
+
+
+def _tile_key(card_set, card_number, width, height):
+    return f"{card_set}_{card_number}@{width}x{height}"
+
+
+class TileAtlas:
+    """
+    Read (and optionally append to) a packed tile atlas.
+
+    Reading is zero-copy: get() returns a read-only PIL Image backed by the
+    mmap. Callers that need to draw on a tile must copy() it first.
+    """
+
+    def __init__(self, directory=None, writable=False):
+        """
+        Args:
+            directory: Folder holding the atlas files. Defaults to the app data atlas dir.
+            writable: If True, add() appends new tiles and save() writes the index.
+        """
+        self.directory = directory or get_atlas_dir()
+        self.writable = writable
+        self.data_path = os.path.join(self.directory, ATLAS_DATA_FILE)
+        self.index_path = os.path.join(self.directory, ATLAS_INDEX_FILE)
+        self._tiles = self._load_index()  # key → [offset, width, height]
+        self._lock = threading.Lock()
+        self._map = None
+        self._map_size = 0
+        self._dirty = False
+
+    def _load_index(self):
+        if not os.path.isfile(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != ATLAS_VERSION:
+                print(f"Ignoring tile atlas with unsupported version {data.get('version')}")
+                return {}
+            return data.get("tiles", {})
+        except Exception as e:
+            print(f"Warning: could not read tile atlas index: {e}")
+            return {}
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def __contains__(self, key):
+        return key in self._tiles
+
+    def has(self, card_set, card_number, width, height):
+        return _tile_key(card_set, card_number, width, height) in self._tiles
+
+    def get(self, card_set, card_number, width, height):
+        """
+        Return the tile for a card at the given size, or None if it isn't in the atlas.
+
+        The returned image is read-only and shares memory with the mmap.
+        """
+        entry = self._tiles.get(_tile_key(card_set, card_number, width, height))
+        if entry is None:
+            return None
+        offset, w, h = entry
+        length = w * h * 4
+        view = self._view(offset + length)
+        if view is None:
+            return None
+        return Image.frombuffer("RGBA", (w, h), view[offset:offset + length], "raw", "RGBA", 0, 1)
+
+    def _view(self, needed):
+        """Return a memoryview over the data file that covers at least `needed` bytes."""
+        with self._lock:
+            if self._map is None or self._map_size < needed:
+                # The data file grew (or was never mapped). Earlier tiles keep
+                # their own reference to the old map, so it is not closed here.
+                try:
+                    with open(self.data_path, "rb") as f:
+                        size = os.fstat(f.fileno()).st_size
+                        if size < needed:
+                            return None
+                        self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                        self._map_size = size
+                except (OSError, ValueError) as e:
+                    print(f"Warning: could not map tile atlas: {e}")
+                    return None
+            return memoryview(self._map)
+
+    def add(self, card_set, card_number, image):
+        """Append an RGBA tile to the data file. No-op if read-only or already present."""
+        if not self.writable:
+            return
+        width, height = image.size
+        key = _tile_key(card_set, card_number, width, height)
+        with self._lock:
+            if key in self._tiles:
+                return
+            if image.mode != "RGBA":
+                image = image.convert("RGBA")
+            data = image.tobytes()
+            # Other processes append too: hold the lock from reading the end offset until the tile is written
+            with FileLock(self.data_path):
+                with open(self.data_path, "ab") as f:
+                    offset = f.tell()
+                    f.write(data)
+            self._tiles[key] = [offset, width, height]
+            self._dirty = True
+
+    def save(self):
+        """
+        Write the index so other processes can see newly appended tiles.
+
+        Tiles other processes saved since this atlas was opened are kept.
+        """
+        if not self.writable or not self._dirty:
+            return
+        tmp_path = temp_path(self.index_path)
+        with self._lock, FileLock(self.index_path):
+            self._tiles = {**self._load_index(), **self._tiles}
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": ATLAS_VERSION, "tiles": self._tiles}, f)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+        print(f"Tile atlas saved ({len(self._tiles)} tile(s)) to {self.directory}")
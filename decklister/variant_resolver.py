@@ -1,3 +1,8 @@
+try:
+    from .deck import Card, Deck
+except ImportError:
+    from decklister.deck import Card, Deck
+
 # Known base set sizes (number of unique cards in the standard set)
 BASE_SET_SIZES = {
     "SOR": 252,
@@ -11,6 +16,13 @@ BASE_SET_SIZES = {
 
 LEADER_CARD_RANGE = (1, 18)  # Cards 1-18 are leaders in every set
 
+# Named variant sets for multi-variant renders: name → (hyperspace, showcase)
+VARIANTS = {
+    "normal": (False, False),
+    "hyperspace": (True, False),
+    "showcase": (False, True),
+}
+
 
 def get_base_set_size(card_set):
     """Get the base set size for a set. Returns None if unknown."""
@@ -48,3 +60,54 @@ def resolve_variant(card_set, card_number, hyperspace=False, showcase=False):
         return str(num%x + x)
 
     return str(card_number)
+
+
+def parse_variants(spec):
+    """
+    Parse a comma-separated variant list such as "normal,hyperspace,showcase".
+
+    Names can be combined with "+" (e.g. "hyperspace+showcase" for hyperspace
+    cards with showcase leaders).
+
+    Returns:
+        List of (name, hyperspace, showcase) tuples, in the order given.
+    """
+    variants = []
+    for name in (part.strip().lower() for part in spec.split(",")):
+        if not name:
+            continue
+        hyperspace = showcase = False
+        for piece in name.split("+"):
+            if piece not in VARIANTS:
+                raise ValueError(
+                    f"Unknown variant '{piece}'. Choose from: {', '.join(VARIANTS)}"
+                )
+            hyperspace = hyperspace or VARIANTS[piece][0]
+            showcase = showcase or VARIANTS[piece][1]
+        if name not in [v[0] for v in variants]:
+            variants.append((name, hyperspace, showcase))
+    if not variants:
+        raise ValueError("No variants given.")
+    return variants
+
+
+def resolve_deck_variant(deck, hyperspace=False, showcase=False):
+    """
+    Return a copy of a deck with every card number resolved to its variant.
+
+    The original deck is left untouched, so one parsed deck can be rendered
+    in several variants.
+    """
+    def resolve(cards):
+        resolved = []
+        for card in cards:
+            number = card.card_number
+            if hyperspace or showcase:
+                number = resolve_variant(card.card_set, number, hyperspace=hyperspace, showcase=showcase)
+            resolved.append(Card({"id": f"{card.card_set}_{number}", "count": card.count}))
+        return resolved
+
+    return Deck(
+        resolve(deck.leaders), resolve(deck.bases), resolve(deck.main_deck), resolve(deck.sideboard),
+        dict(deck.metadata),
+    )
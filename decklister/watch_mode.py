@@ -0,0 +1,198 @@
+"""
+Watch mode: re-render when deck, config, or asset files change.
+
+Files are polled for changes in modification time and size, so nothing
+beyond the standard library is needed. What a change re-renders depends on
+the file:
+
+    deck file           that deck's outputs only; for a CSV, only the rows
+                        that changed (or were added)
+    config file         everything, with the config reloaded
+    layer image, font,  everything, after dropping the renderer's decoded
+    count_background    copy of the changed file
+
+The generator (and with it the renderer's decoded layer images) and the
+prepared card tiles are kept between renders, so a re-render only decodes
+what changed.
+"""
+import os
+import time
+
+try:
+    from .config import Config
+except ImportError:
+    from decklister.config import Config
+
+POLL_INTERVAL = 1.0  # Seconds between checks
+DECK_EXTENSIONS = (".json", ".csv")
+
+
+def deck_files(deck_path):
+    """A deck file, or every .json/.csv deck file in a folder, sorted."""
+    if not os.path.isdir(deck_path):
+        return [deck_path]
+    return sorted(
+        os.path.join(deck_path, name) for name in os.listdir(deck_path)
+        if os.path.splitext(name)[1].lower() in DECK_EXTENSIONS
+    )
+
+
+def _read_rows(deck_file):
+    try:
+        from .melee_csv_parser import read_melee_rows
+    except ImportError:
+        from decklister.melee_csv_parser import read_melee_rows
+    try:
+        return read_melee_rows(deck_file)
+    except (OSError, ValueError):
+        return None
+
+
+class FileWatcher:
+    """Poll a set of files for changes in modification time or size."""
+
+    def __init__(self, paths=()):
+        self._stats = {}
+        self.set_paths(paths)
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None  # Missing (or being replaced); appearing again counts as a change
+        return (st.st_mtime_ns, st.st_size)
+
+    def set_paths(self, paths):
+        """Watch exactly these paths. Newly added ones start from their current state."""
+        paths = set(paths)
+        self._stats = {path: self._stats[path] if path in self._stats else self._stat(path) for path in paths}
+
+    @property
+    def paths(self):
+        return set(self._stats)
+
+    def poll(self):
+        """Paths that changed since the last poll."""
+        changed = set()
+        for path, old in self._stats.items():
+            new = self._stat(path)
+            if new != old:
+                self._stats[path] = new
+                changed.add(path)
+        return changed
+
+
+class WatchSession:
+    """
+    Render decks, then keep re-rendering whatever a file change affects.
+
+    Args:
+        deck_path: A deck file, or a folder of deck files (new ones are picked up).
+        config_file: Config path.
+        make_generator: fn(Config) returning a DeckImageGenerator.
+        render: fn(generator, deck_file, rows) rendering one deck file. rows
+            is None for every deck in it, or the positions of the CSV rows
+            that changed.
+        interval: Seconds between polls.
+    """
+
+    def __init__(self, deck_path, config_file, make_generator, render, interval=POLL_INTERVAL):
+        self.deck_path = deck_path
+        self.config_file = config_file
+        self.make_generator = make_generator
+        self.render = render
+        self.interval = interval
+        self.config = Config.from_file(config_file)
+        self.generator = make_generator(self.config)
+        self.decks = deck_files(deck_path)
+        self._rows = {}  # CSV path → rows as last rendered
+        self.watcher = FileWatcher(self._watched())
+
+    def _watched(self):
+        return {self.config_file, *self.decks, *self.config.asset_paths()}
+
+    def _render(self, deck_file, rows=None):
+        if deck_file.lower().endswith(".csv"):
+            self._rows[deck_file] = _read_rows(deck_file)
+        try:
+            self.render(self.generator, deck_file, rows)
+        except Exception as e:
+            print(f"Error rendering {deck_file}: {e}")
+
+    def _changed_rows(self, deck_file):
+        """Positions of the CSV rows that differ from the last render, or None if the file is new."""
+        old = self._rows.get(deck_file)
+        new = _read_rows(deck_file)
+        if old is None or new is None:
+            return None
+        return [i for i, row in enumerate(new) if i >= len(old) or old[i] != row]
+
+    def render_all(self):
+        for deck_file in self.decks:
+            self._render(deck_file)
+
+    def handle(self, changed):
+        """Re-render what a set of changed paths affects."""
+        if self.config_file in changed:
+            try:
+                config = Config.from_file(self.config_file)
+                generator = self.make_generator(config)
+            except Exception as e:
+                print(f"Error loading config {self.config_file}: {e}. Keeping the previous config.")
+                return
+            print(f"Config {self.config_file} changed; re-rendering everything.")
+            self.config = config
+            self.generator = generator
+            if generator.tile_cache is not None:
+                generator.tile_cache.clear()  # Tiles sized for the old layout would never be used again
+            self.render_all()
+            return
+
+        assets = changed - {self.config_file} - set(self.decks)
+        if assets:
+            print(f"{', '.join(sorted(assets))} changed; re-rendering everything.")
+            self.generator.invalidate(assets)
+            self.render_all()
+            return
+
+        for deck_file in sorted(changed):
+            if not os.path.isfile(deck_file):
+                print(f"{deck_file} was removed; keeping its outputs.")
+                continue
+            rows = self._changed_rows(deck_file) if deck_file.lower().endswith(".csv") else None
+            if rows == []:
+                print(f"{deck_file} changed, but none of its decks did.")
+                continue
+            print(f"{deck_file} changed; re-rendering " + ("it." if rows is None else f"{len(rows)} changed deck(s)."))
+            self._render(deck_file, rows)
+
+    def _settle(self, changed):
+        """Wait until files stop changing, so a save in progress isn't read half-written."""
+        while True:
+            time.sleep(self.interval)
+            more = self.watcher.poll()
+            if not more:
+                return changed
+            changed |= more
+
+    def run(self):
+        """Render everything once, then watch until interrupted (Ctrl+C)."""
+        self.render_all()
+        print(f"\nWatching {len(self.watcher.paths)} file(s) for changes (Ctrl+C to stop)...")
+        try:
+            while True:
+                time.sleep(self.interval)
+                changed = self.watcher.poll()
+                if os.path.isdir(self.deck_path):
+                    decks = deck_files(self.deck_path)
+                    changed |= set(decks) - set(self.decks)  # New deck files
+                    self.decks = decks
+                    self.watcher.set_paths(self._watched())
+                if not changed:
+                    continue
+                self.handle(self._settle(changed))
+                self.watcher.set_paths(self._watched())  # The config may name other files now
+                print(f"\nWatching {len(self.watcher.paths)} file(s) for changes (Ctrl+C to stop)...")
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
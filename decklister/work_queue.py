@@ -0,0 +1,308 @@
+"""
+Batch rendering spread over several processes or machines.
+
+The queue is a directory on a filesystem every node can reach:
+
+    queue.json          settings (config, variants, output folder, ...)
+    pending/00042.json  one file per deck job
+    claimed/00042.json  taken by a worker; its mtime is the worker's heartbeat
+    done/00042.json     finished, with the outputs written
+    failed/00042.json   gave up after MAX_ATTEMPTS, with the last error
+
+A worker claims a job by renaming it from pending/ to claimed/, which only
+one worker can win. While it renders, it touches the claimed file every
+HEARTBEAT_INTERVAL seconds. A claim untouched for STALE_AFTER seconds
+belongs to a worker that crashed and is moved back to pending/ by whoever
+notices first. Jobs therefore run at least once; a slow worker whose claim
+was requeued may finish a deck twice, writing the same output files.
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+try:
+    from .file_lock import temp_path
+except ImportError:
+    from decklister.file_lock import temp_path
+
+QUEUE_FILE = "queue.json"
+STATES = ("pending", "claimed", "done", "failed")
+HEARTBEAT_INTERVAL = 10  # Seconds between heartbeats of a rendering worker
+STALE_AFTER = 60  # Seconds without a heartbeat before a claim is requeued
+MAX_ATTEMPTS = 3  # Renders of one job before it is marked failed
+POLL_INTERVAL = 1.0
+
+
+def _write_json(path, data):
+    tmp_path = temp_path(path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class WorkQueue:
+    """A directory of deck job files shared by a coordinator and its workers."""
+
+    def __init__(self, directory, stale_after=STALE_AFTER, max_attempts=MAX_ATTEMPTS):
+        self.directory = directory
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+
+    @classmethod
+    def create(cls, directory, jobs, settings, **kwargs):
+        """
+        Create a queue with one pending file per job.
+
+        Args:
+            directory: Queue folder. Must not already hold a queue.
+            jobs: List of job dicts, in the order workers should take them.
+            settings: Dict saved as queue.json for workers to read.
+        """
+        queue = cls(directory, **kwargs)
+        if os.path.exists(queue._path(QUEUE_FILE)):
+            raise ValueError(f"{directory} already holds a queue")
+        for state in STATES:
+            os.makedirs(queue._path(state), exist_ok=True)
+        for position, job in enumerate(jobs):
+            _write_json(queue._path("pending", f"{position:05d}.json"), {"attempts": 0, **job})
+        # Written last: workers treat the queue as ready once it exists
+        _write_json(queue._path(QUEUE_FILE), settings)
+        return queue
+
+    @property
+    def settings(self):
+        return _read_json(self._path(QUEUE_FILE))
+
+    def _path(self, *parts):
+        return os.path.join(self.directory, *parts)
+
+    def _names(self, state):
+        try:
+            return sorted(name for name in os.listdir(self._path(state)) if name.endswith(".json"))
+        except FileNotFoundError:
+            return []
+
+    def counts(self):
+        """Number of jobs in each state."""
+        return {state: len(self._names(state)) for state in STATES}
+
+    def claim(self, worker_id):
+        """
+        Take the next pending job.
+
+        Returns:
+            (name, job dict), or None if nothing is pending.
+        """
+        done = set(self._names("done"))
+        for name in self._names("pending"):
+            claimed_path = self._path("claimed", name)
+            try:
+                os.rename(self._path("pending", name), claimed_path)
+                os.utime(claimed_path)  # The first heartbeat; rename keeps the old mtime
+            except FileNotFoundError:
+                continue  # Another worker got there first
+            if name in done:
+                os.remove(claimed_path)  # Finished late by a worker whose claim had been requeued
+                continue
+            job = _read_json(claimed_path)
+            job["worker"] = worker_id
+            _write_json(claimed_path, job)
+            return name, job
+        return None
+
+    def heartbeat(self, name):
+        """Mark a claimed job as still being worked on."""
+        try:
+            os.utime(self._path("claimed", name))
+        except FileNotFoundError:
+            pass  # Requeued as stale; finishing it anyway is harmless
+
+    def complete(self, name, job, outputs, seconds):
+        """Record a finished job."""
+        _write_json(self._path("done", name), {**job, "outputs": outputs, "seconds": round(seconds, 2), "error": None})
+        self._remove_claim(name, job.get("worker"))
+
+    def fail(self, name, job, error):
+        """Record a failed attempt: requeue the job, or mark it failed after max_attempts."""
+        worker = job.get("worker")
+        if self._claim_worker(name) != worker:
+            return  # Requeued as stale meanwhile, which already counted this attempt
+        if not os.path.exists(self._path("done", name)):  # Finished by a worker that had claimed it before
+            self._record_failure(name, job, error)
+        self._remove_claim(name, worker)
+
+    def requeue_stale(self):
+        """
+        Move claims whose worker stopped sending heartbeats back to pending.
+
+        Returns:
+            Names of the requeued jobs.
+        """
+        requeued = []
+        now = time.time()
+        for name in self._names("claimed"):
+            claimed_path = self._path("claimed", name)
+            try:
+                if now - os.stat(claimed_path).st_mtime < self.stale_after:
+                    continue
+                # Rename first, so only one process requeues it
+                stale_path = temp_path(claimed_path)
+                os.rename(claimed_path, stale_path)
+            except FileNotFoundError:
+                continue
+            job = _read_json(stale_path)
+            worker = job.get("worker")
+            if not os.path.exists(self._path("done", name)):
+                self._record_failure(name, job, f"worker {worker} stopped responding")
+            # Only the renamed file: claimed/<name> may already belong to a new claimer
+            os.remove(stale_path)
+            requeued.append(name)
+            print(f"Requeued {name} (worker {worker} stopped responding)")
+        return requeued
+
+    def _record_failure(self, name, job, error):
+        job = {**job, "attempts": job.get("attempts", 0) + 1, "error": str(error)}
+        state = "failed" if job["attempts"] >= self.max_attempts else "pending"
+        _write_json(self._path(state, name), job)
+
+    def _claim_worker(self, name):
+        """Worker holding a claim, or None if nobody does."""
+        try:
+            return _read_json(self._path("claimed", name)).get("worker")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _remove_claim(self, name, worker):
+        # Only our own claim; after a requeue the file may be another worker's.
+        # A requeue and new claim between this check and the remove is accepted:
+        # the new worker still records its result, only without a claim file
+        if self._claim_worker(name) != worker:
+            return
+        try:
+            os.remove(self._path("claimed", name))
+        except FileNotFoundError:
+            pass
+
+    def jobs(self, state):
+        """(name, job dict) for every job in a state."""
+        found = []
+        for name in self._names(state):
+            try:
+                found.append((name, _read_json(self._path(state, name))))
+            except (FileNotFoundError, ValueError):
+                continue  # Moved (or being replaced) while listing
+        return found
+
+    def claim_ages(self):
+        """(name, worker, seconds since the last heartbeat) for every claimed job."""
+        now = time.time()
+        ages = []
+        for name, job in self.jobs("claimed"):
+            try:
+                age = now - os.stat(self._path("claimed", name)).st_mtime
+            except FileNotFoundError:
+                continue
+            ages.append((name, job.get("worker"), age))
+        return ages
+
+
+class _Heartbeat:
+    """Touch a claimed job file in the background while it renders."""
+
+    def __init__(self, queue, name):
+        self.queue = queue
+        self.name = name
+        # Several heartbeats per stale period, so one slow touch doesn't lose the claim
+        self.interval = min(HEARTBEAT_INTERVAL, queue.stale_after / 4)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="queue-heartbeat", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.queue.heartbeat(self.name)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def run_worker(queue, render, worker_id=None, poll_interval=POLL_INTERVAL):
+    """
+    Claim and render jobs until the queue is finished.
+
+    Args:
+        queue: WorkQueue.
+        render: Function rendering one job dict and returning the output paths.
+            Raising marks the attempt failed.
+        worker_id: Name recorded with claims (default: host-pid).
+
+    Returns:
+        Number of jobs this worker finished.
+    """
+    worker_id = worker_id or default_worker_id()
+    finished = 0
+    while True:
+        queue.requeue_stale()
+        claimed = queue.claim(worker_id)
+        if claimed is None:
+            counts = queue.counts()
+            if not counts["pending"] and not counts["claimed"]:
+                return finished
+            # Others are still rendering; wait in case one of them crashes
+            time.sleep(poll_interval)
+            continue
+
+        name, job = claimed
+        start = time.perf_counter()
+        try:
+            with _Heartbeat(queue, name):
+                outputs = render(job)
+        except Exception as e:
+            print(f"[{worker_id}] {name} failed: {e}", file=sys.stderr)
+            queue.fail(name, job, e)
+            continue
+        queue.complete(name, job, outputs, time.perf_counter() - start)
+        finished += 1
+        print(f"[{worker_id}] {name} done ({job.get('label')})")
+
+
+def wait_for_queue(queue, poll_interval=POLL_INTERVAL, on_progress=None):
+    """
+    Watch a queue until every job is done or failed, requeueing crashed workers' claims.
+
+    Returns:
+        Final counts().
+    """
+    last = None
+    while True:
+        queue.requeue_stale()
+        counts = queue.counts()
+        if counts != last:
+            (on_progress or _print_progress)(counts)
+            last = counts
+        if not counts["pending"] and not counts["claimed"]:
+            return counts
+        time.sleep(poll_interval)
+
+
+def _print_progress(counts):
+    total = sum(counts.values())
+    print(f"{counts['done']}/{total} done, {counts['claimed']} rendering, "
+          f"{counts['pending']} pending, {counts['failed']} failed")